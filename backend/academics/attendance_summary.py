@@ -0,0 +1,138 @@
+from decimal import Decimal
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from .models import StudentDailyAttendance, MonthlyAttendanceSummary
+
+
+# Incremental maintenance of MonthlyAttendanceSummary.
+# Marking attendance applies per-student deltas between the old and new
+# StudentDailyAttendance status; rebuild_monthly_summaries() recomputes a
+# month from scratch with one grouped aggregate query.
+
+COUNTED_FIELDS = ["total_days", "present_days", "absent_days"]
+
+
+def _percentage(present_days, total_days):
+    if total_days <= 0:
+        return Decimal("0.00")
+    return round(Decimal(present_days) * 100 / Decimal(total_days), 2)
+
+
+def _status_delta(old_status, new_status):
+    """(total, present, absent) change when a day's status goes old -> new (None = no record)"""
+    total = (new_status is not None) - (old_status is not None)
+    present = (new_status == "present") - (old_status == "present")
+    absent = (new_status == "absent") - (old_status == "absent")
+    return total, present, absent
+
+
+def _write_summaries(summaries):
+    """Persist summaries with one bulk_create and one bulk_update"""
+    now = timezone.now()
+    to_create, to_update = [], []
+    for summary in summaries:
+        summary.attendance_percentage = _percentage(summary.present_days, summary.total_days)
+        summary.last_calculated_at = now
+        (to_update if summary.pk else to_create).append(summary)
+
+    if to_create:
+        MonthlyAttendanceSummary.objects.bulk_create(to_create)
+    if to_update:
+        MonthlyAttendanceSummary.objects.bulk_update(
+            to_update,
+            COUNTED_FIELDS + ["school_class", "attendance_percentage", "last_calculated_at"],
+        )
+
+
+def rebuild_monthly_summaries(tenant, month, year, school_class=None, student_ids=None):
+    """
+    Recompute summaries for a tenant's month from StudentDailyAttendance.
+    Optionally narrowed to one class or a set of students.
+    Returns the number of summaries written.
+    """
+    records = StudentDailyAttendance.objects.filter(
+        class_attendance__tenant = tenant,
+        class_attendance__date__month = month,
+        class_attendance__date__year = year,
+    )
+    existing = MonthlyAttendanceSummary.objects.filter(tenant = tenant, month = month, year = year)
+
+    if school_class is not None:
+        records = records.filter(student__school_class = school_class)
+        existing = existing.filter(student__school_class = school_class)
+    if student_ids is not None:
+        records = records.filter(student_id__in = student_ids)
+        existing = existing.filter(student_id__in = student_ids)
+
+    totals = (
+        records.values("student_id")
+        .annotate(
+            total_days = Count("id"),
+            present_days = Count("id", filter = Q(status = "present")),
+            absent_days = Count("id", filter = Q(status = "absent")),
+            school_class_id = Max("class_attendance__school_class_id"),
+        )
+    )
+    summaries = {summary.student_id: summary for summary in existing.select_for_update()}
+    counted = set()
+
+    for row in totals:
+        summary = summaries.get(row["student_id"])
+        if summary is None:
+            summary = summaries[row["student_id"]] = MonthlyAttendanceSummary(
+                tenant = tenant,
+                student_id = row["student_id"],
+                month = month,
+                year = year,
+            )
+        summary.school_class_id = row["school_class_id"]
+        summary.total_days = row["total_days"]
+        summary.present_days = row["present_days"]
+        summary.absent_days = row["absent_days"]
+        counted.add(row["student_id"])
+
+    # Students whose records have all been removed drop back to zero
+    for student_id, summary in summaries.items():
+        if student_id not in counted:
+            summary.total_days = summary.present_days = summary.absent_days = 0
+
+    _write_summaries(summaries.values())
+    return len(summaries)
+
+
+def apply_attendance_changes(tenant, school_class_id, month, year, previous, current):
+    """
+    Update monthly summaries after a class's attendance for one day changed.
+    previous / current map student_id -> status before and after the marking.
+    Students without a summary yet are rebuilt from their records instead.
+    """
+    deltas = {}
+    for student_id in previous.keys() | current.keys():
+        delta = _status_delta(previous.get(student_id), current.get(student_id))
+        if any(delta):
+            deltas[student_id] = delta
+
+    if not deltas:
+        return
+
+    summaries = {
+        summary.student_id: summary
+        for summary in MonthlyAttendanceSummary.objects.select_for_update().filter(
+            student_id__in = deltas.keys(),
+            month = month,
+            year = year,
+        )
+    }
+
+    for student_id, summary in summaries.items():
+        total, present, absent = deltas[student_id]
+        summary.total_days += total
+        summary.present_days += present
+        summary.absent_days += absent
+        if student_id in current:
+            summary.school_class_id = school_class_id
+    _write_summaries(summaries.values())
+
+    missing = deltas.keys() - summaries.keys()
+    if missing:
+        rebuild_monthly_summaries(tenant, month, year, student_ids = missing)
@@ -0,0 +1,119 @@
+import datetime
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from accounts.models import Tenant, User
+from classroom.models import SchoolClass
+from users.models import Student, Teacher
+from academics.models import ClassDailyAttendance, StudentDailyAttendance
+
+
+# Compares the per-row attendance write path TeacherMarkAttendanceView used to
+# run (delete, one INSERT per student, three COUNTs) with the bulk upsert in
+# ClassDailyAttendance.set_student_statuses. Both mark a synthetic class once
+# and then re-mark it with one status changed; everything is rolled back.
+
+
+def _int_list(value):
+    try:
+        return [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise CommandError(f"Expected comma-separated integers, got {value!r}")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _per_row_mark(tenant, school_class, teacher, day, statuses):
+    """The write path before the bulk upsert, kept here for comparison"""
+    class_attendance, created = ClassDailyAttendance.objects.get_or_create(
+        tenant=tenant,
+        school_class=school_class,
+        date=day,
+        defaults={"marked_by": teacher, "is_completed": True, "marked_at": timezone.now()},
+    )
+    if not created:
+        class_attendance.student_attendances.all().delete()
+        class_attendance.marked_by = teacher
+        class_attendance.marked_at = timezone.now()
+        class_attendance.save()
+    for student_id, status in statuses.items():
+        StudentDailyAttendance.objects.create(class_attendance=class_attendance, student_id=student_id, status=status)
+    class_attendance.calculate_stats()
+
+
+def _bulk_mark(tenant, school_class, teacher, day, statuses):
+    class_attendance, created = ClassDailyAttendance.objects.get_or_create(
+        tenant=tenant,
+        school_class=school_class,
+        date=day,
+        defaults={"marked_by": teacher, "is_completed": True, "marked_at": timezone.now()},
+    )
+    if not created:
+        class_attendance.marked_by = teacher
+        class_attendance.marked_at = timezone.now()
+    class_attendance.set_student_statuses(statuses)
+    class_attendance.save()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare queries and time of the per-row and bulk attendance write paths "
+        "for each class size. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--class-sizes", default="10,60,200", help="Comma-separated student counts")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'students':>8} {'path':>8} {'mark':>14} {'re-mark':>14}")
+        try:
+            with transaction.atomic():
+                tenant, teacher = self._school()
+                for size in _int_list(options["class_sizes"]):
+                    for name, mark in (("per-row", _per_row_mark), ("bulk", _bulk_mark)):
+                        school_class, student_ids = self._class(tenant, teacher, size)
+                        statuses = dict.fromkeys(student_ids, "present")
+                        day = datetime.date.today()
+
+                        first = self._measure(mark, tenant, school_class, teacher, day, statuses)
+                        statuses[student_ids[0]] = "absent"
+                        again = self._measure(mark, tenant, school_class, teacher, day, statuses)
+                        self.stdout.write(
+                            f"{size:>8} {name:>8} {first[0]:>5} q {first[1] * 1000:>6.1f}ms "
+                            f"{again[0]:>5} q {again[1] * 1000:>6.1f}ms"
+                        )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _measure(self, mark, *args):
+        with CaptureQueriesContext(connection) as queries:
+            began = time.perf_counter()
+            with transaction.atomic():
+                mark(*args)
+            seconds = time.perf_counter() - began
+        return len(queries), seconds
+
+    def _school(self):
+        run = uuid.uuid4().hex[:8]
+        tenant = Tenant.objects.create(institute_name=f"bench-{run}", email=f"bench-{run}@example.com", phone="0")
+        user = User.objects.create(username=f"bench-{run}-teacher", email=f"bench-{run}-teacher@example.com", tenant=tenant, role="teacher")
+        return tenant, Teacher.objects.create(user=user)
+
+    def _class(self, tenant, teacher, size):
+        run = uuid.uuid4().hex[:8]
+        school_class = SchoolClass.objects.create(tenant=tenant, name=f"bench-{run}", division="A", class_teacher=teacher, max_student=size)
+        users = User.objects.bulk_create([
+            User(username=f"bench-{run}-{i}", email=f"bench-{run}-{i}@example.com", tenant=tenant, role="student")
+            for i in range(size)
+        ])
+        students = Student.objects.bulk_create([
+            Student(user=user, admission_number=f"bench-{run}-{i}", school_class=school_class, roll_number=i + 1)
+            for i, user in enumerate(users)
+        ])
+        return school_class, [student.id for student in students]
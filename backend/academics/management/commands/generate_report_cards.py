@@ -0,0 +1,45 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from classroom.models import SchoolClass
+from backend.exports import iter_zip
+from academics.report_cards import collect_report_cards, render_report_cards, report_card_archive_name
+
+
+class Command(BaseCommand):
+    help = "Write a class's report-card ZIP to disk and report the rendering rate."
+
+    def add_arguments(self, parser):
+        parser.add_argument("class_id", type=int)
+        parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+        parser.add_argument("--end", required=True, help="YYYY-MM-DD")
+        parser.add_argument("--term", default="")
+        parser.add_argument("--workers", type=int, default=0, help="Render processes (default: REPORT_CARD_WORKERS / CPU count)")
+        parser.add_argument("--output", help="ZIP path (default: report_cards_<class>_<dates>.zip)")
+
+    def handle(self, *args, **options):
+        school_class = SchoolClass.objects.select_related("tenant").filter(pk=options["class_id"]).first()
+        if school_class is None:
+            raise CommandError(f"Class {options['class_id']} not found")
+        try:
+            start, end = date.fromisoformat(options["start"]), date.fromisoformat(options["end"])
+        except ValueError:
+            raise CommandError("Dates must be YYYY-MM-DD")
+
+        began = time.perf_counter()
+        cards = collect_report_cards(school_class, start, end, options["term"])
+        collected = time.perf_counter()
+
+        output = options["output"] or report_card_archive_name(school_class, start, end)
+        with open(output, "wb") as archive:
+            for chunk in iter_zip(render_report_cards(cards, workers=options["workers"] or None)):
+                archive.write(chunk)
+        finished = time.perf_counter()
+
+        render_seconds = finished - collected
+        self.stdout.write(f"Collected {len(cards)} card(s) in {collected - began:.2f}s")
+        self.stdout.write(
+            f"Rendered {len(cards)} card(s) in {render_seconds:.2f}s "
+            f"({len(cards) / render_seconds if render_seconds else 0:.1f} cards/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output}"))
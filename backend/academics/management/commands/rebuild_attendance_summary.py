@@ -0,0 +1,36 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from accounts.models import Tenant
+from academics.attendance_summary import rebuild_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild MonthlyAttendanceSummary rows for a tenant's month from daily attendance."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tenant_id", help="Tenant UUID")
+        parser.add_argument("--month", type=int, required=True)
+        parser.add_argument("--year", type=int, required=True)
+        parser.add_argument("--class-id", type=int, dest="class_id", help="Only rebuild one SchoolClass")
+
+    def handle(self, *args, **options):
+        if not 1 <= options["month"] <= 12:
+            raise CommandError("--month must be between 1 and 12")
+
+        try:
+            tenant = Tenant.objects.get(id=options["tenant_id"])
+        except (Tenant.DoesNotExist, ValidationError):
+            raise CommandError(f"Tenant {options['tenant_id']} not found")
+
+        with transaction.atomic():
+            count = rebuild_monthly_summaries(
+                tenant,
+                options["month"],
+                options["year"],
+                school_class=options["class_id"],
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {count} summaries for {tenant} ({options['month']:02d}/{options['year']})."
+        ))
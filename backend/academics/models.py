@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -66,6 +67,49 @@ class ClassDailyAttendance(models.Model):
             "updated_at"
         ])
 
+    def set_student_statuses(self, statuses):
+        """
+        Upsert StudentDailyAttendance rows from {student_id: status} in a fixed
+        number of queries and refresh the cached counts from the payload.
+        Rows for students missing from the payload are removed.
+        Returns the previous {student_id: status} for this class/day.
+        """
+        now = timezone.now()
+        existing = {
+            record.student_id: record
+            for record in self.student_attendances.all()
+        } if self.pk else {}
+        previous = {student_id: record.status for student_id, record in existing.items()}
+
+        to_create, to_update = [], []
+        for student_id, status in statuses.items():
+            record = existing.get(student_id)
+            if record is None:
+                to_create.append(StudentDailyAttendance(
+                    class_attendance = self,
+                    student_id = student_id,
+                    status = status,
+                ))
+            elif record.status != status:
+                record.status = status
+                record.updated_at = now
+                to_update.append(record)
+
+        stale = [student_id for student_id in existing if student_id not in statuses]
+        if stale:
+            self.student_attendances.filter(student_id__in = stale).delete()
+        if to_create:
+            StudentDailyAttendance.objects.bulk_create(to_create)
+        if to_update:
+            StudentDailyAttendance.objects.bulk_update(to_update, ["status", "updated_at"])
+
+        values = list(statuses.values())
+        self.total_students = len(values)
+        self.present_count = values.count("present")
+        self.absent_count = values.count("absent")
+
+        return previous
+
 
 
 class StudentDailyAttendance(models.Model):
@@ -0,0 +1,209 @@
+# academics/report_card_utils.py
+#
+# Pure ReportLab rendering for student report cards. Works on the plain dict
+# payloads built by academics.report_cards, so it can run in worker processes
+# without touching the ORM.
+
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from backend.pdf_utils import BLUE, CONTENT_WIDTH, DARK, MID, LIGHT_LINE, WHITE, new_document, footer
+
+BRAND       = BLUE.brand
+BRAND_LIGHT = BLUE.brand_light
+
+
+def _s(name, **kw) -> ParagraphStyle:
+    return ParagraphStyle(name, **kw)
+
+
+ST = {
+    "brand_title":  _s("BT",  fontName="Helvetica-Bold", fontSize=22, textColor=WHITE, alignment=TA_LEFT),
+    "brand_sub":    _s("BS",  fontName="Helvetica",      fontSize=10, textColor=BLUE.brand_muted, alignment=TA_LEFT),
+    "doc_label":    _s("DL",  fontName="Helvetica-Bold", fontSize=11, textColor=WHITE, alignment=TA_RIGHT),
+    "doc_val":      _s("DV",  fontName="Helvetica",      fontSize=10, textColor=BLUE.brand_muted, alignment=TA_RIGHT),
+    "section_head": _s("SH",  fontName="Helvetica-Bold", fontSize=9,  textColor=MID,   spaceAfter=3),
+    "bold_dark":    _s("BD",  fontName="Helvetica-Bold", fontSize=11, textColor=DARK),
+    "normal_dark":  _s("ND",  fontName="Helvetica",      fontSize=10, textColor=DARK),
+    "normal_mid":   _s("NM",  fontName="Helvetica",      fontSize=9,  textColor=MID),
+    "th_white":     _s("TW",  fontName="Helvetica-Bold", fontSize=9,  textColor=WHITE),
+    "th_center":    _s("TC",  fontName="Helvetica-Bold", fontSize=9,  textColor=WHITE, alignment=TA_CENTER),
+    "td_dark":      _s("TD",  fontName="Helvetica",      fontSize=9,  textColor=DARK),
+    "td_center":    _s("TDC", fontName="Helvetica",      fontSize=9,  textColor=DARK,  alignment=TA_CENTER),
+    "td_mid":       _s("TDM", fontName="Helvetica",      fontSize=9,  textColor=MID,   alignment=TA_CENTER),
+    "stat_value":   _s("SV",  fontName="Helvetica-Bold", fontSize=16, leading=20, textColor=BRAND, alignment=TA_CENTER),
+    "stat_label":   _s("SL",  fontName="Helvetica",      fontSize=8,  textColor=MID,   alignment=TA_CENTER),
+}
+
+BANNER_STYLE = TableStyle([
+    ("BACKGROUND",    (0, 0), (-1, -1), BRAND),
+    ("LEFTPADDING",   (0, 0), (0, -1),  14),
+    ("RIGHTPADDING",  (-1, 0), (-1, -1), 14),
+    ("VALIGN",        (0, 0), (-1, -1), "TOP"),
+])
+
+GRID_STYLE = TableStyle([
+    ("BACKGROUND",    (0, 0), (-1, 0), BRAND),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [WHITE, BRAND_LIGHT]),
+    ("TOPPADDING",    (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("LEFTPADDING",   (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING",  (0, 0), (-1, -1), 6),
+    ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
+    ("LINEBELOW",     (0, 0), (-1, -1), 0.5, LIGHT_LINE),
+])
+
+STATS_STYLE = TableStyle([
+    ("BACKGROUND",    (0, 0), (-1, -1), BRAND_LIGHT),
+    ("TOPPADDING",    (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
+    ("LINEAFTER",     (0, 0), (-2, -1), 0.5, LIGHT_LINE),
+])
+
+
+def _fmt(value, suffix=""):
+    if value is None:
+        return "—"
+    if isinstance(value, float):
+        value = f"{value:g}" if value == int(value) else f"{value:.2f}"
+    return f"{value}{suffix}"
+
+
+def _stat(value, label):
+    return [Paragraph(value, ST["stat_value"]), Paragraph(label, ST["stat_label"])]
+
+
+def generate_report_card_pdf(card) -> bytes:
+    """
+    Render one student's report card.
+
+    Parameters
+    ----------
+    card : dict built by academics.report_cards.collect_report_cards()
+
+    Returns
+    -------
+    bytes — raw PDF content.
+    """
+    buffer = BytesIO()
+    doc = new_document(buffer, title=f"Report Card - {card['student_name']}")
+    col_w = CONTENT_WIDTH
+    story = []
+
+    # ── 1. Header banner ─────────────────────────────────────
+    header = Table(
+        [[Paragraph("EduQuest", ST["brand_title"]),
+          Paragraph("REPORT CARD<br/>" + escape(card["term"] or card["period"]), ST["doc_label"])],
+         [Paragraph(escape(card["institute_name"]), ST["brand_sub"]),
+          Paragraph(card["period"], ST["doc_val"])]],
+        colWidths=[col_w * 0.55, col_w * 0.45],
+    )
+    header.setStyle(BANNER_STYLE)
+    header.setStyle(TableStyle([
+        ("TOPPADDING",    (0, 0), (-1, 0), 14),
+        ("BOTTOMPADDING", (0, -1), (-1, -1), 14),
+    ]))
+    story.append(header)
+    story.append(Spacer(1, 6*mm))
+
+    # ── 2. Student details ───────────────────────────────────
+    details = Table(
+        [[Paragraph("STUDENT DETAILS", ST["section_head"]), ""],
+         [Paragraph(escape(card["student_name"]), ST["bold_dark"]),
+          Paragraph(f"Class: {escape(card['class_name'])}", ST["normal_mid"])],
+         [Paragraph(f"Admission No: {escape(card['admission_number'])}", ST["normal_mid"]),
+          Paragraph(f"Roll No: {card['roll_number']}", ST["normal_mid"])]],
+        colWidths=[col_w * 0.55, col_w * 0.45],
+    )
+    details.setStyle(TableStyle([
+        ("LEFTPADDING",   (0, 0), (-1, -1), 0),
+        ("TOPPADDING",    (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+    ]))
+    story.append(details)
+    story.append(Spacer(1, 5*mm))
+
+    # ── 3. Summary strip ─────────────────────────────────────
+    attendance = card["attendance"]
+    assignments = card["assignments"]
+    summary = Table(
+        [[_stat(_fmt(card["overall_percentage"], "%"), "OVERALL"),
+          _stat(card["overall_grade"] or "—", "GRADE"),
+          _stat(_fmt(attendance["percentage"], "%"), "ATTENDANCE"),
+          _stat(_fmt(assignments["average_percentage"], "%"), "ASSIGNMENTS")]],
+        colWidths=[col_w / 4] * 4,
+    )
+    summary.setStyle(STATS_STYLE)
+    story.append(summary)
+    story.append(Spacer(1, 6*mm))
+
+    # ── 4. Exam results ──────────────────────────────────────
+    story.append(Paragraph("EXAM RESULTS", ST["section_head"]))
+    rows = [[
+        Paragraph("SUBJECT", ST["th_white"]),
+        Paragraph("EXAM", ST["th_white"]),
+        Paragraph("DATE", ST["th_center"]),
+        Paragraph("MARKS", ST["th_center"]),
+        Paragraph("%", ST["th_center"]),
+        Paragraph("GRADE", ST["th_center"]),
+        Paragraph("CLASS AVG", ST["th_center"]),
+    ]]
+    for exam in card["exams"]:
+        if exam["status"] == "absent":
+            marks = "Absent"
+        elif exam["marks"] is None:
+            marks = "Pending"
+        else:
+            marks = f"{_fmt(exam['marks'])} / {exam['max_marks']}"
+        rows.append([
+            Paragraph(escape(exam["subject"]), ST["td_dark"]),
+            Paragraph(escape(exam["title"]), ST["td_dark"]),
+            Paragraph(exam["date"], ST["td_mid"]),
+            Paragraph(marks, ST["td_center"]),
+            Paragraph(_fmt(exam["percentage"]), ST["td_center"]),
+            Paragraph(exam["grade"] or "—", ST["td_center"]),
+            Paragraph(_fmt(exam["class_average"], "%"), ST["td_mid"]),
+        ])
+    if len(rows) == 1:
+        rows.append([Paragraph("No exams in this period", ST["td_mid"])] + [""] * 6)
+    results = Table(
+        rows,
+        colWidths=[col_w * w for w in (0.17, 0.25, 0.13, 0.13, 0.09, 0.09, 0.14)],
+        repeatRows=1,
+    )
+    results.setStyle(GRID_STYLE)
+    story.append(results)
+    story.append(Spacer(1, 6*mm))
+
+    # ── 5. Attendance + assignments ──────────────────────────
+    story.append(Paragraph("ATTENDANCE & ASSIGNMENTS", ST["section_head"]))
+    extra = Table(
+        [[Paragraph("ATTENDANCE", ST["th_white"]), "", Paragraph("ASSIGNMENTS", ST["th_white"]), ""],
+         [Paragraph("Days recorded", ST["td_dark"]), Paragraph(str(attendance["total"]), ST["td_center"]),
+          Paragraph("Assigned", ST["td_dark"]), Paragraph(str(assignments["assigned"]), ST["td_center"])],
+         [Paragraph("Present", ST["td_dark"]), Paragraph(str(attendance["present"]), ST["td_center"]),
+          Paragraph("Submitted", ST["td_dark"]), Paragraph(str(assignments["submitted"]), ST["td_center"])],
+         [Paragraph("Absent", ST["td_dark"]), Paragraph(str(attendance["absent"]), ST["td_center"]),
+          Paragraph("Graded", ST["td_dark"]), Paragraph(str(assignments["graded"]), ST["td_center"])],
+         [Paragraph("Leave", ST["td_dark"]), Paragraph(str(attendance["leave"]), ST["td_center"]),
+          Paragraph("Average score", ST["td_dark"]),
+          Paragraph(_fmt(assignments["average_percentage"], "%"), ST["td_center"])]],
+        colWidths=[col_w * 0.30, col_w * 0.20, col_w * 0.30, col_w * 0.20],
+    )
+    extra.setStyle(GRID_STYLE)
+    story.append(extra)
+    story.append(Spacer(1, 10*mm))
+
+    # ── 6. Footer ─────────────────────────────────────────────
+    story += footer(
+        BLUE,
+        f"Generated on {card['generated_on']}  ·  {escape(card['institute_name'])}  ·  EduQuest School Management",
+    )
+
+    doc.build(story)
+    return buffer.getvalue()
@@ -0,0 +1,185 @@
+import re
+from django.conf import settings
+from django.db.models import Avg, Count, F, FloatField, Q
+from django.utils import timezone
+from assignment.models import Assignment, AssignmentSubmission
+from exam.models import ExamResult, grade_for
+from users.models import Student
+from .models import StudentDailyAttendance
+from backend.pdf_utils import render_many
+from .report_card_utils import generate_report_card_pdf
+
+
+# Batch report cards for a class over a date range ("term").
+# collect_report_cards() gathers every student's data with a fixed number of
+# grouped queries and returns plain dicts; the PDFs are rendered from those in a
+# process pool and streamed into a ZIP.
+
+REPORT_CARD_WORKERS = getattr(settings, "REPORT_CARD_WORKERS", 0)
+
+
+def _round(value, digits=2):
+    return round(value, digits) if value is not None else None
+
+
+def _attendance_percentage(present, total):
+    return round(present * 100 / total, 2) if total else None
+
+
+def collect_report_cards(school_class, start_date, end_date, term=""):
+    """
+    Report-card payloads for every student in the class, ordered by roll number.
+    Exams and attendance are limited to [start_date, end_date], assignments to
+    those due in that range.
+    """
+    students = list(
+        Student.objects
+        .filter(school_class=school_class)
+        .select_related("user")
+        .order_by("roll_number", "id")
+    )
+    student_ids = [s.id for s in students]
+
+    # ── Exams: every result row plus the class average per exam ──
+    results = (
+        ExamResult.objects
+        .filter(
+            student_id__in=student_ids,
+            exam__classes=school_class,
+            exam__exam_date__range=(start_date, end_date),
+        )
+        .with_scores()
+    )
+    exam_rows = list(
+        results
+        .values(
+            "student_id", "exam_id", "exam__title", "exam__subject__name",
+            "exam__exam_date", "exam__max_marks", "marks_obtained", "status",
+            "score_percentage", "score_grade",
+        )
+        .order_by("exam__exam_date", "exam__subject__name", "exam_id")
+    )
+    class_averages = dict(
+        results
+        .values_list("exam_id")
+        .annotate(avg=Avg("score_percentage", filter=Q(status="graded")))
+        .order_by()
+    )
+
+    # ── Attendance ──
+    attendance = {
+        row["student_id"]: row
+        for row in StudentDailyAttendance.objects
+        .filter(
+            student_id__in=student_ids,
+            class_attendance__school_class=school_class,
+            class_attendance__date__range=(start_date, end_date),
+        )
+        .values("student_id")
+        .annotate(
+            total=Count("id"),
+            present=Count("id", filter=Q(status="present")),
+            absent=Count("id", filter=Q(status="absent")),
+            leave=Count("id", filter=Q(status="leave")),
+        )
+        .order_by()
+    }
+
+    # ── Assignments ──
+    assigned = Assignment.objects.filter(
+        classes=school_class,
+        due_date__date__range=(start_date, end_date),
+    ).count()
+    submissions = {
+        row["student_id"]: row
+        for row in AssignmentSubmission.objects
+        .filter(
+            student_id__in=student_ids,
+            assignment__classes=school_class,
+            assignment__due_date__date__range=(start_date, end_date),
+        )
+        .values("student_id")
+        .annotate(
+            submitted=Count("id"),
+            graded=Count("id", filter=Q(status="graded")),
+            average=Avg(
+                F("marks_obtained") * 100.0 / F("assignment__total_marks"),
+                filter=Q(status="graded", marks_obtained__isnull=False),
+                output_field=FloatField(),
+            ),
+        )
+        .order_by()
+    }
+
+    exams_by_student = {}
+    for row in exam_rows:
+        exams_by_student.setdefault(row["student_id"], []).append({
+            "subject": row["exam__subject__name"],
+            "title": row["exam__title"],
+            "date": row["exam__exam_date"].strftime("%d %b %Y"),
+            "marks": row["marks_obtained"],
+            "max_marks": row["exam__max_marks"],
+            "status": row["status"],
+            "percentage": row["score_percentage"],
+            "grade": row["score_grade"],
+            "class_average": _round(class_averages.get(row["exam_id"])),
+        })
+
+    common = {
+        "institute_name": school_class.tenant.institute_name,
+        "class_name": f"{school_class.name} {school_class.division}".strip(),
+        "term": term,
+        "period": f"{start_date.strftime('%d %b %Y')} – {end_date.strftime('%d %b %Y')}",
+        "generated_on": timezone.localdate().strftime("%d %b %Y"),
+    }
+
+    cards = []
+    for student in students:
+        exams = exams_by_student.get(student.id, [])
+        graded = [e["percentage"] for e in exams if e["percentage"] is not None]
+        overall = _round(sum(graded) / len(graded)) if graded else None
+        att = attendance.get(student.id, {})
+        sub = submissions.get(student.id, {})
+        cards.append({
+            **common,
+            "student_id": student.id,
+            "student_name": student.user.full_name or student.user.email,
+            "admission_number": student.admission_number,
+            "roll_number": student.roll_number,
+            "exams": exams,
+            "overall_percentage": overall,
+            "overall_grade": grade_for(overall),
+            "attendance": {
+                "total": att.get("total", 0),
+                "present": att.get("present", 0),
+                "absent": att.get("absent", 0),
+                "leave": att.get("leave", 0),
+                "percentage": _attendance_percentage(att.get("present", 0), att.get("total", 0)),
+            },
+            "assignments": {
+                "assigned": assigned,
+                "submitted": sub.get("submitted", 0),
+                "graded": sub.get("graded", 0),
+                "average_percentage": _round(sub.get("average")),
+            },
+        })
+    return cards
+
+
+def report_card_filename(card):
+    name = re.sub(r"[^A-Za-z0-9]+", "_", card["student_name"]).strip("_") or "student"
+    return f"{card['roll_number']:03d}_{name}_{card['admission_number']}.pdf"
+
+
+def render_report_cards(cards, workers=None):
+    """
+    Yield (filename, pdf_bytes) in card order. Renders in a process pool when
+    there are enough cards to pay for it; workers=1 renders inline.
+    """
+    for card, pdf in render_many(generate_report_card_pdf, cards, workers or REPORT_CARD_WORKERS):
+        yield report_card_filename(card), pdf
+
+
+def report_card_archive_name(school_class, start_date, end_date):
+    label = re.sub(r"[^A-Za-z0-9]+", "_", f"{school_class.name}_{school_class.division}").strip("_")
+    return f"report_cards_{label}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.zip"
@@ -0,0 +1,6 @@
+from backend.cache import invalidate_on
+
+
+# Cached academics views (announcement feeds) go stale when these change.
+
+invalidate_on("academics", "academics.Announcement")
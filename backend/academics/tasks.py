@@ -0,0 +1,36 @@
+import tempfile
+from datetime import date
+from classroom.models import SchoolClass
+from jobs.models import Artifact
+from jobs.queue import task
+from notifications.utils import send_notification
+from backend.exports import iter_zip
+from .report_cards import collect_report_cards, render_report_cards, report_card_archive_name
+
+
+@task("academics.generate_report_cards", max_attempts=2)
+def generate_report_cards(class_id, start_date, end_date, term="", requested_by=None):
+    """Build a class's report-card ZIP as a private artifact and notify the requester"""
+    school_class = SchoolClass.objects.select_related("tenant").filter(pk = class_id).first()
+    if school_class is None:
+        return None
+
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    cards = collect_report_cards(school_class, start, end, term)
+
+    with tempfile.TemporaryFile() as archive:
+        for chunk in iter_zip(render_report_cards(cards)):
+            archive.write(chunk)
+        archive.seek(0)
+        artifact = Artifact.store(
+            school_class.tenant_id, requested_by, report_card_archive_name(school_class, start, end), archive
+        )
+
+    url = artifact.download_url()
+    if requested_by:
+        send_notification(
+            [requested_by], "exam",
+            title = f"Report cards ready: {school_class}",
+            message = f"{len(cards)} report card(s) for {term or f'{start} to {end}'} are ready to download: {url}",
+        )
+    return {"artifact": str(artifact.pk), "url": url, "cards": len(cards)}
@@ -1,3 +1,52 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import User
+from jobs.models import Artifact, Job
+from jobs.queue import claim_jobs, run_job
+from jobs.tests import use_temporary_artifact_storage
+from notifications.models import Notification
+from users.tests import make_school
 
-# Create your tests here.
+
+class ClassReportCardsTests(TestCase):
+
+    def setUp(self):
+        _, self.admin, _, school_class, _ = make_school()
+        self.path = f"/api/academics/class/{school_class.pk}/report-cards/"
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+        self.artifacts = use_temporary_artifact_storage(self)
+
+    def test_queues_job_instead_of_rendering(self):
+        response = self.client.post(self.path, {"start": "2026-01-01", "end": "2026-03-31", "term": "Term 1"}, format="json")
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(pk=response.data["job_id"])
+        self.assertEqual(job.name, "academics.generate_report_cards")
+        self.assertEqual(job.payload["requested_by"], self.admin.pk)
+
+    def test_get_does_not_queue(self):
+        response = self.client.get(self.path, {"start": "2026-01-01", "end": "2026-03-31"})
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Job.objects.exists())
+
+    def test_bad_dates_are_rejected(self):
+        for start, end in (("2026-02-30", "2026-03-31"), ("2026-03-31", "2026-01-01"), ("", "2026-01-01")):
+            response = self.client.post(self.path, {"start": start, "end": end}, format="json")
+            self.assertEqual(response.status_code, 400, (start, end))
+        self.assertFalse(Job.objects.exists())
+
+    def test_job_stores_a_private_download(self):
+        self.client.post(self.path, {"start": "2026-01-01", "end": "2026-03-31"}, format="json")
+        [job] = claim_jobs(10)
+        with self.captureOnCommitCallbacks(execute=True):
+            job = run_job(job)
+        self.assertEqual(job.status, "succeeded", job.last_error)
+
+        artifact = Artifact.objects.get(pk=job.result["artifact"])
+        self.assertTrue(artifact.file.path.startswith(self.artifacts))
+        self.assertEqual(job.result["url"], f"/api/jobs/artifacts/{artifact.pk}/download/")
+        self.assertIn(job.result["url"], Notification.objects.get(recipient=self.admin).message)
+
+        response = self.client.get(job.result["url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"PK"))
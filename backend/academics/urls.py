@@ -2,7 +2,8 @@ from django.urls import path
 from . views import (CreateAnnouncement,AdminAnnouncementUpdateDeleteView,AnnouncementAudienceView,AdminAnnouncementList,
                     TeacherAttendanceListView,TeacherMarkAttendanceView,TeacherGetClassStudentsView,TeacherAttendanceDetailView,
                     StudentAttendanceView,StudentMonthlyReportView,
-                    StudentLeaveRequestListCreateView,StudentLeaveRequestCancelView,TeacherLeaveRequestListView,TeacherLeaveReviewView )
+                    StudentLeaveRequestListCreateView,StudentLeaveRequestCancelView,TeacherLeaveRequestListView,TeacherLeaveReviewView,
+                    ClassReportCardsView )
 
 urlpatterns = [
     path('create/announcement/',CreateAnnouncement.as_view()),
@@ -22,4 +23,6 @@ urlpatterns = [
     path("student/leave/<int:pk>/", StudentLeaveRequestCancelView.as_view()),
     path("teacher/leave/", TeacherLeaveRequestListView.as_view()),
     path("teacher/leave/<int:pk>/review/", TeacherLeaveReviewView.as_view()),
+
+    path("class/<int:class_id>/report-cards/", ClassReportCardsView.as_view(), name='class-report-cards'),
 ]
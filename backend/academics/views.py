@@ -14,6 +14,12 @@ from django.db.models import Q
 from users.models import Student
 from django.shortcuts import get_object_or_404
 from classroom.models import SchoolClass
+from .attendance_summary import apply_attendance_changes
+from .tasks import generate_report_cards
+from users.dashboard_cache import bump_dashboard_scopes
+from jobs.queue import enqueue
+from django.utils.dateparse import parse_date
+from backend.cache import cached_view
 
 # Create your views here.
 # Announcement and Attendance
@@ -37,6 +43,8 @@ class CreateAnnouncement(APIView):
 class AnnouncementAudienceView(APIView):
     permission_classes = [IsAuthenticated,HasActiveSubscription]
 
+    # Short TTL: announcements drop out on expiry without any write
+    @cached_view("academics", ttl=60)
     def get(self,request):
         user = request.user
         tenant = user.tenant
@@ -154,30 +162,31 @@ class TeacherMarkAttendanceView(generics.GenericAPIView):
                     }
                 )
 
-                # Clear existing student attendance if updating
                 if not created:
-                    class_attendance.student_attendances.all().delete()
                     class_attendance.marked_by = teacher
                     class_attendance.is_completed = True
                     class_attendance.marked_at = timezone.now()
-                    class_attendance.save()
 
-                for item in data['attendance_data']:
-                    StudentDailyAttendance.objects.create(
-                        class_attendance = class_attendance,
-                        student_id = item['student_id'],
-                        status = item['status']
-                    )
-                
-                # Calculate statistics
-                class_attendance.calculate_stats()
-
-                # Update monthly summary
-                update_monthly_summary(
-                    class_attendance.school_class,
+                # Bulk upsert keyed on (class_attendance, student); stats come from the payload
+                statuses = {
+                    int(item['student_id']): item['status']
+                    for item in data['attendance_data']
+                }
+                previous = class_attendance.set_student_statuses(statuses)
+                class_attendance.save()
+
+                # Apply only the status changes to the monthly summary
+                apply_attendance_changes(
+                    request.user.tenant,
+                    class_attendance.school_class_id,
                     data['date'].month,
                     data['date'].year,
-                    request.user.tenant
+                    previous,
+                    statuses,
+                )
+                bump_dashboard_scopes(
+                    f"class:{class_attendance.school_class_id}",
+                    f"teacher:{teacher.id}",
                 )
 
                 return Response({
@@ -191,38 +200,6 @@ class TeacherMarkAttendanceView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-def update_monthly_summary(school_class, month, year,tenant):
-    """Update monthly attendance summary for all students in class"""
-    students = Student.objects.filter(school_class=school_class)
-
-    for student in students:
-        attendances = StudentDailyAttendance.objects.filter(
-            student = student,
-            class_attendance__date__month = month,
-            class_attendance__date__year = year
-        )
-
-        total_days = attendances.count()
-        present_days = attendances.filter(status='present').count()
-        absent_days = attendances.filter(status='absent').count()
-
-        summary, created = MonthlyAttendanceSummary.objects.update_or_create(
-            tenant = tenant,
-            student = student,
-            school_class = school_class,
-            month = month,
-            year = year,
-            defaults= {
-                'total_days': total_days,
-                'present_days': present_days,
-                'absent_days': absent_days
-            }
-        )
-        summary.calculate_percentage()
-
-
-
-        
 class TeacherGetClassStudentsView(generics.GenericAPIView):
     """Get all students in teacher's class for attendance marking"""
     permission_classes = [IsAuthenticated, IsTeacher,HasActiveSubscription]
@@ -433,4 +410,55 @@ class TeacherLeaveReviewView(generics.GenericAPIView):
             LeaveRequestSerializer(leave).data,
             status=status.HTTP_200_OK,
         )
- 
\ No newline at end of file
+
+
+
+# REPORT CARDS
+
+class ClassReportCardsView(APIView):
+    """
+    POST {"start": "YYYY-MM-DD", "end": "YYYY-MM-DD", "term": "Term 1"}
+    Queues a job that builds a ZIP with one report-card PDF per student of the
+    class and notifies the requester with its download link when it is stored.
+    Rendering runs in the jobs worker, not in the web process. Admins of the
+    tenant and the class teacher may request it.
+    """
+    permission_classes = [IsAuthenticated,HasActiveSubscription]
+
+    def post(self, request, class_id):
+        user = request.user
+        school_class = get_object_or_404(
+            SchoolClass.objects.select_related("tenant"), id = class_id, tenant = user.tenant
+        )
+        is_class_teacher = (
+            user.role == "teacher"
+            and school_class.class_teacher_id is not None
+            and school_class.class_teacher_id == getattr(getattr(user, "teacher_profile", None), "id", None)
+        )
+        if user.role != "admin" and not is_class_teacher:
+            return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            start = parse_date(str(request.data.get("start", "")))
+            end = parse_date(str(request.data.get("end", "")))
+        except ValueError:
+            start = end = None
+        if not start or not end or start > end:
+            return Response(
+                {"detail": "Give a valid start and end date (YYYY-MM-DD)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        term = str(request.data.get("term", "")).strip()
+
+        job = enqueue(
+            generate_report_cards,
+            class_id = school_class.id,
+            start_date = start.isoformat(),
+            end_date = end.isoformat(),
+            term = term,
+            requested_by = user.id,
+        )
+        return Response(
+            {"message": "Report cards are being generated", "job_id": getattr(job, "id", None)},
+            status=status.HTTP_202_ACCEPTED
+        )
@@ -7,7 +7,25 @@ from django.conf import settings
 
 # Create your models here.
 
-class Tenant(models.Model):
+class LoadedValuesMixin:
+    """Keeps the column values a row was loaded with in _loaded_values,
+    so save signals can tell what changed without reading the row back"""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        loaded = self.__dict__.setdefault("_loaded_values", {})
+        for field in self._meta.concrete_fields:
+            if field.attname in self.__dict__ and (fields is None or field.attname in fields or field.name in fields):
+                loaded[field.attname] = self.__dict__[field.attname]
+
+
+class Tenant(LoadedValuesMixin, models.Model):
     id = models.UUIDField(primary_key=True,default=uuid.uuid4,editable=False)
     institute_name = models.CharField(max_length=225)
     email = models.EmailField(unique=True)
@@ -27,7 +45,7 @@ class Tenant(models.Model):
 
 
 
-class User(AbstractUser):
+class User(LoadedValuesMixin, AbstractUser):
     full_name = models.CharField(max_length=225,blank=True,null=True)
     tenant = models.ForeignKey(Tenant,on_delete=models.SET_NULL,null=True,blank=True)
     ROLE_CHOICES = [
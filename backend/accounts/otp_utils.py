@@ -1,7 +1,8 @@
 from . models import EmailOtp
 import random
 from django.utils import timezone
-from django.core.mail import send_mail
+from jobs.queue import enqueue
+from . tasks import send_email
 
 def send_otp(user,subject,message_template):
     # Invalidate old OTPs
@@ -9,19 +10,19 @@ def send_otp(user,subject,message_template):
         
     code = f"{random.randint(100000,999999)}"
 
-    EmailOtp.objects.create(
+    otp = EmailOtp.objects.create(
         user = user,
         email = user.email,
         code = code,
         expires_at=timezone.now() + timezone.timedelta(minutes=5)
     )
 
-    send_mail(
+    enqueue(
+        send_email,
+        idempotency_key = f"otp:{otp.id}",
         subject = subject,
         message = message_template.format(code=code, name=user.full_name),
-        from_email=None,
-        recipient_list=[user.email],
-        fail_silently=False,
+        recipient_list = [user.email],
     )
 
     
\ No newline at end of file
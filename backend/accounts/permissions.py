@@ -1,6 +1,5 @@
 from rest_framework.permissions import BasePermission
-from subscription.models import Subscription 
-from django.utils import timezone
+from subscription.entitlements import has_active_entitlement
 
 
 class IsSuperAdmin(BasePermission):
@@ -22,20 +21,8 @@ class HasActiveSubscription(BasePermission):
     message = "Subscription required. Please purchase a plan."
 
     def has_permission(self, request,view):
-        user = request.user
-        tenant = getattr(user,"tenant",None)
-        if not tenant:
+        # tenant_id avoids loading the Tenant row; entitlement is served from cache
+        tenant_id = getattr(request.user,"tenant_id",None)
+        if not tenant_id:
             return False
-        subscription = Subscription.objects.filter(tenant=tenant,is_active = True).order_by('-expiry_date').first()
-
-        if not subscription:
-            return False
-        
-        if subscription.expiry_date and subscription.expiry_date < timezone.now():
-            subscription.is_active = False
-            subscription.save()
-
-            return False
-        
-        return True
-        
\ No newline at end of file
+        return has_active_entitlement(tenant_id)
@@ -2,7 +2,8 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
-from django.core.mail import send_mail
+from jobs.queue import enqueue
+from . tasks import send_email
 import random
 from . models import Tenant, EmailOtp
 from . otp_utils import send_otp
@@ -273,14 +274,16 @@ class ForgotPasswordSerializer(serializers.Serializer):
         user = self.user
         code = f"{random.randint(100000, 999999)}"
 
-        EmailOtp.objects.create(
+        otp = EmailOtp.objects.create(
             user = user,
             email = user.email,
             code = code,
             expires_at = timezone.now() + timezone.timedelta(minutes=5),
         )
 
-        send_mail (
+        enqueue(
+            send_email,
+            idempotency_key = f"otp:{otp.id}",
             subject="EduQuest Password Reset OTP",
             message=(
                 f"Hello {user.full_name},\n\n"
@@ -292,9 +295,7 @@ class ForgotPasswordSerializer(serializers.Serializer):
                 "Regards,\n"
                 "EduQuest Team"
             ),
-            from_email= None,
             recipient_list=[user.email],
-            fail_silently= False,
         )
 
 
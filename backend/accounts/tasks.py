@@ -0,0 +1,22 @@
+from django.core.mail import send_mail, send_mass_mail
+from jobs.queue import task
+
+
+@task("accounts.send_email", max_attempts=5, sensitive=True)
+def send_email(subject, message, recipient_list):
+    send_mail(
+        subject = subject,
+        message = message,
+        from_email = None,
+        recipient_list = recipient_list,
+        fail_silently = False,
+    )
+
+
+@task("accounts.send_mass_email", max_attempts=5, sensitive=True)
+def send_mass_email(messages):
+    """messages : [[subject, message, recipient], ...] sent over one SMTP connection"""
+    return send_mass_mail(
+        [(subject, message, None, [recipient]) for subject, message, recipient in messages],
+        fail_silently = False,
+    )
@@ -11,14 +11,13 @@ from accounts.models import User
 from subscription.models import Subscription
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny,IsAuthenticated
-from django.db.models import Sum, Count, Q
-from django.db.models.functions import TruncMonth
+from django.db.models import Sum, Q
 from django.utils import timezone
-from datetime import timedelta
+from datetime import timedelta, date
 from decimal import Decimal
 from users.models import Teacher, Student
 from classroom.models import SchoolClass
-from finance.models import Payment, StudentBill, Expense
+from finance.models import Payment, StudentBill, FinanceMonthlyRollup, ExpenseCategoryRollup
 from subscription.models import Subscription
 from academics.models import Announcement 
 
@@ -266,86 +265,55 @@ class AdminDashboardView(APIView):
             created_at__gte=this_month_start
         ).count()
 
-        # ── Fee / Revenue stats ───────────────────────────────────────────────
-        bills = StudentBill.objects.filter(tenant=tenant)
-        paid_bills = bills.filter(status="paid")
-        pending_bills = bills.filter(status="pending")
-        overdue_bills = bills.filter(status="overdue")
-
-        month_revenue = paid_bills.filter(
-            paid_date__gte=this_month_start.date()
-        ).aggregate(t=Sum("amount"))["t"] or Decimal("0")
-
-        last_month_revenue = paid_bills.filter(
-            paid_date__gte=last_month_start.date(),
-            paid_date__lt=this_month_start.date()
-        ).aggregate(t=Sum("amount"))["t"] or Decimal("0")
+        # ── Fee / Revenue / Expense stats (pre-aggregated monthly rollups) ────
+        rollups = list(FinanceMonthlyRollup.objects.filter(tenant=tenant))
 
-        total_revenue = paid_bills.aggregate(t=Sum("amount"))["t"] or Decimal("0")
+        by_month = {(r.year, r.month): r for r in rollups}
+        this_month = by_month.get((now.year, now.month))
+        last_month = by_month.get((last_month_start.year, last_month_start.month))
 
-        pending_amount = pending_bills.aggregate(t=Sum("amount"))["t"] or Decimal("0")
-        overdue_amount = overdue_bills.aggregate(t=Sum("amount"))["t"] or Decimal("0")
+        month_revenue      = this_month.revenue if this_month else Decimal("0")
+        last_month_revenue = last_month.revenue if last_month else Decimal("0")
+        total_revenue      = sum((r.revenue for r in rollups), Decimal("0"))
 
-        # ── Expense stats ─────────────────────────────────────────────────────
-        expenses = Expense.objects.filter(tenant=tenant, payment_status="paid")
-        month_expense = expenses.filter(
-            expense_date__year=current_year,
-            expense_date__month=now.month
-        ).aggregate(t=Sum("amount"))["t"] or Decimal("0")
+        pending_amount = sum((r.pending_amount for r in rollups), Decimal("0"))
+        overdue_amount = sum((r.overdue_amount for r in rollups), Decimal("0"))
+        paid_count     = sum(r.collections for r in rollups)
+        pending_count  = sum(r.pending_count for r in rollups)
+        overdue_count  = sum(r.overdue_count for r in rollups)
 
-        total_expense_year = expenses.filter(
-            expense_date__year=current_year
-        ).aggregate(t=Sum("amount"))["t"] or Decimal("0")
+        month_expense = this_month.expense_amount if this_month else Decimal("0")
+        total_expense_year = sum(
+            (r.expense_amount for r in rollups if r.year == current_year), Decimal("0")
+        )
 
         # Net this month
         net_month = month_revenue - month_expense
 
         # ── Bill status breakdown ─────────────────────────────────────────────
         bill_status = [
-            {"status": "Paid",    "count": paid_bills.count(),    "color": "#10B981"},
-            {"status": "Pending", "count": pending_bills.count(), "color": "#F59E0B"},
-            {"status": "Overdue", "count": overdue_bills.count(), "color": "#EF4444"},
+            {"status": "Paid",    "count": paid_count,    "color": "#10B981"},
+            {"status": "Pending", "count": pending_count, "color": "#F59E0B"},
+            {"status": "Overdue", "count": overdue_count, "color": "#EF4444"},
         ]
 
-        # ── Revenue by month (last 12 months) ─────────────────────────────────
-        revenue_by_month = (
-            paid_bills
-            .filter(paid_date__gte=twelve_months_ago.date())
-            .annotate(month=TruncMonth("paid_date"))
-            .values("month")
-            .annotate(revenue=Sum("amount"), count=Count("id"))
-            .order_by("month")
-        )
+        # ── Revenue and expense by month (last 12 months) ─────────────────────
+        chart_start = (twelve_months_ago.year, twelve_months_ago.month)
         revenue_chart = [
             {
-                "month": r["month"].strftime("%b '%y"),
-                "revenue": float(r["revenue"]),
-                "collections": r["count"],
+                "month": date(r.year, r.month, 1).strftime("%b '%y"),
+                "revenue": float(r.revenue),
+                "collections": r.collections,
+                "expense": float(r.expense_amount),
             }
-            for r in revenue_by_month
+            for r in rollups
+            if (r.year, r.month) >= chart_start and r.collections
         ]
 
-        # ── Expense by month (last 12 months) ─────────────────────────────────
-        expense_by_month = (
-            expenses
-            .filter(expense_date__gte=twelve_months_ago.date())
-            .annotate(month=TruncMonth("expense_date"))
-            .values("month")
-            .annotate(total=Sum("amount"))
-            .order_by("month")
-        )
-        # Merge revenue and expense into one chart list
-        expense_map = {
-            e["month"].strftime("%b '%y"): float(e["total"])
-            for e in expense_by_month
-        }
-        for r in revenue_chart:
-            r["expense"] = expense_map.get(r["month"], 0)
-
         # ── Expense by category ───────────────────────────────────────────────
         expense_by_cat = (
-            expenses
-            .filter(expense_date__year=current_year)
+            ExpenseCategoryRollup.objects
+            .filter(tenant=tenant, year=current_year)
             .values("category__name")
             .annotate(total=Sum("amount"))
             .order_by("-total")[:6]
@@ -373,8 +341,9 @@ class AdminDashboardView(APIView):
             }
 
         # ── Recent overdue bills ───────────────────────────────────────────────
+        bills = StudentBill.objects.filter(tenant=tenant)
         recent_overdue = (
-            overdue_bills
+            bills.filter(status="overdue")
             .select_related("student__user", "fee_structure__fee_type")
             .order_by("-due_date")[:6]
         )
@@ -390,7 +359,7 @@ class AdminDashboardView(APIView):
 
         # ── Recent payments ────────────────────────────────────────────────────
         recent_paid = (
-            paid_bills
+            bills.filter(status="paid")
             .select_related("student__user", "fee_structure__fee_type", "payment")
             .order_by("-paid_date")[:6]
         )
@@ -427,8 +396,8 @@ class AdminDashboardView(APIView):
                 "month_expense":       float(month_expense),
                 "total_expense_year":  float(total_expense_year),
                 "net_month":           float(net_month),
-                "pending_bills":       pending_bills.count(),
-                "overdue_bills":       overdue_bills.count(),
+                "pending_bills":       pending_count,
+                "overdue_bills":       overdue_count,
                 "active_announcements": active_announcements,
             },
             "subscription":       subscription_info,
@@ -0,0 +1,135 @@
+# backend/cache.py
+#
+# Tenant-scoped caching shared by the apps.
+#
+# Every cached value lives under a versioned namespace per tenant and app
+# ("classroom", "academics", "finance"). The namespace's version token is part
+# of each key, so bumping it on a write makes all of that tenant's entries in
+# the namespace unreachable at once; stale entries simply expire.
+#
+# Redis backs the cache in production (USE_REDIS); without it Django's locmem
+# cache is used, so tests and development need no Redis server.
+
+import functools
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from rest_framework.response import Response
+
+
+CACHE_NAMESPACES = ("classroom", "academics", "finance")
+
+CACHED_VIEW_TTL = getattr(settings, "CACHED_VIEW_TTL", 300)
+
+
+# ── Version tokens ────────────────────────────────────────────────────────────
+
+def versions(names):
+    """Current version token of each name, starting fresh ones for missing names"""
+    keys = [f"version:{name}" for name in names]
+    found = cache.get_many(keys)
+
+    for key in keys:
+        if key not in found:
+            # Version evicted or never set: start a fresh one
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+
+    return [found[key] for key in keys]
+
+
+def bump_versions(*names):
+    """Give each name a new version token once the current transaction commits"""
+    if names:
+        tokens = {f"version:{name}": uuid.uuid4().hex for name in names}
+        # After commit, so a concurrent rebuild can't cache pre-commit data under the new version
+        transaction.on_commit(lambda: cache.set_many(tokens, None))
+
+
+# ── Tenant namespaces ─────────────────────────────────────────────────────────
+
+def _namespace(tenant_id, namespace):
+    if namespace not in CACHE_NAMESPACES:
+        raise ValueError(f"Unknown cache namespace {namespace!r}")
+    return f"{namespace}:{tenant_id}"
+
+
+def tenant_key(tenant_id, namespace, *parts):
+    """Cache key for parts under the tenant's current namespace version"""
+    name = _namespace(tenant_id, namespace)
+    return ":".join([name, *versions([name]), *(str(p) for p in parts)])
+
+
+def bump_namespace(tenant_id, namespace):
+    """Invalidate everything the tenant has cached in the namespace"""
+    bump_versions(_namespace(tenant_id, namespace))
+
+
+def cached(tenant_id, namespace, parts, build, ttl=None):
+    """Cached value for parts, building and storing it with build() on a miss"""
+    key = tenant_key(tenant_id, namespace, *parts)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, CACHED_VIEW_TTL if ttl is None else ttl)
+    return data
+
+
+def invalidate_on(namespace, *models, tenant_of=lambda instance: instance.tenant_id):
+    """
+    Bump the namespace for the instance's tenant whenever one of the models
+    (classes or "app.Model" labels) is saved or deleted. Bulk writes that skip
+    signals must call bump_namespace() themselves.
+    """
+    def on_change(sender, instance, **kwargs):
+        try:
+            tenant_id = tenant_of(instance)
+        except ObjectDoesNotExist:
+            return
+        if tenant_id:
+            bump_namespace(tenant_id, namespace)
+
+    for model in models:
+        uid = f"cache:{namespace}:{model}"
+        post_save.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+
+
+# ── Views ─────────────────────────────────────────────────────────────────────
+
+def cached_view(namespace, ttl=None, per_user=False):
+    """
+    Cache a DRF APIView GET handler's response data per tenant.
+
+    The key covers the namespace version, the user's role, the path and query
+    string, plus the user id with per_user (for views that read the user's own
+    profile, e.g. a teacher's classes). Only 200 responses are cached.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            user = request.user
+            tenant_id = getattr(user, "tenant_id", None)
+            if not tenant_id or request.method not in ("GET", "HEAD"):
+                return method(view, request, *args, **kwargs)
+
+            query = sorted(request.query_params.lists())
+            request_hash = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+            parts = ["view", user.role, user.pk if per_user else "-", request_hash]
+            key = tenant_key(tenant_id, namespace, *parts)
+
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = method(view, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                cache.set(key, response.data, CACHED_VIEW_TTL if ttl is None else ttl)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,326 @@
+# backend/exports.py
+#
+# Streaming file exports: ZIP archives, CSV and XLSX built row by row, and
+# ExportMixin, which adds ?format=csv / ?format=xlsx to a DRF list view.
+#
+# Rows are read with values_list(...).iterator(chunk_size=...) (a server-side
+# cursor on PostgreSQL) and written straight into the response, so memory stays
+# flat however many rows a tenant has.
+#
+# The generators here are synchronous. Under ASGI Django would drain a sync
+# iterator into a list before sending it, so streaming_response() hands Daphne
+# an async iterator that pulls one chunk at a time on the request's sync thread.
+
+import csv
+import datetime
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+
+# ── Responses ─────────────────────────────────────────────────────────────────
+
+_DONE = object()
+
+
+async def aiter_chunks(chunks):
+    """
+    Async iterator over a sync iterator's chunks. Each chunk is produced in the
+    request's thread-sensitive executor, so database cursors stay on the same
+    connection the view used.
+    """
+    chunks = iter(chunks)
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await pull(chunks, _DONE)) is not _DONE:
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            await sync_to_async(close, thread_sensitive=True)()
+
+
+def streaming_response(request, chunks, content_type, filename):
+    """Attachment StreamingHttpResponse that streams under both WSGI and ASGI"""
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        chunks = aiter_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ── ZIP ───────────────────────────────────────────────────────────────────────
+
+class ZipStream:
+    """Write-only sink for ZipFile; pop() hands back what was written since the last call"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(files):
+    """Stream a ZIP of (filename, bytes) pairs without holding the archive in memory"""
+    stream = ZipStream()
+    # PDFs are already compressed; storing them keeps the archive step cheap
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            yield stream.pop()
+    yield stream.pop()
+
+
+# ── CSV ───────────────────────────────────────────────────────────────────────
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+# Spreadsheet apps run cells starting with these as formulas (CSV injection)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).strftime("%Y-%m-%d %H:%M") if timezone.is_aware(value) else value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(header, rows):
+    """Yield a CSV document line by line"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_value(v) for v in row])
+
+
+# ── XLSX ──────────────────────────────────────────────────────────────────────
+# A minimal SpreadsheetML package written by hand: the worksheet is deflated
+# into the ZIP as rows arrive, so no workbook is ever built in memory.
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Cell styles: 0 default, 1 bold (header), 2 date, 3 date-time
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="4">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+_XLSX_EPOCH = datetime.datetime(1899, 12, 30)
+
+# Characters XML 1.0 does not allow, even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _workbook_xml(sheet_name):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _xlsx_cell(value, bold=False):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f"<c><v>{value}</v></c>"
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.make_naive(timezone.localtime(value))
+        serial = (value - _XLSX_EPOCH).total_seconds() / 86400
+        return f'<c s="3"><v>{serial:.6f}</v></c>'
+    if isinstance(value, datetime.date):
+        return f'<c s="2"><v>{(value - _XLSX_EPOCH.date()).days}</v></c>'
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    style = ' s="1"' if bold else ""
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values, bold=False):
+    return "<row>" + "".join(_xlsx_cell(v, bold) for v in values) + "</row>"
+
+
+def iter_xlsx(header, rows, sheet_name="Sheet1", flush_every=500):
+    """Yield an XLSX workbook with one sheet, header row in bold"""
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr("xl/workbook.xml", _workbook_xml(sheet_name))
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header, bold=True).encode())
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row).encode())
+                if count % flush_every == 0:
+                    yield stream.pop()
+            sheet.write(b"</sheetData></worksheet>")
+    yield stream.pop()
+
+
+# ── List view exports ─────────────────────────────────────────────────────────
+
+class CSVRenderer(BaseRenderer):
+    """Accepts ?format=csv in content negotiation; ExportMixin writes the body."""
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data)
+
+
+class XLSXRenderer(CSVRenderer):
+    media_type = XLSX_CONTENT_TYPE
+    format = "xlsx"
+    charset = None
+
+
+EXPORT_RENDERERS = (CSVRenderer, XLSXRenderer)
+
+
+def choice_label(choices):
+    """Column formatter showing a choice field's display label"""
+    labels = dict(choices)
+    return lambda value: labels.get(value, value)
+
+
+def joined(*parts):
+    """Column formatter joining several lookups with spaces, skipping blanks"""
+    return " ".join(str(p) for p in parts if p not in (None, ""))
+
+
+class ExportMixin:
+    """
+    Adds ?format=csv and ?format=xlsx to a list view. Every row of
+    filter_queryset(get_queryset()) is streamed, ignoring pagination.
+
+    export_columns is a list of (header, lookup) or (header, lookups, formatter):
+    lookup is a values_list() path, lookups a tuple of paths passed together to
+    formatter (e.g. joined), and formatter a callable producing the cell value.
+    """
+    export_columns = ()
+    export_filename = "export"
+    export_chunk_size = 2000
+
+    def get_renderers(self):
+        return super().get_renderers() + [renderer() for renderer in EXPORT_RENDERERS]
+
+    def list(self, request, *args, **kwargs):
+        if isinstance(request.accepted_renderer, EXPORT_RENDERERS):
+            return self.export(request.accepted_renderer.format)
+        return super().list(request, *args, **kwargs)
+
+    def export_rows(self, queryset):
+        columns = []
+        paths = []
+        for column in self.export_columns:
+            lookups = column[1] if isinstance(column[1], tuple) else (column[1],)
+            formatter = column[2] if len(column) > 2 else None
+            columns.append((len(paths), len(lookups), formatter))
+            paths.extend(lookups)
+
+        for values in queryset.values_list(*paths).iterator(chunk_size=self.export_chunk_size):
+            row = []
+            for start, size, formatter in columns:
+                cell = values[start:start + size]
+                row.append(formatter(*cell) if formatter else cell[0])
+            yield row
+
+    def export(self, export_format):
+        header = [column[0] for column in self.export_columns]
+        rows = self.export_rows(self.filter_queryset(self.get_queryset()))
+        if export_format == "xlsx":
+            content, content_type = iter_xlsx(header, rows, sheet_name=self.export_filename.title()), XLSX_CONTENT_TYPE
+        else:
+            content, content_type = iter_csv(header, rows), "text/csv"
+
+        filename = f"{self.export_filename}_{timezone.localdate():%Y%m%d}.{export_format}"
+        return streaming_response(self.request, content, content_type, filename)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Errors (and POST replies on list-create views) stay JSON under ?format=csv
+        if isinstance(response, Response) and isinstance(getattr(request, "accepted_renderer", None), EXPORT_RENDERERS):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,370 @@
+# backend/pdf_utils.py
+#
+# Shared ReportLab building blocks for EduQuest documents (fee receipts,
+# subscription invoices, report cards), an optional store for rendered PDFs and
+# a process-pool helper for rendering many documents at once.
+#
+# Paragraph and table styles are built once per theme and reused by every
+# render; flowables themselves are created per document because ReportLab
+# mutates them while laying out a page.
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
+from io import BytesIO
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
+
+# ── Palette ───────────────────────────────────────────────────────────────────
+SUCCESS     = colors.HexColor("#059669")   # emerald-600
+SUCCESS_BG  = colors.HexColor("#D1FAE5")   # emerald-100
+DARK        = colors.HexColor("#111827")
+MID         = colors.HexColor("#6B7280")
+LIGHT_LINE  = colors.HexColor("#E5E7EB")
+WHITE       = colors.white
+AMBER       = colors.HexColor("#D97706")
+AMBER_BG    = colors.HexColor("#FFFBEB")
+
+
+class Theme(NamedTuple):
+    name: str
+    brand: colors.Color         # banners and table headers
+    brand_light: colors.Color   # table body tint
+    brand_muted: colors.Color   # secondary text on the brand colour
+
+
+BLUE   = Theme("blue",   colors.HexColor("#2563EB"), colors.HexColor("#EFF6FF"), colors.HexColor("#BFDBFE"))
+INDIGO = Theme("indigo", colors.HexColor("#4F46E5"), colors.HexColor("#EEF2FF"), colors.HexColor("#C7D2FE"))
+
+PAGE_MARGIN = 15*mm
+CONTENT_WIDTH = A4[0] - 2 * PAGE_MARGIN
+
+
+# ── Cached styles ─────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def paragraph_styles(theme: Theme) -> dict:
+    """Text styles for a theme, built once per process."""
+    def _s(key, **kw) -> ParagraphStyle:
+        return ParagraphStyle(f"{theme.name}-{key}", **kw)
+
+    return {
+        "brand_title":  _s("BT",  fontName="Helvetica-Bold", fontSize=22, textColor=WHITE, alignment=TA_LEFT),
+        "brand_sub":    _s("BS",  fontName="Helvetica",      fontSize=10, textColor=theme.brand_muted, alignment=TA_LEFT),
+        "doc_label":    _s("DL",  fontName="Helvetica-Bold", fontSize=11, textColor=WHITE, alignment=TA_RIGHT),
+        "doc_val":      _s("DV",  fontName="Helvetica",      fontSize=10, textColor=theme.brand_muted, alignment=TA_RIGHT),
+        "section_head": _s("SH",  fontName="Helvetica-Bold", fontSize=9,  textColor=MID,   spaceAfter=3),
+        "bold_dark":    _s("BD",  fontName="Helvetica-Bold", fontSize=11, textColor=DARK),
+        "normal_dark":  _s("ND",  fontName="Helvetica",      fontSize=10, textColor=DARK),
+        "normal_mid":   _s("NM",  fontName="Helvetica",      fontSize=9,  textColor=MID),
+        "right_bold":   _s("RB",  fontName="Helvetica-Bold", fontSize=11, textColor=DARK,  alignment=TA_RIGHT),
+        "amount_bold":  _s("AB",  fontName="Helvetica-Bold", fontSize=12, textColor=DARK,  alignment=TA_RIGHT),
+        "th_white":     _s("TW",  fontName="Helvetica-Bold", fontSize=9,  textColor=WHITE),
+        "th_center":    _s("TC",  fontName="Helvetica-Bold", fontSize=9,  textColor=WHITE, alignment=TA_CENTER),
+        "th_right":     _s("TR",  fontName="Helvetica-Bold", fontSize=9,  textColor=WHITE, alignment=TA_RIGHT),
+        "td_center":    _s("TDC", fontName="Helvetica",      fontSize=10, textColor=DARK,  alignment=TA_CENTER),
+        "td_mid":       _s("TDM", fontName="Helvetica",      fontSize=9,  textColor=MID,   alignment=TA_CENTER),
+        "total_label":  _s("TL",  fontName="Helvetica-Bold", fontSize=13, textColor=WHITE, alignment=TA_LEFT),
+        "total_amt":    _s("TA",  fontName="Helvetica-Bold", fontSize=16, textColor=WHITE, alignment=TA_RIGHT),
+        "paid_badge":   _s("PB",  fontName="Helvetica-Bold", fontSize=10, textColor=SUCCESS, alignment=TA_CENTER),
+        "note":         _s("NT",  fontName="Helvetica",      fontSize=9,  textColor=MID,   leftIndent=6),
+        "footer":       _s("FT",  fontName="Helvetica",      fontSize=8,  textColor=MID,   alignment=TA_CENTER),
+        "method_label": _s("ML",  fontName="Helvetica-Bold", fontSize=9,  textColor=AMBER),
+        "method_val":   _s("MV",  fontName="Helvetica",      fontSize=9,  textColor=DARK),
+    }
+
+
+NO_PADDING = TableStyle([
+    ("VALIGN",        (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING",   (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING",  (0, 0), (-1, -1), 0),
+    ("TOPPADDING",    (0, 0), (-1, -1), 0),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+])
+
+VSTACK = TableStyle([
+    ("LEFTPADDING",  (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+    ("TOPPADDING",   (0, 0), (-1, -1), 1),
+    ("BOTTOMPADDING",(0, 0), (-1, -1), 1),
+])
+
+PAID_BADGE = TableStyle([
+    ("BACKGROUND",    (0, 0), (-1, -1), SUCCESS_BG),
+    ("TOPPADDING",    (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ("LINEABOVE",     (0, 0), (-1, 0),  1, SUCCESS),
+    ("LINEBELOW",     (0, -1), (-1, -1), 1, SUCCESS),
+    ("LINEBEFORE",    (0, 0), (0, -1),  1, SUCCESS),
+    ("LINEAFTER",     (-1, 0), (-1, -1), 1, SUCCESS),
+])
+
+NOTICE = TableStyle([
+    ("BACKGROUND",    (0, 0), (-1, -1), AMBER_BG),
+    ("TOPPADDING",    (0, 0), (-1, -1), 7),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 7),
+    ("LEFTPADDING",   (0, 0), (-1, -1), 10),
+    ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
+    ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
+    ("LINEABOVE",     (0, 0), (-1, 0),  0.5, AMBER),
+    ("LINEBELOW",     (0, -1), (-1, -1), 0.5, AMBER),
+    ("LINEBEFORE",    (0, 0), (0, -1),  0.5, AMBER),
+    ("LINEAFTER",     (-1, 0), (-1, -1), 0.5, AMBER),
+])
+
+
+@lru_cache(maxsize=None)
+def table_styles(theme: Theme) -> dict:
+    """Themed table styles, built once per process."""
+    def banner(top, bottom):
+        return TableStyle([
+            ("BACKGROUND",    (0, 0), (-1, -1), theme.brand),
+            ("TOPPADDING",    (0, 0), (-1, -1), top),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), bottom),
+            ("LEFTPADDING",   (0, 0), (0, -1),  14),
+            ("RIGHTPADDING",  (-1, 0), (-1, -1), 14),
+            ("VALIGN",        (0, 0), (-1, -1), "TOP"),
+        ])
+
+    return {
+        "banner_top": banner(14, 5),
+        "banner_bottom": banner(0, 14),
+        "items": TableStyle([
+            ("BACKGROUND",    (0, 0), (-1, 0), theme.brand),
+            ("BACKGROUND",    (0, 1), (-1, -1), theme.brand_light),
+            ("TOPPADDING",    (0, 0), (-1, -1), 9),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 9),
+            ("LEFTPADDING",   (0, 0), (-1, -1), 10),
+            ("RIGHTPADDING",  (-1, 0), (-1, -1), 10),
+            ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
+            ("LINEBELOW",     (0, 0), (-1, -1), 0.5, LIGHT_LINE),
+        ]),
+        "total": TableStyle([
+            ("BACKGROUND",    (0, 0), (-1, -1), theme.brand),
+            ("TOPPADDING",    (0, 0), (-1, -1), 12),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+            ("LEFTPADDING",   (0, 0), (0, -1),  14),
+            ("RIGHTPADDING",  (-1, 0), (-1, -1), 14),
+            ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
+        ]),
+    }
+
+
+# ── Document pieces ───────────────────────────────────────────────────────────
+
+def new_document(buffer: BytesIO, **kw) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
+        buffer, pagesize=A4,
+        rightMargin=PAGE_MARGIN, leftMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,   bottomMargin=PAGE_MARGIN,
+        **kw,
+    )
+
+
+def vstack(items: list, width: float) -> Table:
+    """Stack a list of flowables in a single-column table."""
+    t = Table([[i] for i in items], colWidths=[width])
+    t.setStyle(VSTACK)
+    return t
+
+
+def two_columns(left: list, right: list, width: float = CONTENT_WIDTH) -> Table:
+    """Two equal vstacks side by side."""
+    t = Table([[vstack(left, width * 0.50), vstack(right, width * 0.50)]],
+              colWidths=[width * 0.50, width * 0.50])
+    t.setStyle(NO_PADDING)
+    return t
+
+
+def header_banner(theme: Theme, doc_label: str, sub_left: str, sub_right: str,
+                  width: float = CONTENT_WIDTH) -> list:
+    """Brand banner: 'EduQuest' + document label, then a sub line."""
+    ST, TS = paragraph_styles(theme), table_styles(theme)
+    cols = [width * 0.55, width * 0.45]
+
+    top = Table([[Paragraph("EduQuest", ST["brand_title"]),
+                  Paragraph(doc_label, ST["doc_label"])]], colWidths=cols)
+    top.setStyle(TS["banner_top"])
+
+    bottom = Table([[Paragraph(sub_left, ST["brand_sub"]),
+                     Paragraph(sub_right, ST["doc_val"])]], colWidths=cols)
+    bottom.setStyle(TS["banner_bottom"])
+    return [top, bottom]
+
+
+def items_table(theme: Theme, rows: list, col_widths: list, row_heights=None) -> Table:
+    t = Table(rows, colWidths=col_widths, rowHeights=row_heights)
+    t.setStyle(table_styles(theme)["items"])
+    return t
+
+
+def total_banner(theme: Theme, label: str, amount: str, width: float = CONTENT_WIDTH) -> Table:
+    ST = paragraph_styles(theme)
+    t = Table([[Paragraph(label, ST["total_label"]), Paragraph(amount, ST["total_amt"])]],
+              colWidths=[width * 0.60, width * 0.40])
+    t.setStyle(table_styles(theme)["total"])
+    return t
+
+
+def paid_badge(theme: Theme, text: str, width: float = CONTENT_WIDTH) -> Table:
+    t = Table([[Paragraph(text, paragraph_styles(theme)["paid_badge"])]], colWidths=[width])
+    t.setStyle(PAID_BADGE)
+    return t
+
+
+def notice(cells: list, col_widths: list) -> Table:
+    """Amber call-out row, e.g. the payment method strip on receipts."""
+    t = Table([cells], colWidths=col_widths)
+    t.setStyle(NOTICE)
+    return t
+
+
+def rule(thickness=1) -> HRFlowable:
+    return HRFlowable(width="100%", thickness=thickness, color=LIGHT_LINE)
+
+
+def footer(theme: Theme, text: str) -> list:
+    return [rule(0.5), Spacer(1, 3*mm), Paragraph(text, paragraph_styles(theme)["footer"])]
+
+
+# ── Rendered PDF store ────────────────────────────────────────────────────────
+# Rendered documents are stored under "<kind>:<id>:<fingerprint>", where the
+# fingerprint hashes every value printed on the page. Editing a payment (or the
+# student/tenant names shown on it) therefore produces a new key instead of
+# serving a stale PDF. Pick the store with RENDERED_PDF_STORE.
+
+class NullStore:
+    """Never stores anything: every download re-renders."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, pdf):
+        pass
+
+
+class CacheStore:
+    """Keeps PDFs in a Django cache (RENDERED_PDF_CACHE alias, RENDERED_PDF_TTL seconds)."""
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, "RENDERED_PDF_CACHE", "default")]
+        self.timeout = getattr(settings, "RENDERED_PDF_TTL", 86400)
+
+    def get(self, key):
+        return self.cache.get(f"pdf:{key}")
+
+    def set(self, key, pdf):
+        self.cache.set(f"pdf:{key}", pdf, self.timeout)
+
+
+class FileStore:
+    """
+    Keeps PDFs as files under RENDERED_PDF_DIR, shared by every worker on the
+    host, as <kind>/<hash of id>/<fingerprint>.pdf. Storing a document deletes
+    its older renderings, so there is at most one file per document; files of
+    deleted records stay until something outside the app prunes the directory
+    (e.g. a cron job removing files not modified for RENDERED_PDF_TTL).
+    """
+
+    def __init__(self):
+        self.root = getattr(settings, "RENDERED_PDF_DIR", None) or os.path.join(tempfile.gettempdir(), "eduquest-pdfs")
+
+    def _path(self, key):
+        kind, _, rest = key.partition(":")
+        identifier, _, fingerprint = rest.rpartition(":")
+        return os.path.join(self.root, kind, hashlib.sha1(identifier.encode()).hexdigest(), f"{fingerprint}.pdf")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key, pdf):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a concurrent reader never sees half a file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp, path)
+
+        # Older renderings of the same document can no longer be requested
+        for entry in os.scandir(os.path.dirname(path)):
+            if entry.name.endswith(".pdf") and entry.path != path:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+@lru_cache(maxsize=None)
+def get_pdf_store():
+    return import_string(getattr(settings, "RENDERED_PDF_STORE", "backend.pdf_utils.CacheStore"))()
+
+
+def fingerprint(context: dict) -> str:
+    return hashlib.sha1(json.dumps(context, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def cached_pdf(kind: str, identifier, context: dict, render) -> bytes:
+    """Return render(context), reusing an earlier rendering of the same content."""
+    key = f"{kind}:{identifier}:{fingerprint(context)}"
+    store = get_pdf_store()
+    pdf = store.get(key)
+    if pdf is None:
+        pdf = render(context)
+        store.set(key, pdf)
+    return pdf
+
+
+# ── Batch rendering ───────────────────────────────────────────────────────────
+
+# Below this many documents the pool's start-up costs more than it saves
+POOL_THRESHOLD = 8
+
+
+def render_many(render, contexts, workers=None):
+    """
+    Yield (context, render(context)) in input order. contexts may be any
+    iterable (e.g. a generator over a queryset iterator); renders in a process
+    pool when there are enough documents, and keeps at most two batches of PDFs
+    in flight so memory stays flat however many documents there are.
+    render and the contexts must be picklable: module-level function, plain data.
+    """
+    workers = workers or os.cpu_count() or 1
+    contexts = iter(contexts)
+    head = list(islice(contexts, POOL_THRESHOLD))
+    if workers <= 1 or len(head) < POOL_THRESHOLD:
+        for ctx in chain(head, contexts):
+            yield ctx, render(ctx)
+        return
+
+    contexts = chain(head, contexts)
+    batch_size = workers * 8
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Submit the next batch before handing out the current one, so the
+        # workers keep rendering while the caller writes
+        in_flight = None
+        while True:
+            batch = list(islice(contexts, batch_size))
+            submitted = (batch, pool.map(render, batch, chunksize=max(1, len(batch) // (workers * 2)))) if batch else None
+            if in_flight:
+                yield from zip(*in_flight)
+            if submitted is None:
+                break
+            in_flight = submitted
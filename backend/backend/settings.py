@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import tempfile
 import cloudinary
 from datetime import timedelta
 
@@ -58,6 +59,7 @@ INSTALLED_APPS = [
     'finance',
     'chatvideo',
     'notifications',
+    'jobs',
     'cloudinary',
     'cloudinary_storage',
     "rest_framework_simplejwt.token_blacklist",   
@@ -120,15 +122,49 @@ AUTH_USER_MODEL = "accounts.User"
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'django.db.backends.postgresql',
         'NAME': os.getenv("DB_NAME"),
         'USER': os.getenv("DB_USER"),
         'PASSWORD': os.getenv("DB_PASSWORD"),
         'HOST':os.getenv("DB_HOST"),
         'PORT':os.getenv("DB_PORT"),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
 
+# Database connections - DB_CONN_MODE:
+#   "off"        (default) connect and disconnect around every request /
+#                sync call, as with CONN_MAX_AGE 0.
+#   "persistent" opt-in: keep a thread's connection for DB_CONN_MAX_AGE
+#                seconds. Works with psycopg2 and psycopg 3, but under Daphne
+#                it only helps long-lived threads (websocket auth via
+#                database_sync_to_async), not HTTP requests.
+#   "pool"       opt-in psycopg 3 connection pool per process; needs
+#                `pip install "psycopg[binary,pool]"` in place of psycopg2.
+#                Under Daphne each HTTP request runs its sync code on a new
+#                thread, so only a pool lets requests reuse connections.
+DB_CONN_MODE = os.getenv("DB_CONN_MODE", "off")
+
+if DB_CONN_MODE == "pool":
+    # Sized to Daphne's sync thread executor (ASGI_THREADS, else Python's
+    # default of min(32, CPUs + 4)) so a busy process never has more threads
+    # wanting a connection than the pool holds. The size is per Daphne
+    # process: keep it times the process count under Postgres max_connections.
+    # Requests past it wait DB_POOL_TIMEOUT seconds.
+    ASGI_THREADS = int(os.getenv("ASGI_THREADS", min(32, (os.cpu_count() or 1) + 4)))
+    DATABASES['default']['OPTIONS']['pool'] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", ASGI_THREADS)),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+elif DB_CONN_MODE == "persistent":
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+# Behind PgBouncer in transaction mode named cursors (QuerySet.iterator(),
+# used by the exports) can't span transactions; set this to True there
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = os.getenv("DB_DISABLE_SERVER_SIDE_CURSORS", "False") == "True"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -168,6 +204,23 @@ STATIC_URL = 'static/'
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Files background jobs produce for download (report cards, receipt exports)
+# are private: they are kept outside MEDIA and the source tree and only served
+# through the authenticated /api/jobs/artifacts/<id>/download/ endpoint. Point
+# ARTIFACTS_ROOT at persistent storage shared by the web and worker processes;
+# the purge_artifacts command deletes them after ARTIFACT_TTL_DAYS.
+ARTIFACTS_ROOT = os.getenv("ARTIFACTS_ROOT", os.path.join(tempfile.gettempdir(), "school-artifacts"))
+ARTIFACT_TTL_DAYS = int(os.getenv("ARTIFACT_TTL_DAYS", "7"))
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "artifacts": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": ARTIFACTS_ROOT},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -183,24 +236,79 @@ REST_FRAMEWORK = {
 }
 
 
-# CHANNEL_LAYERS - switches automatically based on .env
+# CHANNEL_LAYERS and CACHES - switch automatically based on .env
 USE_REDIS = os.getenv("USE_REDIS", "False") == "True"
+REDIS_HOST = os.getenv("REDIS_HOST", "127.0.0.1")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 
 if USE_REDIS:
     CHANNEL_LAYERS = {
         "default": {
             "BACKEND": "channels_redis.core.RedisChannelLayer",
             "CONFIG": {
-                "hosts": [("127.0.0.1", 6379)],
+                "hosts": [(REDIS_HOST, REDIS_PORT)],
             },
         },
     }
+    # Database 1, apart from the channel layer's database 0
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_CACHE_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/1"),
+            "KEY_PREFIX": "eduquest",
+        }
+    }
 else:
     CHANNEL_LAYERS = {
         "default": {
             "BACKEND": "channels.layers.InMemoryChannelLayer"
         }
     }
+    # Per-process cache: enough for tests and a single development server
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "eduquest",
+        }
+    }
+
+# Seconds a cached_view response (backend/cache.py) stays cached
+CACHED_VIEW_TTL = int(os.getenv("CACHED_VIEW_TTL", "300"))
+
+# Upper bound on a compiled timetable grid's life; writes invalidate it sooner
+TIMETABLE_CACHE_TTL = int(os.getenv("TIMETABLE_CACHE_TTL", "3600"))
+
+
+# Seconds a tenant's subscription entitlement stays cached for HasActiveSubscription
+SUBSCRIPTION_ENTITLEMENT_TTL = int(os.getenv("SUBSCRIPTION_ENTITLEMENT_TTL", "300"))
+
+
+# Background jobs: DatabaseBackend queues for `manage.py run_jobs`, EagerBackend runs inline (tests)
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "jobs.queue.DatabaseBackend")
+
+
+# Seconds an exam's analytics stay cached (result writes invalidate them sooner)
+EXAM_ANALYTICS_TTL = int(os.getenv("EXAM_ANALYTICS_TTL", "3600"))
+
+
+# Processes used to render report-card PDFs (0 = one per CPU)
+REPORT_CARD_WORKERS = int(os.getenv("REPORT_CARD_WORKERS", "0"))
+
+
+# Rendered receipts/invoices: CacheStore (RENDERED_PDF_CACHE alias), FileStore (RENDERED_PDF_DIR) or NullStore
+RENDERED_PDF_STORE = os.getenv("RENDERED_PDF_STORE", "backend.pdf_utils.CacheStore")
+RENDERED_PDF_TTL = int(os.getenv("RENDERED_PDF_TTL", "86400"))
+RENDERED_PDF_DIR = os.getenv("RENDERED_PDF_DIR", "")
+
+
+# Processes used to render bulk fee-receipt exports (0 = one per CPU)
+RECEIPT_EXPORT_WORKERS = int(os.getenv("RECEIPT_EXPORT_WORKERS", "0"))
+
+
+# User provisioning (users/provisioning.py): processes hashing passwords for
+# batches (0 = one per CPU); bulk student import: rows per file
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+STUDENT_IMPORT_MAX_ROWS = int(os.getenv("STUDENT_IMPORT_MAX_ROWS", "5000"))
 
 
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
@@ -30,4 +30,5 @@ urlpatterns = [
     path('api/finance/',include('finance.urls')),
     path('api/chatvideo/',include('chatvideo.urls')),
     path('api/notifications/',include('notifications.urls')),
+    path('api/jobs/',include('jobs.urls')),
 ]
@@ -0,0 +1,78 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from classroom.timetable_solver import solve_timetable, TimetableInfeasible
+
+
+# Weekly periods per subject for each class (44 of a 6 x 8 week by default)
+SUBJECT_PERIODS = [6, 6, 6, 5, 5, 4, 4, 3, 3, 2]
+
+
+def synthetic_school(classes, teachers, subject_periods=SUBJECT_PERIODS):
+    """
+    Requirements for a school where every class takes every subject and each
+    teacher teaches one subject, teachers shared out in proportion to demand.
+    """
+    total = sum(subject_periods) * classes
+    pools, next_teacher = [], 0
+    for index, periods in enumerate(subject_periods):
+        if index == len(subject_periods) - 1:
+            size = teachers - next_teacher
+        else:
+            size = max(1, round(teachers * periods * classes / total))
+        size = max(1, min(size, teachers - next_teacher - (len(subject_periods) - index - 1)))
+        pools.append(list(range(next_teacher, next_teacher + size)))
+        next_teacher += size
+
+    return [
+        (cls, subject, pools[subject][cls % len(pools[subject])], periods)
+        for cls in range(classes)
+        for subject, periods in enumerate(subject_periods)
+    ]
+
+
+def check_clash_free(placed):
+    classes, teachers = set(), set()
+    for cls, _, teacher, day, slot in placed:
+        if (cls, day, slot) in classes or (teacher, day, slot) in teachers:
+            return False
+        classes.add((cls, day, slot))
+        teachers.add((teacher, day, slot))
+    return True
+
+
+class Command(BaseCommand):
+    help = "Time the timetable solver on a synthetic school (in memory, nothing is written)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--classes", type=int, default=40)
+        parser.add_argument("--teachers", type=int, default=80)
+        parser.add_argument("--days", type=int, default=6)
+        parser.add_argument("--slots", type=int, default=8, help="Teaching slots per day")
+        parser.add_argument("--runs", type=int, default=5, help="Runs with seeds 0..runs-1")
+
+    def handle(self, *args, **options):
+        if options["teachers"] < len(SUBJECT_PERIODS):
+            raise CommandError(f"Need at least {len(SUBJECT_PERIODS)} teachers (one per subject)")
+        requirements = synthetic_school(options["classes"], options["teachers"])
+        lessons = sum(r[3] for r in requirements)
+        week = options["days"] * options["slots"]
+        self.stdout.write(
+            f"{options['classes']} classes, {options['teachers']} teachers, {len(requirements)} requirements, "
+            f"{lessons} lessons; {week} periods a week"
+        )
+
+        timings = []
+        for seed in range(options["runs"]):
+            began = time.perf_counter()
+            try:
+                placed = solve_timetable(requirements, options["days"], options["slots"], seed=seed)
+            except TimetableInfeasible as e:
+                self.stdout.write(f"seed {seed}: {e}")
+                continue
+            seconds = time.perf_counter() - began
+            timings.append(seconds)
+            valid = len(placed) == lessons and check_clash_free(placed)
+            self.stdout.write(f"seed {seed}: {seconds:.3f}s, {'clash-free' if valid else 'INVALID'}")
+
+        if timings:
+            self.stdout.write(f"best {min(timings):.3f}s, worst {max(timings):.3f}s, {lessons / min(timings):.0f} lessons/s")
@@ -92,5 +92,16 @@ class TimeTableEntry(models.Model):
     def __str__(self):
         return f"{self.day} | {self.slot} | {self.subject}"
 
+    def timetable_class_id(self):
+        """The timetable's class id for signal receivers; queries once per instance unless the timetable is loaded"""
+        if "_timetable_class_id" not in self.__dict__:
+            if TimeTableEntry.timetable.is_cached(self):
+                self._timetable_class_id = self.timetable.school_class_id
+            else:
+                self._timetable_class_id = (
+                    TimeTable.objects.filter(pk=self.timetable_id).values_list("school_class_id", flat=True).first()
+                )
+        return self._timetable_class_id
+
 
     
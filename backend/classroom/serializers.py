@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from . models import SchoolClass,Subject,TimeSlot,TimeTable,TimeTableEntry
+from users.models import Teacher
 
 
 class ClassSerializer(serializers.ModelSerializer):
@@ -207,4 +208,71 @@ class TimeTableEntrySerializer(serializers.ModelSerializer):
             })    
         
         return data
-    
\ No newline at end of file
+
+
+class TimetableRequirementSerializer(serializers.Serializer):
+    school_class = serializers.IntegerField()
+    subject = serializers.IntegerField()
+    teacher = serializers.IntegerField()
+    periods = serializers.IntegerField(min_value=1, help_text="Lessons per week")
+
+
+class TimetableGenerateSerializer(serializers.Serializer):
+    requirements = TimetableRequirementSerializer(many=True, allow_empty=False)
+    max_per_day = serializers.IntegerField(
+        min_value=1, required=False, allow_null=True,
+        help_text="Most lessons of one subject a class may have in a day (default: spread evenly)",
+    )
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_requirements(self, requirements):
+        tenant = self.context["request"].user.tenant
+
+        # One query per kind of id, however many requirements
+        def known(queryset, field):
+            wanted = {r[field] for r in requirements}
+            found = set(queryset.filter(id__in=wanted).values_list("id", flat=True))
+            return sorted(wanted - found)
+
+        errors = []
+        unknown = {
+            "class": known(SchoolClass.objects.filter(tenant=tenant, is_active=True), "school_class"),
+            "subject": known(Subject.objects.filter(tenant=tenant), "subject"),
+            "teacher": known(Teacher.objects.filter(user__tenant=tenant), "teacher"),
+        }
+        for label, ids in unknown.items():
+            if ids:
+                errors.append(f"Invalid {label} id(s): {', '.join(map(str, ids))}")
+
+        seen = set()
+        for r in requirements:
+            key = (r["school_class"], r["subject"])
+            if key in seen:
+                errors.append(f"Subject {r['subject']} is listed twice for class {r['school_class']}.")
+                break
+            seen.add(key)
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return requirements
+
+
+class TimetableCellSerializer(serializers.Serializer):
+    day = serializers.ChoiceField(choices=TimeTableEntry.DAYS)
+    slot = serializers.IntegerField()
+    subject = serializers.IntegerField(required=False, allow_null=True)
+    teacher = serializers.IntegerField(required=False, allow_null=True)
+    remove = serializers.BooleanField(default=False, help_text="Delete the cell's entry")
+
+
+class TimetableBulkEditSerializer(serializers.Serializer):
+    timetable = serializers.IntegerField()
+    cells = TimetableCellSerializer(many=True, allow_empty=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_timetable(self, value):
+        tenant = self.context["request"].user.tenant
+        timetable = TimeTable.objects.filter(tenant=tenant, id=value).first()
+        if timetable is None:
+            raise serializers.ValidationError("Invalid timetable.")
+        return timetable
@@ -0,0 +1,69 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from backend.cache import invalidate_on
+from .timetable_cache import bump_tenant_grids, bump_class_grids, bump_teacher_grids
+
+
+# Cached classroom views (class and subject dropdowns, timetables) go stale
+# when any of these change. Student rows count towards class sizes.
+
+invalidate_on(
+    "classroom",
+    "classroom.SchoolClass",
+    "classroom.Subject",
+    "classroom.TimeSlot",
+    "classroom.TimeTable",
+    "classroom.TimeTableEntry",
+)
+invalidate_on("classroom", "users.Student", tenant_of=lambda student: student.user.tenant_id)
+
+
+# ---------- Compiled timetable grids ----------
+
+@receiver(pre_save, sender="classroom.TimeTableEntry")
+def stash_old_entry(sender, instance, **kwargs):
+    # An edit can move a period between teachers: both grids change
+    instance._old_teacher_id = None
+    if instance.pk:
+        instance._old_teacher_id = sender.objects.filter(pk=instance.pk).values_list("teacher_id", flat=True).first()
+
+
+@receiver(post_save, sender="classroom.TimeTableEntry")
+@receiver(post_delete, sender="classroom.TimeTableEntry")
+def on_entry_changed(sender, instance, **kwargs):
+    class_id = instance.timetable_class_id()
+    if class_id:
+        bump_class_grids(class_id)
+    bump_teacher_grids(instance.teacher_id, getattr(instance, "_old_teacher_id", None))
+
+
+@receiver(post_save, sender="classroom.TimeTable")
+@receiver(post_delete, sender="classroom.TimeTable")
+def on_timetable_changed(sender, instance, **kwargs):
+    bump_class_grids(instance.school_class_id)
+
+
+@receiver(post_save, sender="classroom.TimeSlot")
+@receiver(post_delete, sender="classroom.TimeSlot")
+@receiver(post_save, sender="classroom.Subject")
+@receiver(post_delete, sender="classroom.Subject")
+@receiver(post_save, sender="classroom.SchoolClass")
+@receiver(post_delete, sender="classroom.SchoolClass")
+def on_grid_labels_changed(sender, instance, **kwargs):
+    bump_tenant_grids(instance.tenant_id)
+
+
+# Grids show teacher names, so only a changed full_name matters. It is compared
+# with the name the user was loaded with (LoadedValuesMixin), so saves need no
+# extra query.
+
+@receiver(post_save, sender="accounts.User")
+def on_teacher_renamed(sender, instance, created, update_fields=None, **kwargs):
+    # A deferred full_name that was never assigned was not saved
+    if "full_name" not in instance.__dict__ or (update_fields is not None and "full_name" not in update_fields):
+        return
+    loaded = instance.__dict__.setdefault("_loaded_values", {})
+    renamed = not created and ("full_name" not in loaded or loaded["full_name"] != instance.full_name)
+    loaded["full_name"] = instance.full_name
+    if renamed and instance.role == "teacher" and instance.tenant_id:
+        bump_tenant_grids(instance.tenant_id)
@@ -1,3 +1,207 @@
+import datetime
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import User
+from backend.cache import versions
+from users.models import Teacher
+from users.tests import make_school
+from .models import SchoolClass, Subject, TimeSlot, TimeTable, TimeTableEntry
+from .timetable_solver import TimetableInfeasible, generate_timetables, solve_timetable
 
-# Create your tests here.
+
+class TimetableTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tenant, self.admin, self.teacher, self.school_class, self.pupils = make_school()
+        self.timetable = TimeTable.objects.create(tenant=self.tenant, school_class=self.school_class)
+        self.subject = Subject.objects.create(tenant=self.tenant, name="Maths")
+        self.slots = [
+            TimeSlot.objects.create(tenant=self.tenant, start_time=datetime.time(9 + i), end_time=datetime.time(10 + i))
+            for i in range(3)
+        ]
+
+    def version(self, scope):
+        [token] = versions([f"timetable:{scope}"])
+        return token
+
+
+class TimetableSignalTests(TimetableTestCase):
+
+    def test_entry_save_bumps_its_class_grid(self):
+        before = self.version(f"class:{self.school_class.pk}")
+        with self.captureOnCommitCallbacks(execute=True):
+            TimeTableEntry.objects.create(
+                tenant=self.tenant, timetable=self.timetable, day="mon", slot=self.slots[0],
+                subject=self.subject, teacher=self.teacher,
+            )
+        self.assertNotEqual(self.version(f"class:{self.school_class.pk}"), before)
+
+    def test_timetable_class_id_reuses_a_loaded_timetable(self):
+        entry = TimeTableEntry.objects.create(tenant=self.tenant, timetable=self.timetable, day="mon", slot=self.slots[0])
+        with self.assertNumQueries(0):
+            self.assertEqual(entry.timetable_class_id(), self.school_class.pk)
+        entry = TimeTableEntry.objects.get(pk=entry.pk)
+        with self.assertNumQueries(1):
+            entry.timetable_class_id()
+            entry.timetable_class_id()
+
+    def test_only_a_teacher_rename_bumps_tenant_grids(self):
+        scope = f"tenant:{self.tenant.pk}"
+        user = User.objects.get(pk=self.teacher.user_id)
+
+        before = self.version(scope)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.last_login = datetime.datetime.now(datetime.timezone.utc)
+            user.save(update_fields=["last_login"])
+            user.phone = "123"
+            user.save()
+        self.assertEqual(self.version(scope), before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.full_name = "Renamed"
+            user.save()
+        renamed = self.version(scope)
+        self.assertNotEqual(renamed, before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(self.version(scope), renamed)
+
+
+class TimetableSolverTests(TestCase):
+
+    def test_no_class_or_teacher_has_two_lessons_at_once(self):
+        requirements = [
+            (cls, subject, teacher, 5)
+            for cls in range(3) for subject, teacher in ((0, "a"), (1, "b"), (2, (cls, "c")))
+        ]
+        placed = solve_timetable(requirements, days=5, slots_per_day=4)
+        self.assertEqual(len(placed), 45)
+        for key in (lambda e: (e[0], e[3], e[4]), lambda e: (e[2], e[3], e[4])):
+            self.assertEqual(len({key(e) for e in placed}), len(placed))
+
+    def test_max_per_day_is_a_maximum(self):
+        placed = solve_timetable([("c", "s", "t", 6)], days=3, slots_per_day=4, max_per_day=2)
+        per_day = [sum(1 for e in placed if e[3] == day) for day in range(3)]
+        self.assertEqual(per_day, [2, 2, 2])
+        with self.assertRaises(TimetableInfeasible):
+            solve_timetable([("c", "s", "t", 7)], days=3, slots_per_day=4, max_per_day=2)
+
+    def test_busy_teacher_periods_stay_free(self):
+        placed = solve_timetable([("c", "s", "t", 3)], days=1, slots_per_day=4, teacher_busy={"t": 0b0010})
+        self.assertEqual(sorted(e[4] for e in placed), [0, 2, 3])
+
+
+class GenerateTimetablesTests(TimetableTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.break_slot = TimeSlot.objects.create(
+            tenant=self.tenant, start_time=datetime.time(12, 30), end_time=datetime.time(13), is_break=True,
+        )
+        self.other_class = SchoolClass.objects.create(tenant=self.tenant, name="5", division="B", max_student=40)
+        self.other_teacher = Teacher.objects.create(user=User.objects.create(
+            username="t2@example.com", email="t2@example.com", tenant=self.tenant, role="teacher",
+        ))
+        self.other_subject = Subject.objects.create(tenant=self.tenant, name="Science")
+
+    def requirements(self, periods=6):
+        return [
+            {"school_class": cls.pk, "subject": subject.pk, "teacher": teacher.pk, "periods": periods}
+            for cls in (self.school_class, self.other_class)
+            for subject, teacher in ((self.subject, self.teacher), (self.other_subject, self.other_teacher))
+        ]
+
+    def test_replaces_teaching_entries_and_keeps_breaks(self):
+        TimeTableEntry.objects.create(tenant=self.tenant, timetable=self.timetable, day="mon", slot=self.break_slot)
+        TimeTableEntry.objects.create(
+            tenant=self.tenant, timetable=self.timetable, day="mon", slot=self.slots[0], subject=self.subject, teacher=self.teacher,
+        )
+        before = self.version(f"class:{self.school_class.pk}")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = generate_timetables(self.tenant, self.requirements())
+        self.assertEqual(summary["entries"], 24)
+
+        entries = TimeTableEntry.objects.filter(tenant=self.tenant)
+        self.assertTrue(entries.filter(timetable=self.timetable, slot=self.break_slot).exists())
+        teaching = list(entries.filter(slot__is_break=False).values_list("timetable__school_class", "teacher", "day", "slot"))
+        self.assertEqual(len(teaching), 24)
+        self.assertEqual(len({(t, d, s) for _, t, d, s in teaching}), 24)
+        self.assertNotEqual(self.version(f"class:{self.school_class.pk}"), before)
+
+    def test_dry_run_writes_nothing(self):
+        summary = generate_timetables(self.tenant, self.requirements(), dry_run=True)
+        self.assertEqual(len(summary["timetable"]), 24)
+        self.assertFalse(TimeTableEntry.objects.exists())
+
+    def test_endpoint_reports_max_per_day_that_cannot_fit(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(pk=self.admin.pk))
+        response = client.post(
+            "/api/classroom/timetables/generate/", {"requirements": self.requirements(periods=7), "max_per_day": 1}, format="json",
+        )
+        self.assertEqual(response.status_code, 400, response.data)
+        self.assertIn("at most 1 a day allows 6", response.data["error"])
+
+
+class TimetableBulkEditTests(TimetableTestCase):
+    path = "/api/classroom/timetable-entries/bulk/"
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+        self.entry = TimeTableEntry.objects.create(
+            tenant=self.tenant, timetable=self.timetable, day="mon", slot=self.slots[0], subject=self.subject, teacher=self.teacher,
+        )
+
+    def post(self, cells, **extra):
+        return self.client.post(self.path, {"timetable": self.timetable.pk, "cells": cells, **extra}, format="json")
+
+    def cell(self, day, slot, **values):
+        return {"day": day, "slot": slot.pk, "subject": self.subject.pk, "teacher": self.teacher.pk, **values}
+
+    def test_applies_creates_updates_and_removals(self):
+        other = Subject.objects.create(tenant=self.tenant, name="Science")
+        before = self.version(f"teacher:{self.teacher.pk}")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post([
+                self.cell("mon", self.slots[0], remove=True),
+                self.cell("tue", self.slots[1]),
+                self.cell("wed", self.slots[2], subject=other.pk),
+            ])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data["deleted"], response.data["created"]), (1, 2))
+        self.assertFalse(TimeTableEntry.objects.filter(pk=self.entry.pk).exists())
+        self.assertEqual(TimeTableEntry.objects.filter(timetable=self.timetable).count(), 2)
+        self.assertNotEqual(self.version(f"teacher:{self.teacher.pk}"), before)
+
+    def test_removing_a_period_bumps_its_teacher(self):
+        before = self.version(f"teacher:{self.teacher.pk}")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post([self.cell("mon", self.slots[0], remove=True)])
+        self.assertEqual((response.status_code, response.data["deleted"]), (200, 1))
+        self.assertNotEqual(self.version(f"teacher:{self.teacher.pk}"), before)
+
+    def test_clashes_reject_every_change(self):
+        other_class = SchoolClass.objects.create(tenant=self.tenant, name="6", division="A", max_student=40)
+        other_timetable = TimeTable.objects.create(tenant=self.tenant, school_class=other_class)
+        TimeTableEntry.objects.create(
+            tenant=self.tenant, timetable=other_timetable, day="tue", slot=self.slots[1], subject=self.subject, teacher=self.teacher,
+        )
+        response = self.post([
+            self.cell("mon", self.slots[0], remove=True),
+            self.cell("tue", self.slots[1]),
+            self.cell("wed", self.slots[2], subject=None),
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([(e["cell"], list(e["errors"])) for e in response.data["errors"]], [(2, ["teacher"]), (3, ["subject"])])
+        self.assertTrue(TimeTableEntry.objects.filter(pk=self.entry.pk).exists())
+
+    def test_dry_run_writes_nothing(self):
+        response = self.post([self.cell("mon", self.slots[0], remove=True)], dry_run=True)
+        self.assertEqual((response.status_code, response.data["deleted"]), (200, 1))
+        self.assertTrue(TimeTableEntry.objects.filter(pk=self.entry.pk).exists())
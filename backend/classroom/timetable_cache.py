@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.core.cache import cache
+from backend.cache import versions, bump_versions, bump_namespace
+from users.dashboard_cache import bump_dashboard_scopes
+from .models import TimeSlot, TimeTable, TimeTableEntry
+
+
+# Compiled timetable grids.
+# Every student of a class reads the same grid, so it is built once per class
+# (and once per teacher for the teacher's week) and served from the cache.
+# A grid's key embeds the version tokens of the scopes it depends on:
+#   "timetable:tenant:<id>"   slots, subjects, class and teacher names
+#   "timetable:class:<id>"    the class's entries
+#   "timetable:teacher:<id>"  the teacher's entries
+# classroom/signals.py bumps them; bulk_create / bulk_update callers call
+# bump_after_bulk_write().
+
+TIMETABLE_CACHE_TTL = getattr(settings, "TIMETABLE_CACHE_TTL", 3600)
+
+
+def bump_tenant_grids(tenant_id):
+    bump_versions(f"timetable:tenant:{tenant_id}")
+
+
+def bump_class_grids(*class_ids):
+    bump_versions(*(f"timetable:class:{class_id}" for class_id in class_ids))
+
+
+def bump_teacher_grids(*teacher_ids):
+    bump_versions(*(f"timetable:teacher:{teacher_id}" for teacher_id in teacher_ids if teacher_id))
+
+
+def bump_after_bulk_write(tenant_id, class_ids, teacher_ids):
+    """What the TimeTableEntry signals would have invalidated, for writes that skip them"""
+    bump_class_grids(*class_ids)
+    bump_teacher_grids(*teacher_ids)
+    bump_namespace(tenant_id, "classroom")
+    bump_dashboard_scopes(*(f"class:{class_id}" for class_id in class_ids))
+
+
+def _cached(kind, owner_id, scopes, build):
+    key = ":".join(["timetable", kind, str(owner_id), *versions(scopes)])
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, TIMETABLE_CACHE_TTL)
+    return data
+
+
+def compile_timetable(timetable):
+    """
+    The grid of one timetable: its class, the tenant's slots and the entries
+    per day, each day's cells in slot order.
+    """
+    school_class = timetable.school_class
+    slots = TimeSlot.objects.filter(tenant_id=timetable.tenant_id).order_by("start_time")
+    entries = (
+        TimeTableEntry.objects
+        .filter(timetable=timetable)
+        .select_related("subject", "teacher__user", "slot")
+        .order_by("slot__start_time")
+    )
+
+    days = {}
+    for entry in entries:
+        days.setdefault(entry.day, []).append({
+            "id": entry.id,
+            "slot_id": entry.slot_id,
+            "subject": entry.subject.name if entry.subject else None,
+            "subject_id": entry.subject_id,
+            "teacher": entry.teacher.user.full_name if entry.teacher else None,
+            "teacher_id": entry.teacher_id,
+            "start_time": entry.slot.start_time,
+            "end_time": entry.slot.end_time,
+            "is_break": entry.slot.is_break,
+        })
+
+    return {
+        "timetable_id": timetable.id,
+        "class_name": school_class.name,
+        "division": school_class.division,
+        "slots": [
+            {
+                "id": s.id,
+                "start_time": s.start_time,
+                "end_time": s.end_time,
+                "is_break": s.is_break,
+            }
+            for s in slots
+        ],
+        "days": days,
+    }
+
+
+def class_grid(tenant_id, class_id):
+    """The class's compiled timetable grid, or None when it has no timetable"""
+    def build():
+        timetable = (
+            TimeTable.objects
+            .filter(tenant_id=tenant_id, school_class_id=class_id)
+            .select_related("school_class")
+            .order_by("id")
+            .first()
+        )
+        # Cached as {} so classes without a timetable don't query every time
+        return compile_timetable(timetable) if timetable else {}
+
+    grid = _cached("class", class_id, [f"timetable:tenant:{tenant_id}", f"timetable:class:{class_id}"], build)
+    return grid or None
+
+
+def teacher_grid(tenant_id, teacher_id):
+    """The teacher's teaching periods per day: {day: [period, ...]}"""
+    def build():
+        entries = (
+            TimeTableEntry.objects
+            .filter(tenant_id=tenant_id, teacher_id=teacher_id, slot__is_break=False)
+            .select_related("subject", "slot", "timetable__school_class")
+            .order_by("day", "slot__start_time")
+        )
+        days = {}
+        for entry in entries:
+            days.setdefault(entry.day, []).append({
+                "subject": entry.subject.name if entry.subject else None,
+                "class_name": entry.timetable.school_class.name,
+                "division": entry.timetable.school_class.division,
+                "start_time": entry.slot.start_time,
+                "end_time": entry.slot.end_time,
+            })
+        return days
+
+    return _cached("teacher", teacher_id, [f"timetable:tenant:{tenant_id}", f"timetable:teacher:{teacher_id}"], build)
@@ -0,0 +1,135 @@
+from django.db import transaction
+from users.models import Teacher
+from .models import Subject, TimeSlot, TimeTableEntry
+from .timetable_cache import bump_after_bulk_write
+
+
+# Bulk timetable editing.
+#
+# A grid diff is a list of cells {day, slot, subject, teacher, remove} for one
+# timetable. The slots, subjects and teachers it names, the timetable's own
+# entries and the (day, slot, teacher) periods those teachers already teach in
+# other classes are each loaded with one query, so every cell is checked in
+# memory and all clashes are reported together. Nothing is written unless the
+# whole diff is valid; then it is applied with one delete, one bulk_update and
+# one bulk_create.
+
+
+def _teacher_occupancy(tenant, timetable, teacher_ids):
+    """{(day, slot_id, teacher_id): class label} for the teachers' periods in other timetables"""
+    periods = (
+        TimeTableEntry.objects
+        .filter(tenant=tenant, teacher_id__in=teacher_ids)
+        .exclude(timetable=timetable)
+        .values_list("day", "slot_id", "teacher_id", "timetable__school_class__name", "timetable__school_class__division")
+    )
+    return {
+        (day, slot_id, teacher_id): f"{name} {division}".strip()
+        for day, slot_id, teacher_id, name, division in periods
+    }
+
+
+def plan_grid_changes(tenant, timetable, cells):
+    """
+    Check a grid diff against the timetable and the tenant's other timetables.
+
+    Returns ((deleted, updated, created, unchanged), errors); errors is a list
+    of {"cell", "day", "slot", "errors"} with 1-based cell numbers.
+    """
+    slots = {slot.id: slot for slot in TimeSlot.objects.filter(tenant=tenant, id__in={c["slot"] for c in cells})}
+    wanted_subjects = {c["subject"] for c in cells if c.get("subject")}
+    wanted_teachers = {c["teacher"] for c in cells if c.get("teacher")}
+    subjects = set(Subject.objects.filter(tenant=tenant, id__in=wanted_subjects).values_list("id", flat=True))
+    teachers = set(Teacher.objects.filter(user__tenant=tenant, id__in=wanted_teachers).values_list("id", flat=True))
+
+    existing = {(entry.day, entry.slot_id): entry for entry in TimeTableEntry.objects.filter(timetable=timetable)}
+    busy = _teacher_occupancy(tenant, timetable, teachers)
+
+    deleted, updated, created, unchanged = [], [], [], 0
+    errors, seen = [], set()
+
+    for index, cell in enumerate(cells, start=1):
+        day, slot_id = cell["day"], cell["slot"]
+        subject_id, teacher_id = cell.get("subject"), cell.get("teacher")
+        slot = slots.get(slot_id)
+        cell_errors = {}
+
+        if (day, slot_id) in seen:
+            cell_errors["cell"] = "This cell appears more than once in the changes."
+        seen.add((day, slot_id))
+
+        if slot is None:
+            cell_errors["slot"] = "Invalid slot."
+        elif cell.get("remove"):
+            pass
+        elif slot.is_break:
+            if subject_id or teacher_id:
+                cell_errors["slot"] = "Break slots cannot have subject or teacher."
+        else:
+            if not subject_id:
+                cell_errors["subject"] = "Subject is required for class slots."
+            elif subject_id not in subjects:
+                cell_errors["subject"] = "Invalid subject."
+
+            if not teacher_id:
+                cell_errors["teacher"] = "Teacher is required for class slots."
+            elif teacher_id not in teachers:
+                cell_errors["teacher"] = "Invalid teacher."
+            elif (day, slot_id, teacher_id) in busy:
+                cell_errors["teacher"] = (
+                    f"This teacher is already assigned to {busy[(day, slot_id, teacher_id)]} at this time"
+                )
+
+        if cell_errors:
+            errors.append({"cell": index, "day": day, "slot": slot_id, "errors": cell_errors})
+            continue
+
+        entry = existing.get((day, slot_id))
+        if cell.get("remove"):
+            if entry is not None:
+                deleted.append(entry)
+        elif entry is None:
+            created.append(TimeTableEntry(
+                tenant=tenant,
+                timetable=timetable,
+                day=day,
+                slot=slot,
+                subject_id=subject_id or None,
+                teacher_id=teacher_id or None,
+            ))
+        elif (entry.subject_id, entry.teacher_id) != (subject_id or None, teacher_id or None):
+            entry._old_teacher_id = entry.teacher_id
+            entry.subject_id, entry.teacher_id = subject_id or None, teacher_id or None
+            updated.append(entry)
+        else:
+            unchanged += 1
+
+    return (deleted, updated, created, unchanged), errors
+
+
+def apply_grid_changes(tenant, timetable, cells, dry_run=False):
+    """
+    Apply a grid diff to the timetable in one transaction.
+    Returns (summary, errors); nothing is written when errors is non-empty.
+    """
+    with transaction.atomic():
+        (deleted, updated, created, unchanged), errors = plan_grid_changes(tenant, timetable, cells)
+        summary = {"deleted": len(deleted), "updated": len(updated), "created": len(created), "unchanged": unchanged}
+        if errors or dry_run:
+            return summary, errors
+
+        # The delete sends the per-row signals; bulk_update and bulk_create
+        # skip them, so what they would invalidate is bumped once below
+        if deleted:
+            TimeTableEntry.objects.filter(id__in=[entry.id for entry in deleted]).select_related("timetable").delete()
+        if updated:
+            TimeTableEntry.objects.bulk_update(updated, ["subject", "teacher"])
+        if created:
+            TimeTableEntry.objects.bulk_create(created)
+
+        if updated or created:
+            teacher_ids = {entry.teacher_id for entry in updated + created}
+            teacher_ids |= {entry._old_teacher_id for entry in updated}
+            bump_after_bulk_write(tenant.id, [timetable.school_class_id], teacher_ids)
+
+    return summary, errors
@@ -0,0 +1,341 @@
+import random
+import time
+from django.db import transaction
+from users.models import Teacher
+from .models import SchoolClass, Subject, TimeSlot, TimeTable, TimeTableEntry
+from .timetable_cache import bump_after_bulk_write
+
+
+# Automatic timetable generation.
+#
+# A week is days x teaching slots; period p = day * slots_per_day + slot, and
+# every class's and teacher's free periods are one int used as a bitset.
+# Each requirement (class, subject, teacher, periods per week) is a group of
+# identical lessons. The search places one lesson at a time:
+#   - variable: the group with the least slack (free candidate periods minus
+#     lessons still to place), so the most constrained lessons go first
+#   - value: the candidate period on the day the group has used least, to
+#     spread a subject over the week; ties broken randomly
+#   - forward checking: after each placement every group sharing the class or
+#     teacher must still have room for its lessons (counting the daily cap),
+#     and each class's and teacher's remaining lessons must fit in the union
+#     of its groups' candidates
+# A group may take at most max_per_day lessons a day; without max_per_day,
+# ceil(periods / days), the fewest that still fit the week.
+# Searches that run past max_backtracks restart with a new random seed.
+
+MAX_BACKTRACKS = 20000
+RESTARTS = 8
+
+
+class TimetableInfeasible(Exception):
+    """No clash-free timetable satisfies the requirements"""
+
+
+class _Group:
+    __slots__ = ("index", "cls", "teacher", "remaining", "cap", "day_counts", "allowed", "slack")
+
+    def __init__(self, index, cls, teacher, periods, cap, days, full):
+        self.index = index
+        self.cls = cls
+        self.teacher = teacher
+        self.remaining = periods
+        self.cap = cap
+        self.day_counts = [0] * days
+        self.allowed = full
+        self.slack = None
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _search(requirements, days, slots_per_day, teacher_busy, max_per_day, rng, max_backtracks):
+    """
+    One randomised depth-first search. Returns [(requirement index, period)],
+    None when the backtrack budget ran out, or raises TimetableInfeasible when
+    the whole space was exhausted.
+    """
+    full = (1 << (days * slots_per_day)) - 1
+    day_masks = [((1 << slots_per_day) - 1) << (d * slots_per_day) for d in range(days)]
+
+    classes, teachers = {}, {}
+    groups = []
+    for index, (class_key, _, teacher_key, periods) in enumerate(requirements):
+        cls = classes.setdefault(class_key, len(classes))
+        teacher = teachers.setdefault(teacher_key, len(teachers))
+        cap = max_per_day or -(-periods // days)
+        groups.append(_Group(index, cls, teacher, periods, cap, days, full))
+
+    class_free = [full] * len(classes)
+    teacher_free = [full & ~teacher_busy.get(key, 0) for key in teachers]
+    class_demand = [0] * len(classes)
+    teacher_demand = [0] * len(teachers)
+    by_class = [[] for _ in classes]
+    by_teacher = [[] for _ in teachers]
+    for g in groups:
+        class_demand[g.cls] += g.remaining
+        teacher_demand[g.teacher] += g.remaining
+        by_class[g.cls].append(g)
+        by_teacher[g.teacher].append(g)
+
+    def candidates(g):
+        return class_free[g.cls] & teacher_free[g.teacher] & g.allowed
+
+    def capacity(g, cands):
+        # Lessons the candidates can take, at most cap - used on each day
+        if g.cap >= slots_per_day:
+            return cands.bit_count()
+        total = 0
+        for d, mask in enumerate(day_masks):
+            n = (cands & mask).bit_count()
+            if n:
+                total += min(n, g.cap - g.day_counts[d])
+        return total
+
+    def fits(members, demand):
+        union = 0
+        for h in members:
+            if h.remaining:
+                cands = candidates(h)
+                h.slack = capacity(h, cands) - h.remaining
+                if h.slack < 0:
+                    return False
+                union |= cands
+        return union.bit_count() >= demand
+
+    def consistent(g):
+        return fits(by_class[g.cls], class_demand[g.cls]) and fits(by_teacher[g.teacher], teacher_demand[g.teacher])
+
+    def assign(g, p):
+        bit = 1 << p
+        class_free[g.cls] ^= bit
+        teacher_free[g.teacher] ^= bit
+        class_demand[g.cls] -= 1
+        teacher_demand[g.teacher] -= 1
+        g.remaining -= 1
+        d = p // slots_per_day
+        g.day_counts[d] += 1
+        if g.day_counts[d] == g.cap:
+            g.allowed &= ~day_masks[d]
+
+    def unassign(g, p):
+        for h in by_class[g.cls]:
+            h.slack = None
+        for h in by_teacher[g.teacher]:
+            h.slack = None
+        bit = 1 << p
+        class_free[g.cls] |= bit
+        teacher_free[g.teacher] |= bit
+        class_demand[g.cls] += 1
+        teacher_demand[g.teacher] += 1
+        g.remaining += 1
+        d = p // slots_per_day
+        if g.day_counts[d] == g.cap:
+            g.allowed |= day_masks[d]
+        g.day_counts[d] -= 1
+
+    def select():
+        best, best_key = None, None
+        for g in groups:
+            if g.remaining:
+                if g.slack is None:
+                    g.slack = capacity(g, candidates(g)) - g.remaining
+                key = (g.slack, -teacher_demand[g.teacher])
+                if best is None or key < best_key:
+                    best, best_key = g, key
+        return best
+
+    def ordered(g):
+        periods = list(_bits(candidates(g)))
+        rng.shuffle(periods)
+        periods.sort(key=lambda p: g.day_counts[p // slots_per_day])
+        return periods
+
+    if not all(consistent(g) for g in groups):
+        raise TimetableInfeasible("The requirements cannot fit the week's free periods.")
+
+    first = select()
+    if first is None:
+        return []
+    frames = [[first, ordered(first), 0, None]]
+    backtracks = 0
+
+    while frames:
+        frame = frames[-1]
+        g, periods, i, placed = frame
+        if placed is not None:
+            unassign(g, placed)
+            frame[3] = placed = None
+
+        while i < len(periods):
+            p = periods[i]
+            i += 1
+            assign(g, p)
+            if consistent(g):
+                frame[2], frame[3] = i, p
+                placed = p
+                break
+            unassign(g, p)
+
+        if placed is None:
+            frames.pop()
+            backtracks += 1
+            if backtracks > max_backtracks:
+                return None
+            continue
+
+        following = select()
+        if following is None:
+            return [(f[0].index, f[3]) for f in frames]
+        frames.append([following, ordered(following), 0, None])
+
+    raise TimetableInfeasible("No clash-free timetable exists for these requirements.")
+
+
+def solve_timetable(requirements, days, slots_per_day, teacher_busy=None, max_per_day=None,
+                    seed=0, max_backtracks=MAX_BACKTRACKS, restarts=RESTARTS):
+    """
+    Place every lesson of requirements, a list of
+    (class_key, subject_key, teacher_key, periods per week), so that no class
+    or teacher has two lessons in one period. teacher_busy maps a teacher key
+    to a bitset of periods already taken elsewhere.
+
+    Returns [(class_key, subject_key, teacher_key, day, slot)] with day and
+    slot as indexes; raises TimetableInfeasible when no timetable is found.
+    """
+    for attempt in range(max(restarts, 1)):
+        placed = _search(
+            requirements, days, slots_per_day, teacher_busy or {}, max_per_day,
+            random.Random(seed + attempt), max_backtracks,
+        )
+        if placed is not None:
+            return [
+                (*requirements[index][:3], p // slots_per_day, p % slots_per_day)
+                for index, p in placed
+            ]
+    raise TimetableInfeasible(
+        f"No timetable found within {max(restarts, 1)} searches; "
+        "try fewer periods, more teachers or a higher (or no) max_per_day."
+    )
+
+
+# ── Tenant service ────────────────────────────────────────────────────────────
+
+def _check_demand(requirements, days, week, teacher_busy, max_per_day=None):
+    """
+    Readable errors for classes or teachers asked for more periods than they
+    have, and for subjects that max_per_day cannot fit into the week
+    """
+    class_demand, teacher_demand = {}, {}
+    over_cap = [row for row in requirements if max_per_day and row[3] > max_per_day * days]
+    for class_id, _, teacher_id, periods in requirements:
+        class_demand[class_id] = class_demand.get(class_id, 0) + periods
+        teacher_demand[teacher_id] = teacher_demand.get(teacher_id, 0) + periods
+
+    over_classes = {c: n for c, n in class_demand.items() if n > week}
+    over_teachers = {
+        t: (n, week - teacher_busy.get(t, 0).bit_count())
+        for t, n in teacher_demand.items() if n > week - teacher_busy.get(t, 0).bit_count()
+    }
+    if not over_classes and not over_teachers and not over_cap:
+        return
+
+    errors = [
+        f"Class {school_class} needs {over_classes[school_class.id]} periods; the week has {week}."
+        for school_class in SchoolClass.objects.filter(id__in=over_classes)
+    ]
+    errors += [
+        f"Teacher {teacher.user.full_name or teacher.user.email} needs {over_teachers[teacher.id][0]} "
+        f"periods but has {over_teachers[teacher.id][1]} free."
+        for teacher in Teacher.objects.filter(id__in=over_teachers).select_related("user")
+    ]
+    if over_cap:
+        class_names = {c.id: str(c) for c in SchoolClass.objects.filter(id__in={row[0] for row in over_cap})}
+        subject_names = dict(Subject.objects.filter(id__in={row[1] for row in over_cap}).values_list("id", "name"))
+        errors += [
+            f"{subject_names.get(subject_id, subject_id)} for class {class_names.get(class_id, class_id)} needs "
+            f"{periods} periods; at most {max_per_day} a day allows {max_per_day * days}."
+            for class_id, subject_id, _, periods in over_cap
+        ]
+    raise TimetableInfeasible(" ".join(errors))
+
+
+def generate_timetables(tenant, requirements, max_per_day=None, dry_run=False, seed=0):
+    """
+    Build clash-free timetables for the classes in requirements (dicts with
+    school_class, subject, teacher and periods ids/counts) and replace their
+    teaching-slot entries with one bulk insert. Entries on break slots are left
+    as they are. Periods teachers already teach in other classes' timetables
+    are kept free.
+
+    Returns a summary, plus the planned entries with dry_run.
+    """
+    began = time.perf_counter()
+    days = [code for code, _ in TimeTableEntry.DAYS]
+    slots = list(TimeSlot.objects.filter(tenant=tenant, is_break=False).order_by("start_time"))
+    if not slots:
+        raise TimetableInfeasible("Add teaching time slots before generating timetables.")
+    slot_index = {slot.id: i for i, slot in enumerate(slots)}
+
+    rows = [(r["school_class"], r["subject"], r["teacher"], r["periods"]) for r in requirements]
+    class_ids = {row[0] for row in rows}
+    teacher_ids = {row[2] for row in rows}
+
+    # Teachers' periods in timetables that are not being regenerated
+    teacher_busy = {}
+    elsewhere = (
+        TimeTableEntry.objects
+        .filter(tenant=tenant, teacher_id__in=teacher_ids)
+        .exclude(timetable__school_class_id__in=class_ids)
+        .values_list("teacher_id", "day", "slot_id")
+    )
+    for teacher_id, day, slot_id in elsewhere:
+        if slot_id in slot_index and day in days:
+            bit = 1 << (days.index(day) * len(slots) + slot_index[slot_id])
+            teacher_busy[teacher_id] = teacher_busy.get(teacher_id, 0) | bit
+
+    _check_demand(rows, len(days), len(days) * len(slots), teacher_busy, max_per_day)
+    placed = solve_timetable(rows, len(days), len(slots), teacher_busy, max_per_day, seed=seed)
+    solved = time.perf_counter()
+
+    summary = {"classes": len(class_ids), "entries": len(placed), "solve_seconds": round(solved - began, 3)}
+    if dry_run:
+        summary["timetable"] = [
+            {"school_class": c, "subject": s, "teacher": t, "day": days[d], "slot": slots[i].id}
+            for c, s, t, d, i in sorted(placed, key=lambda e: (e[0], e[3], e[4]))
+        ]
+        return summary
+
+    with transaction.atomic():
+        timetables = {}
+        for timetable in TimeTable.objects.filter(tenant=tenant, school_class_id__in=class_ids).order_by("-id"):
+            timetables[timetable.school_class_id] = timetable  # the oldest wins, as in class_grid()
+        missing = [TimeTable(tenant=tenant, school_class_id=c) for c in class_ids if c not in timetables]
+        for timetable in TimeTable.objects.bulk_create(missing):
+            timetables[timetable.school_class_id] = timetable
+
+        # A class's week is a few dozen rows, so a signalled delete is cheap:
+        # the signals bump the old teachers' grids, the timetable is joined in
+        # so they need no query per row
+        TimeTableEntry.objects.filter(timetable__in=timetables.values(), slot__in=slots).select_related("timetable").delete()
+
+        TimeTableEntry.objects.bulk_create([
+            TimeTableEntry(
+                tenant=tenant,
+                timetable=timetables[c],
+                day=days[d],
+                slot=slots[i],
+                subject_id=s,
+                teacher_id=t,
+            )
+            for c, s, t, d, i in placed
+        ], batch_size=1000)
+
+        bump_after_bulk_write(tenant.id, class_ids, teacher_ids)
+
+    summary["write_seconds"] = round(time.perf_counter() - solved, 3)
+    return summary
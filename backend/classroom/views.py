@@ -1,7 +1,7 @@
 from django.shortcuts import render
 from rest_framework.views import APIView 
 from accounts.permissions import IsAdmin,HasActiveSubscription,IsTeacher
-from . serializers import ClassSerializer,SubjectSerializer,TimeSlotSerializer,TimeTableSerializer,TimeTableEntrySerializer
+from . serializers import ClassSerializer,SubjectSerializer,TimeSlotSerializer,TimeTableSerializer,TimeTableEntrySerializer,TimetableGenerateSerializer,TimetableBulkEditSerializer
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status,viewsets, exceptions
@@ -10,6 +10,10 @@ from rest_framework import generics
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404 
 from users.models import Student
+from backend.cache import cached_view
+from .timetable_cache import class_grid, teacher_grid, compile_timetable
+from .timetable_solver import generate_timetables, TimetableInfeasible
+from .timetable_edit import apply_grid_changes
 
 # Create your views here.
 # Class Time Table
@@ -97,6 +101,7 @@ class DeleteClassView(APIView):
 class ClassDropdownView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin, HasActiveSubscription]
 
+    @cached_view("classroom")
     def get(self, request):
         classes = SchoolClass.objects.filter(
             tenant=request.user.tenant,
@@ -290,30 +295,43 @@ class TimeTableViewSet(BaseTenantViewSet):
 
         timetable = self.get_object()
 
-        entries = timetable.entries.select_related('subject','teacher__user','slot').all()
+        grid = class_grid(timetable.tenant_id, timetable.school_class_id)
+        if grid is None or grid["timetable_id"] != timetable.id:
+            # Not the class's cached timetable (a duplicate): compile it directly
+            grid = compile_timetable(timetable)
 
         matrix_data = {}
 
-        for entry in entries:
-            day = entry.day
-            slot_id = entry.slot.id
-
-            if day not in matrix_data:
-                matrix_data[day] = {}
-            
+        for day, cells in grid["days"].items():
             # This object matches what you need to show in the cell
-
-            matrix_data[day][slot_id] = {
-                "id" : entry.id,
-                "subject" : entry.subject.name,
-                "subject_id" : entry.subject.id,
-                "teacher" : entry.teacher.user.full_name,
-                "teacher_id" : entry.teacher.id,
-                "start_time" : entry.slot.start_time,
-                "end_time" : entry.slot.end_time
+            matrix_data[day] = {
+                cell["slot_id"]: {
+                    "id" : cell["id"],
+                    "subject" : cell["subject"],
+                    "subject_id" : cell["subject_id"],
+                    "teacher" : cell["teacher"],
+                    "teacher_id" : cell["teacher_id"],
+                    "start_time" : cell["start_time"],
+                    "end_time" : cell["end_time"]
+                }
+                for cell in cells
             }
         
         return Response(matrix_data)
+
+    @action(detail=False, methods=['post'], url_path='generate')
+    def generate(self, request):
+        # Solves clash-free timetables for the listed classes and replaces their entries
+
+        serializer = TimetableGenerateSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            result = generate_timetables(request.user.tenant, **serializer.validated_data)
+        except TimetableInfeasible as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_200_OK)
     
     
             
@@ -349,6 +367,24 @@ class TimeTableEntryViewSet(BaseTenantViewSet):
             "message": f"Cleared {deleted_count} entries.",
             "status": "success"
         }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_edit(self, request):
+        """Applies a whole grid diff at once, reporting every clash before saving anything."""
+        serializer = TimetableBulkEditSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        summary, errors = apply_grid_changes(request.user.tenant, data["timetable"], data["cells"], dry_run=data["dry_run"])
+        if errors:
+            return Response(
+                {"error": "Timetable changes have clashes; nothing was saved", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if data["dry_run"]:
+            return Response({"message": "Timetable changes are valid", **summary})
+
+        return Response({"message": "Timetable updated", **summary}, status=status.HTTP_200_OK)
     
 
     
@@ -362,49 +398,31 @@ class StudentTimeTableView(APIView):
             return Response({"detail": "Student profile not found"}, status=status.HTTP_400_BAD_REQUEST)
         
         student = user.student_profile
-        tenant = user.tenant
-        school_class = student.school_class
 
-        if not school_class:
+        if not student.school_class_id:
             return Response({"detail": "Student not assigned to class"}, status=400)
 
-        timetable = get_object_or_404(TimeTable,tenant=tenant,school_class = school_class)
-        
-        if not timetable:
-            return Response({
-                "class_name": school_class.name,
-                "division": school_class.division,
-                "matrix": {}
-            })
-
-        
-        slots = TimeSlot.objects.filter(tenant = tenant).order_by("start_time")
+        # One cache read per class, shared by all its students
+        grid = class_grid(user.tenant_id, student.school_class_id)
 
-        matrix = {}
-        
-        if timetable:
-            entries = timetable.entries.select_related(
-                "subject", "teacher__user", "slot"
-            )
+        if grid is None:
+            raise exceptions.NotFound("No TimeTable matches the given query.")
 
-            for entry in entries:
-                matrix.setdefault(entry.day, {})[entry.slot.id] = {
-                    "subject": entry.subject.name,
-                    "teacher": entry.teacher.user.full_name,
+        matrix = {
+            day: {
+                cell["slot_id"]: {
+                    "subject": cell["subject"],
+                    "teacher": cell["teacher"],
                 }
+                for cell in cells
+            }
+            for day, cells in grid["days"].items()
+        }
 
         return Response({
-            "class_name" : school_class.name,
-            "division": school_class.division,
-            "slots": [
-                {
-                    "id": s.id,
-                    "start_time": s.start_time,
-                    "end_time": s.end_time,
-                    "is_break": s.is_break,
-                }
-                for s in slots
-            ],
+            "class_name" : grid["class_name"],
+            "division": grid["division"],
+            "slots": grid["slots"],
             "matrix": matrix
         })
     
@@ -415,7 +433,6 @@ class TeacherTimeTableView(APIView):
 
     def get(self, request):
         user = request.user
-        tenant = user.tenant
 
         if not hasattr(user, "teacher_profile"):
             return Response(
@@ -424,25 +441,9 @@ class TeacherTimeTableView(APIView):
             )
         teacher = user.teacher_profile
 
-        entries = (TimeTableEntry.objects
-                   .filter(tenant = tenant,teacher = teacher, slot__is_break = False)
-                   .select_related("subject", "slot", "timetable__school_class")
-                   .order_by("day", "slot__start_time"))
-        
-        timetable = {}
-
-        for entry in entries:
-            timetable.setdefault(entry.day, []).append({
-                "subject": entry.subject.name,
-                "class_name": entry.timetable.school_class.name,
-                "division": entry.timetable.school_class.division,
-                "start_time": entry.slot.start_time,
-                "end_time": entry.slot.end_time,
-            })
- 
         return Response({
             "teacher":user.full_name,
-            "timetable":timetable
+            "timetable":teacher_grid(user.tenant_id, teacher.id)
         })
     
 
@@ -450,6 +451,7 @@ class TeacherTimeTableView(APIView):
 class TeacherSubjectDropDownView(APIView):
     permission_classes = [IsAuthenticated, HasActiveSubscription,IsTeacher]
 
+    @cached_view("classroom", per_user=True)
     def get(self, request):
         teacher = request.user.teacher_profile
 
@@ -467,6 +469,7 @@ class TeacherSubjectDropDownView(APIView):
 class TeacherClassDropDownView(APIView):
     permission_classes = [IsAuthenticated, HasActiveSubscription]
 
+    @cached_view("classroom", per_user=True)
     def get(self, request):
         teacher = request.user.teacher_profile
 
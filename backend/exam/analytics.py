@@ -0,0 +1,153 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Aggregate, Avg, Count, FloatField, Max, Min, Q, StdDev
+from .models import ExamResult, GRADE_BANDS
+
+
+# Per-exam statistics computed with grouped aggregates over
+# ExamResultQuerySet.with_scores(), cached until a result or the exam changes.
+
+ANALYTICS_TTL = getattr(settings, "EXAM_ANALYTICS_TTL", 3600)
+
+# Lowest passing percentage: the bottom of the lowest non-F grade band
+PASS_PERCENTAGE = GRADE_BANDS[-1][0]
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL percentile_cont(fraction) WITHIN GROUP (ORDER BY expression)"""
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def _interpolate(sorted_values, fraction):
+    """Same linear interpolation as percentile_cont"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _percentiles(graded):
+    if connection.vendor == "postgresql":
+        row = graded.aggregate(**{
+            f"p{p}": PercentileCont("score_percentage", p / 100) for p in PERCENTILES
+        })
+        values = {p: row[f"p{p}"] for p in PERCENTILES}
+    else:
+        # No ordered-set aggregates: read the one sorted column
+        column = list(graded.order_by("score_percentage").values_list("score_percentage", flat=True))
+        values = {p: _interpolate(column, p / 100) for p in PERCENTILES}
+    return {f"p{p}": _round(v) for p, v in values.items()}
+
+
+def _round(value, digits=2):
+    return round(value, digits) if value is not None else None
+
+
+def _summary_aggregates():
+    graded = Q(status="graded", marks_obtained__isnull=False)
+    return {
+        "total": Count("id"),
+        "graded": Count("id", filter=graded),
+        "pending": Count("id", filter=Q(status="pending")),
+        "absent": Count("id", filter=Q(status="absent")),
+        "passed": Count("id", filter=graded & Q(score_percentage__gte=PASS_PERCENTAGE)),
+        "mean": Avg("score_percentage", filter=graded),
+        "mean_marks": Avg("marks_obtained", filter=graded),
+        "highest": Max("marks_obtained", filter=graded),
+        "lowest": Min("marks_obtained", filter=graded),
+    }
+
+
+def _summary(row):
+    return {
+        "total": row["total"],
+        "graded": row["graded"],
+        "pending": row["pending"],
+        "absent": row["absent"],
+        "passed": row["passed"],
+        "failed": row["graded"] - row["passed"],
+        "pass_rate": _round(row["passed"] * 100 / row["graded"]) if row["graded"] else None,
+        "mean_percentage": _round(row["mean"]),
+        "mean_marks": _round(row["mean_marks"]),
+        "highest_marks": _round(row["highest"]),
+        "lowest_marks": _round(row["lowest"]),
+    }
+
+
+def compute_exam_analytics(exam):
+    """Statistics for one exam: a handful of aggregate queries, no per-row Python"""
+    results = ExamResult.objects.filter(exam=exam).with_scores()
+    graded = results.filter(status="graded", marks_obtained__isnull=False)
+
+    overall_row = results.aggregate(
+        **_summary_aggregates(),
+        stddev=StdDev("score_percentage", filter=Q(status="graded", marks_obtained__isnull=False)),
+    )
+    percentiles = _percentiles(graded)
+
+    grade_counts = dict(
+        graded.values_list("score_grade").annotate(count=Count("id")).order_by()
+    )
+    grade_distribution = [
+        {"grade": grade, "count": grade_counts.get(grade, 0)}
+        for grade in [g for _, g in GRADE_BANDS] + ["F"]
+    ]
+
+    class_rows = (
+        results
+        .filter(student__school_class__in=exam.classes.all())
+        .values("student__school_class_id", "student__school_class__name", "student__school_class__division")
+        .annotate(**_summary_aggregates())
+        .order_by("student__school_class__name", "student__school_class__division")
+    )
+    classes = [
+        {
+            "class_id": row["student__school_class_id"],
+            "class_name": f"{row['student__school_class__name']} {row['student__school_class__division']}".strip(),
+            **_summary(row),
+        }
+        for row in class_rows
+    ]
+
+    return {
+        "exam_id": exam.id,
+        "title": exam.title,
+        "max_marks": exam.max_marks,
+        "pass_percentage": PASS_PERCENTAGE,
+        "overall": {
+            **_summary(overall_row),
+            "median_percentage": percentiles["p50"],
+            "stddev_percentage": _round(overall_row["stddev"]),
+            "percentiles": percentiles,
+        },
+        "grade_distribution": grade_distribution,
+        "classes": classes,
+    }
+
+
+def analytics_key(exam_id):
+    return f"exam:analytics:{exam_id}"
+
+
+def get_exam_analytics(exam):
+    key = analytics_key(exam.id)
+    data = cache.get(key)
+    if data is None:
+        data = compute_exam_analytics(exam)
+        cache.set(key, data, ANALYTICS_TTL)
+    return data
+
+
+def invalidate_exam_analytics(exam_id):
+    # After commit, so a concurrent read can't re-cache the pre-write numbers
+    transaction.on_commit(lambda: cache.delete(analytics_key(exam_id)))
@@ -0,0 +1,156 @@
+import csv
+import io
+import math
+from django.db import transaction
+from django.utils import timezone
+from .models import ExamResult
+
+
+# Bulk grading: a whole marks sheet (JSON rows or an uploaded CSV) is checked in
+# one pass against the exam roster and max_marks, then written with a single
+# bulk_update. Any row error rejects the sheet, so it is applied all-or-nothing.
+
+SHEET_COLUMNS = ('student', 'admission_number', 'marks_obtained', 'remarks', 'absent')
+TRUTHY = {'1', 'true', 'yes', 'y', 'absent'}
+
+
+def read_csv_sheet(upload):
+    """Rows of an uploaded CSV marks sheet, header names lower-cased"""
+    text = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        raise ValueError("CSV file is empty")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    if not {'student', 'admission_number'} & set(reader.fieldnames):
+        raise ValueError("CSV needs a 'student' or 'admission_number' column")
+    return list(reader)
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _is_truthy(value):
+    if isinstance(value, bool):
+        return value
+    return not _is_blank(value) and str(value).strip().lower() in TRUTHY
+
+
+def _parse_marks(value, max_marks):
+    """(marks, error) for one cell; marks is None for a blank cell"""
+    if _is_blank(value):
+        return None, None
+    try:
+        marks = float(value)
+    except (TypeError, ValueError):
+        return None, "Enter a number"
+    if not math.isfinite(marks):
+        return None, "Enter a number"
+    if marks < 0:
+        return None, "Marks cannot be negative"
+    if marks > max_marks:
+        return None, f"Marks cannot exceed maximum marks ({max_marks})"
+    return marks, None
+
+
+def grade_results(exam, rows):
+    """
+    Validate a marks sheet and apply it to the in-memory results.
+
+    Each row names a student by `student` (id) or `admission_number` and gives
+    `marks_obtained`, optional `remarks` and optional `absent`. A row with blank
+    marks that is not absent leaves the marks untouched, and blank remarks leave
+    the remarks untouched.
+
+    Returns (changed_results, errors); errors is a list of {"row", "errors"}
+    with 1-based row numbers.
+    """
+    results = list(exam.results.select_related('student'))
+    by_student = {r.student_id: r for r in results}
+    by_admission = {r.student.admission_number: r for r in results}
+
+    now = timezone.now()
+    changed, errors, seen = [], [], set()
+
+    for index, row in enumerate(rows, start=1):
+        row_errors = {}
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'errors': {'row': "Expected an object"}})
+            continue
+
+        result = None
+        if not _is_blank(row.get('student')):
+            try:
+                result = by_student.get(int(row['student']))
+            except (TypeError, ValueError):
+                row_errors['student'] = "Enter a valid student id"
+        elif not _is_blank(row.get('admission_number')):
+            result = by_admission.get(str(row['admission_number']).strip())
+        else:
+            row_errors['student'] = "Give a student id or admission number"
+
+        if result is None and not row_errors:
+            row_errors['student'] = "Student is not on this exam's roster"
+        elif result is not None and result.pk in seen:
+            row_errors['student'] = "Student appears more than once in the sheet"
+
+        absent = _is_truthy(row.get('absent'))
+        marks, marks_error = _parse_marks(row.get('marks_obtained'), exam.max_marks)
+        if marks_error:
+            row_errors['marks_obtained'] = marks_error
+        elif absent and marks is not None:
+            row_errors['marks_obtained'] = "An absent student cannot have marks"
+
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+            continue
+
+        seen.add(result.pk)
+        has_remarks = not _is_blank(row.get('remarks'))
+        if not absent and marks is None and not has_remarks:
+            continue
+
+        if absent:
+            result.status = 'absent'
+            result.marks_obtained = None
+        elif marks is not None:
+            result.marks_obtained = marks
+            # Same transition as ExamResult.save, plus re-grading an absentee
+            if result.status != 'graded':
+                result.status = 'graded'
+                result.graded_at = now
+        if has_remarks:
+            result.remarks = str(row['remarks']).strip()
+        result.updated_at = now
+        changed.append(result)
+
+    return changed, errors
+
+
+def apply_marks_sheet(exam, rows):
+    """
+    Grade an exam from a marks sheet in one transaction.
+    Returns (updated_count, errors); nothing is written when errors is non-empty.
+    """
+    from users.dashboard_cache import bump_dashboard_scopes
+    from .analytics import invalidate_exam_analytics
+
+    exam.create_missing_results()
+    with transaction.atomic():
+        changed, errors = grade_results(exam, rows)
+        if errors:
+            return 0, errors
+        ExamResult.objects.bulk_update(
+            changed,
+            ['marks_obtained', 'status', 'graded_at', 'remarks', 'updated_at'],
+            batch_size=500,
+        )
+
+    # bulk_update skips the dashboard and analytics signals
+    if changed:
+        bump_dashboard_scopes(
+            f"teacher:{exam.teacher_id}",
+            *[f"student:{r.student_id}" for r in changed],
+        )
+        invalidate_exam_analytics(exam.pk)
+    return len(changed), []
@@ -0,0 +1,102 @@
+import datetime
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from accounts.models import Tenant, User
+from classroom.models import SchoolClass, Subject
+from users.models import Student, Teacher
+from exam.grading import apply_marks_sheet
+from exam.models import Exam, ExamResult
+from exam.serializers import ExamResultSerializer
+
+
+# Grades a synthetic exam once through the per-row path (one
+# TeacherGradeResultView PATCH per student: lookup, serializer validation, save
+# and response) and once through apply_marks_sheet with the same marks.
+# Everything is rolled back.
+
+
+def _int_list(value):
+    try:
+        return [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise CommandError(f"Expected comma-separated integers, got {value!r}")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _per_row_grade(teacher, exam, marks):
+    """The grading path before the marks sheet, kept here for comparison"""
+    for student_id, value in marks.items():
+        result = ExamResult.objects.filter(exam__teacher=teacher).get(exam=exam, student_id=student_id)
+        serializer = ExamResultSerializer(result, data={"marks_obtained": value}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        serializer.data
+
+
+def _sheet_grade(teacher, exam, marks):
+    _, errors = apply_marks_sheet(exam, [
+        {"student": student_id, "marks_obtained": value} for student_id, value in marks.items()
+    ])
+    if errors:
+        raise CommandError(f"Marks sheet rejected: {errors[:3]}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare queries and time of per-row and marks-sheet exam grading "
+        "for each class size. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--class-sizes", default="10,60,200", help="Comma-separated student counts")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'students':>8} {'path':>8} {'queries':>8} {'ms':>8}")
+        try:
+            with transaction.atomic():
+                tenant, teacher, subject = self._school()
+                for size in _int_list(options["class_sizes"]):
+                    for name, grade in (("per-row", _per_row_grade), ("sheet", _sheet_grade)):
+                        exam, student_ids = self._exam(tenant, teacher, subject, size)
+                        marks = {student_id: i % 50 for i, student_id in enumerate(student_ids)}
+                        with CaptureQueriesContext(connection) as queries:
+                            began = time.perf_counter()
+                            with transaction.atomic():
+                                grade(teacher, exam, marks)
+                            seconds = time.perf_counter() - began
+                        self.stdout.write(f"{size:>8} {name:>8} {len(queries):>8} {seconds * 1000:>8.1f}")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _school(self):
+        run = uuid.uuid4().hex[:8]
+        tenant = Tenant.objects.create(institute_name=f"bench-{run}", email=f"bench-{run}@example.com", phone="0")
+        user = User.objects.create(username=f"bench-{run}-teacher", email=f"bench-{run}-teacher@example.com", tenant=tenant, role="teacher")
+        subject = Subject.objects.create(tenant=tenant, name=f"bench-{run}")
+        return tenant, Teacher.objects.create(user=user), subject
+
+    def _exam(self, tenant, teacher, subject, size):
+        run = uuid.uuid4().hex[:8]
+        school_class = SchoolClass.objects.create(tenant=tenant, name=f"bench-{run}", division="A", class_teacher=teacher, max_student=size)
+        users = User.objects.bulk_create([
+            User(username=f"bench-{run}-{i}", email=f"bench-{run}-{i}@example.com", tenant=tenant, role="student")
+            for i in range(size)
+        ])
+        students = Student.objects.bulk_create([
+            Student(user=user, admission_number=f"bench-{run}-{i}", school_class=school_class, roll_number=i + 1)
+            for i, user in enumerate(users)
+        ])
+        exam = Exam.objects.create(
+            tenant=tenant, teacher=teacher, title=f"bench-{run}", subject=subject, exam_date=datetime.date.today(),
+            start_time=datetime.time(9), end_time=datetime.time(10), max_marks=50,
+        )
+        exam.classes.add(school_class)
+        exam.create_missing_results()
+        return exam, [student.id for student in students]
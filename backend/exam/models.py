@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Case, When, Value, F, Exists, OuterRef, FloatField, ExpressionWrapper
+from django.db.models.functions import Cast, Round
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -51,6 +53,40 @@ class Exam(models.Model):
     def results_submitted(self):
         """Number of results submitted"""
         return self.results.exclude(status='absent').count()
+
+    def roster_students(self):
+        """Students of the exam's tenant in any of its classes"""
+        from users.models import Student
+        return Student.objects.filter(
+            school_class__in=self.classes.all(),
+            user__tenant_id=self.tenant_id,
+        )
+
+    def create_missing_results(self):
+        """
+        Insert a pending ExamResult for every roster student without one:
+        one anti-join plus one bulk insert. Returns the new student ids.
+        """
+        from users.dashboard_cache import bump_dashboard_scopes
+        from .analytics import invalidate_exam_analytics
+        missing = list(
+            self.roster_students()
+            .exclude(exam_results__exam=self)
+            .values_list('id', flat=True)
+        )
+        if missing:
+            ExamResult.objects.bulk_create(
+                [ExamResult(exam=self, student_id=student_id) for student_id in missing],
+                ignore_conflicts=True,
+                batch_size=1000,
+            )
+            # bulk_create skips the dashboard and analytics signals
+            bump_dashboard_scopes(
+                f"teacher:{self.teacher_id}",
+                *[f"student:{student_id}" for student_id in missing],
+            )
+            invalidate_exam_analytics(self.pk)
+        return missing
     
     def update_status(self):
         """Auto-update status based on date and time"""
@@ -77,6 +113,52 @@ class Exam(models.Model):
 
 
 
+# (minimum percentage, grade), highest first
+GRADE_BANDS = [
+    (90, 'A+'),
+    (80, 'A'),
+    (70, 'B'),
+    (60, 'C'),
+    (50, 'D'),
+]
+
+
+def grade_for(percentage):
+    """Grade letter for a percentage, None when ungraded"""
+    if percentage is None:
+        return None
+    for minimum, grade in GRADE_BANDS:
+        if percentage >= minimum:
+            return grade
+    return 'F'
+
+
+class ExamResultQuerySet(models.QuerySet):
+
+    def with_scores(self):
+        """Annotate score_percentage and score_grade in SQL (read by the percentage/grade properties)"""
+        percentage = ExpressionWrapper(
+            F('marks_obtained') * 100.0 / F('exam__max_marks'), output_field=FloatField()
+        )
+        # Cast back to float: PostgreSQL rounds to two places via numeric
+        return self.annotate(
+            score_percentage=Cast(Round(percentage, 2), FloatField()),
+        ).annotate(
+            score_grade=Case(
+                When(score_percentage__isnull=True, then=Value(None)),
+                *[When(score_percentage__gte=minimum, then=Value(grade)) for minimum, grade in GRADE_BANDS],
+                default=Value('F'),
+                output_field=models.CharField(),
+            ),
+        )
+
+    def with_concern_flag(self):
+        """Annotate has_concern instead of a concerns.exists() query per row"""
+        return self.annotate(
+            has_concern=Exists(ExamConcern.objects.filter(result=OuterRef('pk'))),
+        )
+
+
 class ExamResult(models.Model):
     """
     Student's exam result
@@ -97,6 +179,8 @@ class ExamResult(models.Model):
     graded_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ExamResultQuerySet.as_manager()
     
     class Meta:
         unique_together = ('exam', 'student')
@@ -108,6 +192,8 @@ class ExamResult(models.Model):
     @property
     def percentage(self):
         """Calculate percentage"""
+        if hasattr(self, 'score_percentage'):
+            return self.score_percentage
         if self.marks_obtained is None:
             return None
         return round((self.marks_obtained / self.exam.max_marks) * 100, 2)
@@ -115,21 +201,9 @@ class ExamResult(models.Model):
     @property
     def grade(self):
         """Calculate grade based on percentage"""
-        if self.percentage is None:
-            return None
-        
-        if self.percentage >= 90:
-            return 'A+'
-        elif self.percentage >= 80:
-            return 'A'
-        elif self.percentage >= 70:
-            return 'B'
-        elif self.percentage >= 60:
-            return 'C'
-        elif self.percentage >= 50:
-            return 'D'
-        else:
-            return 'F'
+        if hasattr(self, 'score_grade'):
+            return self.score_grade
+        return grade_for(self.percentage)
     
     def save(self, *args, **kwargs):
         if self.marks_obtained is not None and self.status == 'pending':
@@ -76,6 +76,9 @@ class ExamResultSerializer(serializers.ModelSerializer):
         read_only_fields = ['status', 'graded_at', 'created_at', 'updated_at']
 
     def get_has_concern(self,obj):
+        # Annotated by ExamResultQuerySet.with_concern_flag() on list views
+        if hasattr(obj, 'has_concern'):
+            return obj.has_concern
         return obj.concerns.exists()
         
     def validate_marks_obtained(self, value):
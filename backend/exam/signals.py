@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import Exam, ExamResult
+from .analytics import invalidate_exam_analytics
+
+
+# Drop the cached exam analytics whenever a result, the exam's max_marks or its
+# classes change. Bulk writes (roster creation, bulk grading) invalidate explicitly.
+
+@receiver(post_save, sender=ExamResult)
+@receiver(post_delete, sender=ExamResult)
+def on_result_changed(sender, instance, **kwargs):
+    invalidate_exam_analytics(instance.exam_id)
+
+
+@receiver(post_save, sender=Exam)
+def on_exam_saved(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_exam_analytics(instance.pk)
+
+
+@receiver(m2m_changed, sender=Exam.classes.through)
+def on_exam_classes_changed(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, Exam):
+        invalidate_exam_analytics(instance.pk)
@@ -1,3 +1,155 @@
+import datetime
+from unittest import skipUnless
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import User
+from classroom.models import Subject
+from users.tests import make_school
+from .analytics import PercentileCont, _interpolate, analytics_key, compute_exam_analytics
+from .models import Exam, ExamResult
 
-# Create your tests here.
+
+class BulkGradeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tenant, _, self.teacher, school_class, self.pupils = make_school(students=3)
+        subject = Subject.objects.create(tenant=self.tenant, name="Maths")
+        self.exam = Exam.objects.create(
+            tenant=self.tenant, teacher=self.teacher, title="Test", subject=subject, exam_date=datetime.date(2026, 3, 1),
+            start_time=datetime.time(9), end_time=datetime.time(10), max_marks=50,
+        )
+        self.exam.classes.add(school_class)
+        self.path = f"/api/exam/teacher/exams/{self.exam.pk}/results/bulk-grade/"
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.teacher.user_id))
+
+    def result(self, pupil):
+        return ExamResult.objects.get(exam=self.exam, student=pupil)
+
+    def test_grades_sheet(self):
+        a, b, c = self.pupils
+        response = self.client.post(self.path, {"results": [
+            {"student": a.pk, "marks_obtained": 42, "remarks": "Good"},
+            {"admission_number": b.admission_number, "absent": True},
+            {"student": c.pk, "marks_obtained": ""},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual((self.result(a).marks_obtained, self.result(a).status, self.result(a).remarks), (42, "graded", "Good"))
+        self.assertEqual(self.result(b).status, "absent")
+        self.assertEqual(self.result(c).status, "pending")
+
+    def test_csv_upload(self):
+        a = self.pupils[0]
+        upload = SimpleUploadedFile("marks.csv", f"Admission_Number,Marks_Obtained\n{a.admission_number},30\n".encode())
+        response = self.client.post(self.path, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.result(a).marks_obtained, 30)
+
+    def test_any_error_saves_nothing(self):
+        a, b, _ = self.pupils
+        response = self.client.post(self.path, {"results": [
+            {"student": a.pk, "marks_obtained": 10},
+            {"student": b.pk, "marks_obtained": 51},
+            {"student": a.pk, "marks_obtained": 11},
+            {"student": 999999, "marks_obtained": 1},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e["row"] for e in response.data["errors"]], [2, 3, 4])
+        self.assertIsNone(self.result(a).marks_obtained)
+
+    def test_non_finite_marks_are_rejected(self):
+        a = self.pupils[0]
+        for value in ("nan", "inf", "-inf"):
+            response = self.client.post(self.path, {"results": [{"student": a.pk, "marks_obtained": value}]}, format="json")
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn("marks_obtained", response.data["errors"][0]["errors"])
+
+    def test_blank_remarks_leave_remarks_unchanged(self):
+        a = self.pupils[0]
+        self.client.post(self.path, {"results": [{"student": a.pk, "marks_obtained": 20, "remarks": "Keep"}]}, format="json")
+        response = self.client.post(self.path, {"results": [{"student": a.pk, "marks_obtained": 25, "remarks": " "}]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self.result(a).marks_obtained, self.result(a).remarks), (25, "Keep"))
+
+
+class ExamAnalyticsTests(TestCase):
+    # 20, 30, 40 and 45 out of 50: 40%, 60%, 80% and 90%, one pupil absent
+    percentiles = {"p25": 55.0, "p50": 70.0, "p75": 82.5, "p90": 87.0}
+
+    def setUp(self):
+        cache.clear()
+        self.tenant, _, self.teacher, school_class, self.pupils = make_school(students=5)
+        subject = Subject.objects.create(tenant=self.tenant, name="Maths")
+        self.exam = Exam.objects.create(
+            tenant=self.tenant, teacher=self.teacher, title="Test", subject=subject, exam_date=datetime.date(2026, 3, 1),
+            start_time=datetime.time(9), end_time=datetime.time(10), max_marks=50,
+        )
+        self.exam.classes.add(school_class)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.teacher.user_id))
+        self.grade([20, 30, 40, 45])
+
+    def grade(self, marks):
+        results = [{"student": pupil.pk, "marks_obtained": m} for pupil, m in zip(self.pupils, marks)]
+        results.append({"student": self.pupils[-1].pk, "absent": True})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/exam/teacher/exams/{self.exam.pk}/results/bulk-grade/", {"results": results}, format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def analytics(self):
+        response = self.client.get(f"/api/exam/teacher/exams/{self.exam.pk}/analytics/")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_summary_matches_known_values(self):
+        overall = self.analytics()["overall"]
+        self.assertEqual(
+            {k: overall[k] for k in ("total", "graded", "absent", "passed", "failed", "pass_rate")},
+            {"total": 5, "graded": 4, "absent": 1, "passed": 3, "failed": 1, "pass_rate": 75.0},
+        )
+        self.assertEqual(
+            (overall["mean_percentage"], overall["mean_marks"], overall["highest_marks"], overall["lowest_marks"]),
+            (67.5, 33.75, 45, 20),
+        )
+        self.assertEqual(overall["stddev_percentage"], 19.2)
+        self.assertEqual(overall["percentiles"], self.percentiles)
+        self.assertEqual(overall["median_percentage"], 70.0)
+
+    def test_grade_distribution(self):
+        distribution = {row["grade"]: row["count"] for row in self.analytics()["grade_distribution"]}
+        self.assertEqual(distribution, {"A+": 1, "A": 1, "B": 0, "C": 1, "D": 0, "F": 1})
+
+    def test_python_percentiles_interpolate_like_percentile_cont(self):
+        values = [40.0, 60.0, 80.0, 90.0]
+        self.assertEqual({f"p{p}": _interpolate(values, p / 100) for p in (25, 50, 75, 90)}, self.percentiles)
+        self.assertEqual(_interpolate([70.0], 0.9), 70.0)
+        self.assertIsNone(_interpolate([], 0.5))
+
+    def test_percentile_cont_sql(self):
+        query = str(ExamResult.objects.values("exam").annotate(p=PercentileCont("marks_obtained", 0.75)).query)
+        self.assertIn("PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY", query)
+
+    @skipUnless(connection.vendor == "postgresql", "percentile_cont needs PostgreSQL")
+    def test_percentile_cont_matches_known_values(self):
+        self.assertEqual(compute_exam_analytics(self.exam)["overall"]["percentiles"], self.percentiles)
+
+    def test_grade_write_invalidates_cache(self):
+        self.assertEqual(self.analytics()["overall"]["highest_marks"], 45)
+        self.assertIsNotNone(cache.get(analytics_key(self.exam.pk)))
+
+        self.grade([20, 30, 40, 50])
+        self.assertIsNone(cache.get(analytics_key(self.exam.pk)))
+        self.assertEqual(self.analytics()["overall"]["highest_marks"], 50)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = ExamResult.objects.get(exam=self.exam, student=self.pupils[0])
+            result.marks_obtained = 10
+            result.save()
+        self.assertEqual(self.analytics()["overall"]["lowest_marks"], 10)
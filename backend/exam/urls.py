@@ -6,6 +6,8 @@ from .views import (
     TeacherExamDetailView,
     TeacherExamResultsView,
     TeacherGradeResultView,
+    TeacherBulkGradeView,
+    TeacherExamAnalyticsView,
     TeacherConcernListView,
     TeacherReviewConcernView,
     # Student URLs
@@ -21,6 +23,8 @@ urlpatterns = [
     path('teacher/exams/<int:pk>/', TeacherExamDetailView.as_view(), name='teacher-exam-detail'),
     path('teacher/exams/<int:exam_id>/results/', TeacherExamResultsView.as_view(), name='teacher-exam-results'),
     path('teacher/results/<int:pk>/grade/', TeacherGradeResultView.as_view(), name='teacher-grade-result'),
+    path('teacher/exams/<int:exam_id>/results/bulk-grade/', TeacherBulkGradeView.as_view(), name='teacher-bulk-grade'),
+    path('teacher/exams/<int:exam_id>/analytics/', TeacherExamAnalyticsView.as_view(), name='teacher-exam-analytics'),
     path('teacher/concerns/', TeacherConcernListView.as_view(), name='teacher-concern-list'),
     path('teacher/concerns/<int:concern_id>/review/', TeacherReviewConcernView.as_view(), name='teacher-review-concern'),
     
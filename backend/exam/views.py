@@ -3,13 +3,15 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from django.utils import timezone
 from django.db import transaction
 
 from .models import Exam, ExamResult, ExamConcern
 from .serializers import  ExamSerializer, ExamResultSerializer,ExamConcernSerializer, TeacherReviewConcernSerializer
+from .grading import read_csv_sheet, apply_marks_sheet
+from .analytics import get_exam_analytics
 
-from users.models import Student
 from accounts.permissions import IsTeacher, HasActiveSubscription
 
 # Create your views here.
@@ -56,20 +58,16 @@ class TeacherExamResultsView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get all students from assigned classes
-        students = Student.objects.filter(
-            school_class__in = exam.classes.all(),
-            user__tenant = request.user.tenant
-        ).select_related('user')
-
-        # Get or create results
-        results = []
-        for student in students:
-            result, created = ExamResult.objects.get_or_create(
-                exam = exam,
-                student = student
-            )
-            results.append(result)
+        exam.create_missing_results()
+
+        results = (
+            ExamResult.objects
+            .filter(exam = exam, student__in = exam.roster_students())
+            .select_related('exam', 'student__user')
+            .with_scores()
+            .with_concern_flag()
+            .order_by('student__school_class_id', 'student__roll_number', 'student_id')
+        )
 
         serializer = ExamResultSerializer(results,many = True)
         return Response(serializer.data)
@@ -86,6 +84,78 @@ class TeacherGradeResultView(generics.UpdateAPIView):
         )
     
 
+class TeacherBulkGradeView(APIView):
+    """
+    Grade a whole exam from one marks sheet.
+    Body: {"results": [{"student": id | "admission_number": ..., "marks_obtained": ..,
+    "remarks": .., "absent": bool}, ...]} or a multipart CSV upload in `file`
+    with the same columns. All rows are applied or, on any row error, none.
+    """
+    permission_classes = [IsAuthenticated, IsTeacher, HasActiveSubscription]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+
+    def post(self, request, exam_id):
+        try:
+            exam = Exam.objects.get(
+                id = exam_id,
+                teacher = request.user.teacher_profile
+            )
+        except Exam.DoesNotExist:
+            return Response(
+                {'error': 'Exam not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        upload = request.FILES.get('file')
+        if upload:
+            try:
+                rows = read_csv_sheet(upload)
+            except (ValueError, UnicodeDecodeError) as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            rows = request.data.get('results') if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                return Response(
+                    {'error': "Send a 'results' list or a CSV file"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        if not rows:
+            return Response({'error': 'Marks sheet is empty'}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated, errors = apply_marks_sheet(exam, rows)
+        if errors:
+            return Response(
+                {'error': 'Marks sheet has errors; nothing was saved', 'errors': errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'message': 'Marks saved successfully',
+            'rows': len(rows),
+            'updated': updated,
+        })
+    
+
+class TeacherExamAnalyticsView(APIView):
+    """Class/subject statistics for an exam, cached until its results change"""
+    permission_classes = [IsAuthenticated, IsTeacher, HasActiveSubscription]
+
+    def get(self, request, exam_id):
+        try:
+            exam = Exam.objects.get(
+                id = exam_id,
+                teacher = request.user.teacher_profile
+            )
+        except Exam.DoesNotExist:
+            return Response(
+                {'error': 'Exam not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(get_exam_analytics(exam))
+    
+
 class StudentExamListView(generics.ListAPIView):
     """List exams for student's class"""
     serializer_class = ExamSerializer
@@ -106,7 +176,9 @@ class StudentExamResultsView(generics.ListAPIView):
     def get_queryset(self):
         return ExamResult.objects.filter(
             student = self.request.user.student_profile
-        ).select_related('exam__subject', 'exam__teacher__user').order_by('-exam__exam_date')
+        ).select_related(
+            'exam__subject', 'exam__teacher__user', 'student__user'
+        ).with_scores().with_concern_flag().order_by('-exam__exam_date')
     
 
 # -------RAISE CONCERN-----------
@@ -0,0 +1,27 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from accounts.models import Tenant
+from finance.rollups import rebuild_tenant_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the admin dashboard finance rollups for one tenant or all tenants."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tenant_id", nargs="?", help="Tenant UUID (default: every tenant)")
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all()
+        if options["tenant_id"]:
+            try:
+                tenants = [Tenant.objects.get(id=options["tenant_id"])]
+            except (Tenant.DoesNotExist, ValidationError):
+                raise CommandError(f"Tenant {options['tenant_id']} not found")
+
+        for tenant in tenants:
+            with transaction.atomic():
+                months = rebuild_tenant_rollups(tenant.id)
+            self.stdout.write(f"{tenant}: {months} month(s)")
+
+        self.stdout.write(self.style.SUCCESS("Finance rollups rebuilt."))
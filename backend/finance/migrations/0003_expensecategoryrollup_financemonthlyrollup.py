@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_user_profile_image'),
+        ('finance', '0002_expensecategory_expense'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseCategoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('month', models.PositiveIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='finance.expensecategory')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expense_category_rollups', to='accounts.tenant')),
+            ],
+            options={
+                'unique_together': {('tenant', 'category', 'year', 'month')},
+            },
+        ),
+        migrations.CreateModel(
+            name='FinanceMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('month', models.PositiveIntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('collections', models.PositiveIntegerField(default=0)),
+                ('pending_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('overdue_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('overdue_count', models.PositiveIntegerField(default=0)),
+                ('expense_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='finance_rollups', to='accounts.tenant')),
+            ],
+            options={
+                'ordering': ['year', 'month'],
+                'unique_together': {('tenant', 'year', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,90 @@
+from decimal import Decimal
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+# Frozen copy of finance.rollups.rebuild_tenant_rollups at the time of this
+# migration, on the historical models, so tenants with bills or expenses from
+# before the rollups get their history. Later rebuilds use the
+# rebuild_finance_rollups command.
+
+def backfill(apps, schema_editor):
+    Tenant = apps.get_model("accounts", "Tenant")
+    StudentBill = apps.get_model("finance", "StudentBill")
+    Expense = apps.get_model("finance", "Expense")
+    FinanceMonthlyRollup = apps.get_model("finance", "FinanceMonthlyRollup")
+    ExpenseCategoryRollup = apps.get_model("finance", "ExpenseCategoryRollup")
+
+    for tenant_id in Tenant.objects.values_list("id", flat=True):
+        rows = {}
+
+        def row(year, month):
+            if (year, month) not in rows:
+                rows[(year, month)] = FinanceMonthlyRollup(tenant_id=tenant_id, year=year, month=month)
+            return rows[(year, month)]
+
+        bills = StudentBill.objects.filter(tenant_id=tenant_id)
+        paid = (
+            bills.filter(status="paid", paid_date__isnull=False)
+            .annotate(y=ExtractYear("paid_date"), m=ExtractMonth("paid_date"))
+            .values("y", "m")
+            .annotate(revenue=Sum("amount"), collections=Count("id"))
+            .order_by()
+        )
+        for r in paid:
+            rollup = row(r["y"], r["m"])
+            rollup.revenue = r["revenue"]
+            rollup.collections = r["collections"]
+
+        due = (
+            bills.filter(status__in=["pending", "overdue"])
+            .annotate(y=ExtractYear("due_date"), m=ExtractMonth("due_date"))
+            .values("y", "m")
+            .annotate(
+                pending_amount=Sum("amount", filter=Q(status="pending")),
+                pending_count=Count("id", filter=Q(status="pending")),
+                overdue_amount=Sum("amount", filter=Q(status="overdue")),
+                overdue_count=Count("id", filter=Q(status="overdue")),
+            )
+            .order_by()
+        )
+        for r in due:
+            rollup = row(r["y"], r["m"])
+            rollup.pending_amount = r["pending_amount"] or Decimal("0")
+            rollup.pending_count = r["pending_count"]
+            rollup.overdue_amount = r["overdue_amount"] or Decimal("0")
+            rollup.overdue_count = r["overdue_count"]
+
+        expenses = (
+            Expense.objects.filter(tenant_id=tenant_id, payment_status="paid")
+            .annotate(y=ExtractYear("expense_date"), m=ExtractMonth("expense_date"))
+            .values("y", "m", "category_id")
+            .annotate(total=Sum("amount"))
+            .order_by()
+        )
+        category_rows = []
+        for r in expenses:
+            rollup = row(r["y"], r["m"])
+            rollup.expense_amount += r["total"]
+            category_rows.append(ExpenseCategoryRollup(
+                tenant_id=tenant_id, category_id=r["category_id"],
+                year=r["y"], month=r["m"], amount=r["total"],
+            ))
+
+        FinanceMonthlyRollup.objects.filter(tenant_id=tenant_id).delete()
+        ExpenseCategoryRollup.objects.filter(tenant_id=tenant_id).delete()
+        FinanceMonthlyRollup.objects.bulk_create(rows.values())
+        ExpenseCategoryRollup.objects.bulk_create(category_rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_alter_user_profile_image"),
+        ("finance", "0003_expensecategoryrollup_financemonthlyrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
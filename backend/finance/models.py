@@ -69,37 +69,68 @@ class FeeStructure(models.Model):
         return list(self.school_classes.values_list('academic_year', flat=True).distinct())
 
     def generate_bills_for_students(self):
-        """Generate StudentBill for eligible students"""
+        """
+        Generate StudentBill for eligible students that don't have one yet.
+        Safe to re-run after school_classes changes; existing bills are kept.
+        Returns {"eligible", "existing", "created"} counts.
+        """
         from users.models import Student
-        
-        classes = self.school_classes.all()
-        
-        if classes.exists():
+        from jobs.queue import enqueue
+        from notifications.tasks import fan_out
+        from users.dashboard_cache import bump_dashboard_scopes
+        from .rollups import refresh_bucket
+
+        students = Student.objects.filter(user__tenant_id=self.tenant_id)
+
+        class_ids = list(self.school_classes.values_list("id", flat=True))
+        if class_ids:
             # Multiple specific classes
-            students = Student.objects.filter(
-                school_class__in=classes, 
-                user__tenant=self.tenant
-            )
-        else:
-            # All students in academic year
-            students = Student.objects.filter(
-                school_class__academic_year=self.academic_year,
-                user__tenant=self.tenant
-            )
-        
-        bills_created = 0
-        for student in students:
-            if not StudentBill.objects.filter(student=student, fee_structure=self).exists():
-                StudentBill.objects.create(
-                    tenant=self.tenant,
-                    student=student,
+            students = students.filter(school_class_id__in=class_ids)
+        # No classes selected: applies to every student of the tenant
+
+        eligible = students.count()
+
+        # Anti-join: students without a bill for this structure
+        missing = list(
+            students.exclude(bills__fee_structure=self).values_list("id", "user_id")
+        )
+
+        StudentBill.objects.bulk_create(
+            [
+                StudentBill(
+                    tenant_id=self.tenant_id,
+                    student_id=student_id,
                     fee_structure=self,
                     amount=self.amount,
-                    due_date=self.due_date
+                    due_date=self.due_date,
                 )
-                bills_created += 1
-        
-        return bills_created
+                for student_id, _ in missing
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+        # bulk_create skips post_save, so notify all new bill holders in one fan-out
+        if missing:
+            refresh_bucket(self.tenant_id, self.due_date.year, self.due_date.month)
+            if class_ids:
+                bump_dashboard_scopes(*(f"class:{class_id}" for class_id in class_ids))
+            else:
+                bump_dashboard_scopes(f"tenant:{self.tenant_id}")
+            enqueue(
+                fan_out,
+                recipient_ids=[user_id for _, user_id in missing],
+                notif_type="fee",
+                title="New Fee Bill",
+                message=f"₹{self.amount} due by {self.due_date.strftime('%d %b %Y')} — {self.fee_type.name}",
+                link="/student/fee-management",
+            )
+
+        return {
+            "eligible": eligible,
+            "existing": eligible - len(missing),
+            "created": len(missing),
+        }
 
 
 
@@ -317,3 +348,48 @@ class Expense(models.Model):
             total=Sum('amount')
         ).order_by('month')
     
+
+
+
+# Dashboard rollups
+
+class FinanceMonthlyRollup(models.Model):
+    """
+    Pre-aggregated fee and expense totals per tenant per month, maintained by finance.rollups.
+    Revenue is bucketed by paid_date, pending/overdue by due_date, expenses by expense_date.
+    """
+    tenant = models.ForeignKey("accounts.Tenant", on_delete=models.CASCADE, related_name="finance_rollups")
+    year = models.PositiveIntegerField()
+    month = models.PositiveIntegerField()
+
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    collections = models.PositiveIntegerField(default=0)
+    pending_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    overdue_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    expense_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("tenant", "year", "month")
+        ordering = ["year", "month"]
+
+    def __str__(self):
+        return f"{self.tenant_id} - {self.month}/{self.year}"
+
+
+class ExpenseCategoryRollup(models.Model):
+    """Paid expense totals per tenant, category and month"""
+    tenant = models.ForeignKey("accounts.Tenant", on_delete=models.CASCADE, related_name="expense_category_rollups")
+    category = models.ForeignKey(ExpenseCategory, on_delete=models.CASCADE, related_name="rollups")
+    year = models.PositiveIntegerField()
+    month = models.PositiveIntegerField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("tenant", "category", "year", "month")
+
+    def __str__(self):
+        return f"{self.category_id} - {self.month}/{self.year}"
@@ -0,0 +1,95 @@
+import re
+from django.conf import settings
+from backend.exports import iter_csv, iter_zip
+from backend.pdf_utils import render_many
+from .fee_receipt_utils import fee_receipt_context, render_fee_receipt_pdf
+from .models import Payment
+
+
+# Month-end export for accountants: every fee receipt in a date range as a
+# ZIP of PDFs (built by the finance.export_receipts job), plus a streamed CSV
+# ledger of the same payments. Both read the payments with
+# iterator(chunk_size=...) so neither the rows nor the PDFs are held in memory
+# all at once.
+
+RECEIPT_EXPORT_WORKERS = getattr(settings, "RECEIPT_EXPORT_WORKERS", 0)
+
+CHUNK_SIZE = 500
+
+LEDGER_HEADER = [
+    "Receipt No", "Payment Date", "Student", "Admission No", "Class", "Fee Type",
+    "Billing Period", "Amount", "Payment Method", "Transaction ID", "Collected By",
+]
+
+
+def export_payments(tenant, start_date, end_date, class_id=None, fee_type_id=None):
+    """Payments of the tenant made in [start_date, end_date], optionally for one class / fee type"""
+    qs = Payment.objects.filter(
+        tenant=tenant,
+        payment_date__date__range=(start_date, end_date),
+    )
+    if class_id:
+        qs = qs.filter(bill__student__school_class_id=class_id)
+    if fee_type_id:
+        qs = qs.filter(bill__fee_structure__fee_type_id=fee_type_id)
+    return qs.order_by("payment_date", "id")
+
+
+def receipt_filename(receipt_number):
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", receipt_number) + ".pdf"
+
+
+def iter_receipts(payments, workers=None):
+    """Yield (filename, pdf_bytes) for each payment, rendered in worker processes"""
+    contexts = (
+        fee_receipt_context(payment)
+        for payment in payments
+        .select_related(
+            "bill__student__user",
+            "bill__student__school_class",
+            "bill__fee_structure__fee_type",
+            "tenant",
+            "collected_by",
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for ctx, pdf in render_many(render_fee_receipt_pdf, contexts, workers or RECEIPT_EXPORT_WORKERS):
+        yield receipt_filename(ctx["receipt_number"]), pdf
+
+
+def iter_receipt_zip(payments, workers=None):
+    return iter_zip(iter_receipts(payments, workers))
+
+
+def iter_ledger_csv(payments):
+    """Yield the CSV ledger of the payments line by line"""
+    methods = dict(Payment.PAYMENT_METHOD_CHOICES)
+    rows = payments.values_list(
+        "receipt_number", "payment_date",
+        "bill__student__user__full_name", "bill__student__admission_number",
+        "bill__student__school_class__name", "bill__student__school_class__division",
+        "bill__fee_structure__fee_type__name", "bill__fee_structure__billing_period",
+        "amount", "payment_method", "transaction_id",
+        "collected_by__first_name", "collected_by__last_name",
+    )
+    return iter_csv(LEDGER_HEADER, (
+        [
+            receipt,
+            paid_at,
+            student or "",
+            admission,
+            f"{class_name or ''} {division or ''}".strip(),
+            fee_type,
+            period,
+            amount,
+            methods.get(method, method),
+            txn_id,
+            f"{first_name or ''} {last_name or ''}".strip() if first_name is not None else "System",
+        ]
+        for (receipt, paid_at, student, admission, class_name, division, fee_type,
+             period, amount, method, txn_id, first_name, last_name) in rows.iterator(chunk_size=CHUNK_SIZE)
+    ))
+
+
+def export_filename(prefix, start_date, end_date, extension):
+    return f"{prefix}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{extension}"
@@ -0,0 +1,152 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum, Count, Q
+from django.db.models.functions import ExtractYear, ExtractMonth
+from .models import StudentBill, Expense, FinanceMonthlyRollup, ExpenseCategoryRollup
+
+
+# Per-tenant, per-month finance rollups for the admin dashboard.
+# Writes refresh only the (tenant, month) buckets they touch; rebuild_tenant_rollups()
+# recomputes a tenant's whole history with three grouped queries (the
+# rebuild_finance_rollups command; migration 0004 ran a frozen copy once).
+
+ZERO = Decimal("0")
+
+
+def bill_buckets(bill):
+    """Rollup months a bill contributes to: its due month and, once paid, its paid month"""
+    buckets = {(bill.tenant_id, bill.due_date.year, bill.due_date.month)}
+    if bill.status == "paid" and bill.paid_date:
+        buckets.add((bill.tenant_id, bill.paid_date.year, bill.paid_date.month))
+    return buckets
+
+
+def expense_buckets(expense):
+    return {(expense.tenant_id, expense.expense_date.year, expense.expense_date.month)}
+
+
+def refresh_bucket(tenant_id, year, month):
+    """Recompute one tenant month from StudentBill and Expense"""
+    with transaction.atomic():
+        _refresh_bucket(tenant_id, year, month)
+
+
+def _refresh_bucket(tenant_id, year, month):
+    # Lock the month's row before reading the totals: a concurrent refresh of
+    # the same month waits here and then recomputes from this one's result
+    FinanceMonthlyRollup.objects.bulk_create(
+        [FinanceMonthlyRollup(tenant_id=tenant_id, year=year, month=month)], ignore_conflicts=True,
+    )
+    rollup = FinanceMonthlyRollup.objects.select_for_update().get(tenant_id=tenant_id, year=year, month=month)
+
+    bills = StudentBill.objects.filter(tenant_id=tenant_id)
+
+    paid = bills.filter(
+        status="paid", paid_date__year=year, paid_date__month=month,
+    ).aggregate(revenue=Sum("amount"), collections=Count("id"))
+
+    due = bills.filter(
+        due_date__year=year, due_date__month=month,
+    ).aggregate(
+        pending_amount=Sum("amount", filter=Q(status="pending")),
+        pending_count=Count("id", filter=Q(status="pending")),
+        overdue_amount=Sum("amount", filter=Q(status="overdue")),
+        overdue_count=Count("id", filter=Q(status="overdue")),
+    )
+
+    by_category = list(
+        Expense.objects.filter(
+            tenant_id=tenant_id,
+            payment_status="paid",
+            expense_date__year=year,
+            expense_date__month=month,
+        ).values("category_id").annotate(total=Sum("amount"))
+    )
+
+    rollup.revenue = paid["revenue"] or ZERO
+    rollup.collections = paid["collections"]
+    rollup.pending_amount = due["pending_amount"] or ZERO
+    rollup.pending_count = due["pending_count"]
+    rollup.overdue_amount = due["overdue_amount"] or ZERO
+    rollup.overdue_count = due["overdue_count"]
+    rollup.expense_amount = sum((row["total"] for row in by_category), ZERO)
+    rollup.save()
+
+    ExpenseCategoryRollup.objects.filter(tenant_id=tenant_id, year=year, month=month).delete()
+    ExpenseCategoryRollup.objects.bulk_create([
+        ExpenseCategoryRollup(
+            tenant_id=tenant_id, category_id=row["category_id"],
+            year=year, month=month, amount=row["total"],
+        )
+        for row in by_category
+    ])
+
+
+def refresh_buckets(buckets):
+    for tenant_id, year, month in buckets:
+        refresh_bucket(tenant_id, year, month)
+
+
+def rebuild_tenant_rollups(tenant_id):
+    """Recompute every month for a tenant. Returns the number of month rows written."""
+    rows = {}
+
+    def row(year, month):
+        if (year, month) not in rows:
+            rows[(year, month)] = FinanceMonthlyRollup(tenant_id=tenant_id, year=year, month=month)
+        return rows[(year, month)]
+
+    bills = StudentBill.objects.filter(tenant_id=tenant_id)
+
+    paid = (
+        bills.filter(status="paid", paid_date__isnull=False)
+        .annotate(y=ExtractYear("paid_date"), m=ExtractMonth("paid_date"))
+        .values("y", "m")
+        .annotate(revenue=Sum("amount"), collections=Count("id"))
+        .order_by()
+    )
+    for r in paid:
+        rollup = row(r["y"], r["m"])
+        rollup.revenue = r["revenue"]
+        rollup.collections = r["collections"]
+
+    due = (
+        bills.filter(status__in=["pending", "overdue"])
+        .annotate(y=ExtractYear("due_date"), m=ExtractMonth("due_date"))
+        .values("y", "m")
+        .annotate(
+            pending_amount=Sum("amount", filter=Q(status="pending")),
+            pending_count=Count("id", filter=Q(status="pending")),
+            overdue_amount=Sum("amount", filter=Q(status="overdue")),
+            overdue_count=Count("id", filter=Q(status="overdue")),
+        )
+        .order_by()
+    )
+    for r in due:
+        rollup = row(r["y"], r["m"])
+        rollup.pending_amount = r["pending_amount"] or ZERO
+        rollup.pending_count = r["pending_count"]
+        rollup.overdue_amount = r["overdue_amount"] or ZERO
+        rollup.overdue_count = r["overdue_count"]
+
+    expenses = (
+        Expense.objects.filter(tenant_id=tenant_id, payment_status="paid")
+        .annotate(y=ExtractYear("expense_date"), m=ExtractMonth("expense_date"))
+        .values("y", "m", "category_id")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    category_rows = []
+    for r in expenses:
+        rollup = row(r["y"], r["m"])
+        rollup.expense_amount += r["total"]
+        category_rows.append(ExpenseCategoryRollup(
+            tenant_id=tenant_id, category_id=r["category_id"],
+            year=r["y"], month=r["m"], amount=r["total"],
+        ))
+
+    FinanceMonthlyRollup.objects.filter(tenant_id=tenant_id).delete()
+    ExpenseCategoryRollup.objects.filter(tenant_id=tenant_id).delete()
+    FinanceMonthlyRollup.objects.bulk_create(rows.values())
+    ExpenseCategoryRollup.objects.bulk_create(category_rows)
+    return len(rows)
@@ -2,6 +2,8 @@ from rest_framework import serializers
 from . models import FeeType,FeeStructure,StudentBill,Payment,ExpenseCategory, Expense
 from django.db.models import Sum
 from decimal import Decimal
+from jobs.queue import enqueue
+from . tasks import generate_bills
 
 class FeeTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -33,7 +35,11 @@ class FeeStructureSerializer(serializers.ModelSerializer):
         classes = validated_data.pop('school_classes', [])
         fee_structure = FeeStructure.objects.create(**validated_data)
         fee_structure.school_classes.set(classes)
-        fee_structure.generate_bills_for_students()
+        enqueue(
+            generate_bills,
+            idempotency_key = f"generate_bills:{fee_structure.id}",
+            fee_structure_id = fee_structure.id,
+        )
         return fee_structure
     
     def update(self, instance, validated_data):
@@ -42,7 +48,7 @@ class FeeStructureSerializer(serializers.ModelSerializer):
         
         if classes is not None:
             instance.school_classes.set(classes)
-            instance.generate_bills_for_students()
+            enqueue(generate_bills, fee_structure_id = instance.id)
         
         return instance
     
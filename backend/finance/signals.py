@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import StudentBill, Expense
+from .rollups import bill_buckets, expense_buckets, refresh_buckets
+from backend.cache import invalidate_on
+
+
+# Keep FinanceMonthlyRollup in step with bill and expense writes.
+# pre_save remembers the buckets a row used to count towards, so moving a
+# bill from pending to paid (or editing an expense date) fixes both months.
+
+def _stash_old_buckets(model, instance, bucket_fn):
+    instance._old_rollup_buckets = set()
+    if instance.pk:
+        old = model.objects.filter(pk=instance.pk).first()
+        if old:
+            instance._old_rollup_buckets = bucket_fn(old)
+
+
+def _schedule_refresh(buckets):
+    transaction.on_commit(lambda: refresh_buckets(buckets))
+
+
+@receiver(pre_save, sender=StudentBill)
+def on_bill_pre_save(sender, instance, **kwargs):
+    _stash_old_buckets(StudentBill, instance, bill_buckets)
+
+
+@receiver(pre_save, sender=Expense)
+def on_expense_pre_save(sender, instance, **kwargs):
+    _stash_old_buckets(Expense, instance, expense_buckets)
+
+
+@receiver(post_save, sender=StudentBill)
+@receiver(post_delete, sender=StudentBill)
+def on_bill_changed(sender, instance, **kwargs):
+    _schedule_refresh(bill_buckets(instance) | getattr(instance, "_old_rollup_buckets", set()))
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+def on_expense_changed(sender, instance, **kwargs):
+    _schedule_refresh(expense_buckets(instance) | getattr(instance, "_old_rollup_buckets", set()))
+
+
+# ---------- Cached views ----------
+
+invalidate_on("finance", "finance.FeeType", "finance.FeeStructure", "finance.ExpenseCategory")
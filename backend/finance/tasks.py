@@ -0,0 +1,41 @@
+import tempfile
+from datetime import date
+from accounts.models import Tenant
+from jobs.models import Artifact
+from jobs.queue import task
+from notifications.utils import send_notification
+from .models import FeeStructure
+from .receipt_export import export_filename, export_payments, iter_receipt_zip
+
+
+@task("finance.generate_bills")
+def generate_bills(fee_structure_id):
+    fee_structure = FeeStructure.objects.filter(pk = fee_structure_id).first()
+    if fee_structure is None:
+        return 0
+    return fee_structure.generate_bills_for_students()
+
+
+@task("finance.export_receipts", max_attempts=2)
+def export_receipts(tenant_id, start_date, end_date, class_id=None, fee_type_id=None, requested_by=None):
+    """Render the fee receipts of a date range into a ZIP artifact and notify the requester"""
+    if not Tenant.objects.filter(pk = tenant_id).exists():
+        return None
+
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    payments = export_payments(tenant_id, start, end, class_id = class_id, fee_type_id = fee_type_id)
+
+    with tempfile.TemporaryFile() as archive:
+        for chunk in iter_receipt_zip(payments):
+            archive.write(chunk)
+        archive.seek(0)
+        artifact = Artifact.store(tenant_id, requested_by, export_filename("receipts", start, end, "zip"), archive)
+
+    url = artifact.download_url()
+    if requested_by:
+        send_notification(
+            [requested_by], "fee",
+            title = "Fee receipts ready",
+            message = f"Receipts paid from {start} to {end} are ready to download: {url}",
+        )
+    return {"artifact": str(artifact.pk), "url": url}
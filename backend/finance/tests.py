@@ -1,3 +1,143 @@
+import datetime
+import os
+import tempfile
+from decimal import Decimal
 from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import Tenant, User
+from backend.pdf_utils import FileStore
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job
+from jobs.tests import use_temporary_artifact_storage
+from notifications.models import Notification
+from users.models import Student
+from users.tests import make_school
+from .models import (
+    Expense, ExpenseCategory, ExpenseCategoryRollup, FeeStructure, FeeType, FinanceMonthlyRollup, StudentBill,
+)
+from .rollups import rebuild_tenant_rollups, refresh_bucket
 
-# Create your tests here.
+
+class FinanceRollupTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(institute_name="School", email="school@example.com", phone="1", status="active")
+        self.fee_type = FeeType.objects.create(tenant=self.tenant, name="Tuition")
+        self.category = ExpenseCategory.objects.create(tenant=self.tenant, name="Supplies")
+
+    def bill(self, student, due, status="pending", paid=None):
+        user = User.objects.create(username=f"{student}@example.com", email=f"{student}@example.com", tenant=self.tenant, role="student")
+        pupil = Student.objects.create(user=user, admission_number=student, roll_number=1)
+        structure = FeeStructure.objects.create(tenant=self.tenant, fee_type=self.fee_type, amount=100, due_date=due)
+        return StudentBill.objects.create(
+            tenant=self.tenant, student=pupil, fee_structure=structure, amount=100, due_date=due, status=status, paid_date=paid,
+        )
+
+    def rollup(self, year, month):
+        return FinanceMonthlyRollup.objects.get(tenant=self.tenant, year=year, month=month)
+
+    def test_paying_a_bill_moves_it_between_months(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bill = self.bill("a", datetime.date(2026, 3, 10))
+        self.assertEqual(self.rollup(2026, 3).pending_amount, Decimal("100"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bill.status, bill.paid_date = "paid", datetime.date(2026, 4, 2)
+            bill.save()
+        self.assertEqual(self.rollup(2026, 3).pending_amount, Decimal("0"))
+        self.assertEqual((self.rollup(2026, 4).revenue, self.rollup(2026, 4).collections), (Decimal("100"), 1))
+
+    def test_refresh_matches_rebuild(self):
+        self.bill("a", datetime.date(2026, 3, 10))
+        self.bill("b", datetime.date(2026, 3, 20), status="paid", paid=datetime.date(2026, 3, 21))
+        Expense.objects.create(
+            tenant=self.tenant, category=self.category, title="Paper", amount=40,
+            expense_date=datetime.date(2026, 3, 5), payment_status="paid",
+        )
+
+        refresh_bucket(self.tenant.id, 2026, 3)
+        refreshed = self.rollup(2026, 3)
+        rebuild_tenant_rollups(self.tenant.id)
+        rebuilt = self.rollup(2026, 3)
+
+        fields = ["revenue", "collections", "pending_amount", "pending_count", "expense_amount"]
+        self.assertEqual([getattr(refreshed, f) for f in fields], [getattr(rebuilt, f) for f in fields])
+        self.assertEqual(
+            list(ExpenseCategoryRollup.objects.filter(tenant=self.tenant).values_list("amount", flat=True)),
+            [Decimal("40")],
+        )
+
+    def test_refreshing_twice_keeps_one_row_per_month(self):
+        self.bill("a", datetime.date(2026, 3, 10))
+        refresh_bucket(self.tenant.id, 2026, 3)
+        refresh_bucket(self.tenant.id, 2026, 3)
+        self.assertEqual(FinanceMonthlyRollup.objects.filter(tenant=self.tenant).count(), 1)
+
+    def test_dashboard_does_not_write_rollups(self):
+        admin = User.objects.create(username="admin@example.com", email="admin@example.com", tenant=self.tenant, role="admin")
+        client = APIClient()
+        client.force_authenticate(admin)
+        self.assertEqual(client.get("/api/accounts/admin/dashboard/").status_code, 200)
+        self.assertFalse(FinanceMonthlyRollup.objects.filter(tenant=self.tenant).exists())
+
+
+class PaymentExportParamTests(TestCase):
+
+    def setUp(self):
+        _, self.admin, _, _, _ = make_school()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+
+    def test_ledger_streams_csv(self):
+        response = self.client.get("/api/finance/admin/payments/ledger/export/", {"start": "2026-03-01", "end": "2026-03-31"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"Receipt No,"))
+
+    def test_bad_params_are_400(self):
+        cases = [
+            ({"start": "2026-02-30", "end": "2026-03-31"}, "dates"),
+            ({"start": "2026-03-31", "end": "2026-03-01"}, "dates"),
+            ({"start": "2026-03-01", "end": "2026-03-31", "class_id": "abc"}, "class_id"),
+            ({"start": "2026-03-01", "end": "2026-03-31", "fee_type": "1.5"}, "fee_type"),
+        ]
+        for params, field in cases:
+            for response in (
+                self.client.get("/api/finance/admin/payments/ledger/export/", params),
+                self.client.post("/api/finance/admin/payments/receipts/export/", params, format="json"),
+            ):
+                self.assertEqual(response.status_code, 400, params)
+                self.assertIn(field, response.data["errors"])
+        self.assertFalse(Job.objects.exists())
+
+    def test_receipts_are_exported_by_a_job(self):
+        use_temporary_artifact_storage(self)
+        response = self.client.post(
+            "/api/finance/admin/payments/receipts/export/", {"start": "2026-03-01", "end": "2026-03-31"}, format="json",
+        )
+        self.assertEqual(response.status_code, 202, response.data)
+        job = Job.objects.get(pk=response.data["job_id"])
+        self.assertEqual(job.name, "finance.export_receipts")
+
+        [job] = claim_jobs(10)
+        with self.captureOnCommitCallbacks(execute=True):
+            job = run_job(job)
+        self.assertEqual(job.status, "succeeded", job.last_error)
+        self.assertTrue(Notification.objects.filter(recipient=self.admin, notif_type="fee", message__contains=job.result["url"]).exists())
+        download = self.client.get(job.result["url"])
+        self.assertEqual(download.status_code, 200)
+        self.assertTrue(b"".join(download.streaming_content).startswith(b"PK"))
+
+
+class FileStoreTests(TestCase):
+
+    def test_new_rendering_replaces_the_old_file(self):
+        with tempfile.TemporaryDirectory() as root, self.settings(RENDERED_PDF_DIR=root):
+            store = FileStore()
+            store.set("receipt:7:aaaa", b"old")
+            store.set("receipt:8:aaaa", b"other")
+            store.set("receipt:7:bbbb", b"new")
+
+            self.assertEqual((store.get("receipt:7:bbbb"), store.get("receipt:7:aaaa")), (b"new", None))
+            self.assertEqual(store.get("receipt:8:aaaa"), b"other")
+            self.assertEqual(sum(len(files) for _, _, files in os.walk(root)), 2)
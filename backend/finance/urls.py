@@ -11,6 +11,8 @@ from .views import (
     AdminStudentBillDetailView,
     PaymentListView,
     PaymentDetailView,
+    AdminReceiptExportView,
+    AdminPaymentLedgerView,
 
     # Student
     StudentMyBillListView,
@@ -45,6 +47,8 @@ urlpatterns = [
     path("admin/bills/<int:pk>/",AdminStudentBillDetailView.as_view(),name="admin-student-bill-detail"),
     path("admin/payments/", PaymentListView.as_view(), name="admin-payment-list"),
     path( "admin/payments/<int:pk>/", PaymentDetailView.as_view(), name="admin-payment-detail" ),
+    path("admin/payments/receipts/export/", AdminReceiptExportView.as_view(), name="admin-receipt-export"),
+    path("admin/payments/ledger/export/", AdminPaymentLedgerView.as_view(), name="admin-payment-ledger-export"),
     
     path("student/bills/",StudentMyBillListView.as_view(),name="student-my-bills"),
     path("student/bills/<int:bill_id>/create-order/",CreateStudentBillOrderView.as_view(),name="student-create-bill-order"),
@@ -29,8 +29,14 @@ from rest_framework.views import APIView
 from django.utils import timezone
 from decimal import Decimal
 from rest_framework.pagination import PageNumberPagination
-from . fee_receipt_utils import generate_fee_receipt_pdf
+from . fee_receipt_utils import get_fee_receipt_pdf
+from .receipt_export import export_payments, iter_ledger_csv, export_filename
+from .tasks import export_receipts
+from jobs.queue import enqueue
 from django.http import HttpResponse
+from django.utils.dateparse import parse_date
+from backend.exports import ExportMixin, choice_label, joined, streaming_response
+from backend.cache import cached_view
 
 # Create your views here.
 
@@ -42,6 +48,10 @@ class AdminFeeTypeListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         return FeeType.objects.filter(tenant = self.request.user.tenant)
+
+    @cached_view("finance")
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         serializer.save(tenant = self.request.user.tenant)
@@ -87,10 +97,25 @@ class AdminFeeStructureDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # ADMIN STUDENT'S BILL VIEWS
 
-class AdminStudentBillListView(generics.ListAPIView):
+class AdminStudentBillListView(ExportMixin, generics.ListAPIView):
     serializer_class = StudentBillListSerializer
     permission_classes = [IsAuthenticated,HasActiveSubscription]
 
+    export_filename = "student_bills"
+    export_columns = [
+        ("Bill ID", "id"),
+        ("Student", "student__user__full_name"),
+        ("Admission No", "student__admission_number"),
+        ("Class", ("student__school_class__name", "student__school_class__division"), joined),
+        ("Fee Type", "fee_structure__fee_type__name"),
+        ("Billing Period", "fee_structure__billing_period"),
+        ("Amount", "amount"),
+        ("Due Date", "due_date"),
+        ("Paid Date", "paid_date"),
+        ("Status", "status", choice_label(StudentBill.STATUS_CHOICES)),
+        ("Created At", "created_at"),
+    ]
+
     def get_queryset(self):
         qs = StudentBill.objects.filter(
             tenant = self.request.user.tenant
@@ -299,7 +324,7 @@ class DownloadStudentFeeReceiptView(APIView):
             bill__student=request.user.student_profile,
         )
  
-        pdf_bytes = generate_fee_receipt_pdf(payment)
+        pdf_bytes = get_fee_receipt_pdf(payment)
         filename = f"EduQuest_Receipt_{payment.receipt_number}.pdf"
  
         response = HttpResponse(pdf_bytes, content_type="application/pdf")
@@ -308,6 +333,91 @@ class DownloadStudentFeeReceiptView(APIView):
         return response
 
 
+# ----ADMIN RECEIPT EXPORT----
+
+class PaymentExportMixin:
+    """
+    Params shared by the receipt exports (query string for the ledger, request
+    body for the receipt ZIP):
+    - start, end: payment dates, YYYY-MM-DD (required)
+    - class_id: only students of this class
+    - fee_type: only bills of this fee type
+    """
+    permission_classes = [IsAuthenticated, IsAdmin, HasActiveSubscription]
+
+    def export_params(self, params):
+        """
+        ((start, end, class_id, fee_type_id), None) for valid params, or
+        (None, 400 response) naming every bad one
+        """
+        errors = {}
+        try:
+            start = parse_date(str(params.get("start", "")))
+            end = parse_date(str(params.get("end", "")))
+        except ValueError:
+            start = end = None
+        if not start or not end or start > end:
+            errors["dates"] = "Give a valid start and end date (YYYY-MM-DD)"
+
+        ids = {}
+        for param in ("class_id", "fee_type"):
+            value = str(params.get(param) or "").strip()
+            if not value:
+                continue
+            try:
+                ids[param] = int(value)
+            except ValueError:
+                errors[param] = f"{param} must be an integer id"
+
+        if errors:
+            return None, Response(
+                {"detail": "Invalid export parameters", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return (start, end, ids.get("class_id"), ids.get("fee_type")), None
+
+
+class AdminReceiptExportView(PaymentExportMixin, APIView):
+    """
+    POST: queues a job that renders every fee receipt PDF in the date range
+    into a ZIP and notifies the requester with its download link. Rendering
+    runs in the jobs worker's process pool, not in the web process.
+    """
+
+    def post(self, request):
+        params, error = self.export_params(request.data)
+        if error:
+            return error
+        start, end, class_id, fee_type_id = params
+        job = enqueue(
+            export_receipts,
+            tenant_id = str(request.user.tenant_id),
+            start_date = start.isoformat(),
+            end_date = end.isoformat(),
+            class_id = class_id,
+            fee_type_id = fee_type_id,
+            requested_by = request.user.id,
+        )
+        return Response(
+            {"message": "Receipts are being exported", "job_id": getattr(job, "id", None)},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class AdminPaymentLedgerView(PaymentExportMixin, APIView):
+    """GET: CSV ledger of the same payments as the receipt export"""
+
+    def get(self, request):
+        params, error = self.export_params(request.query_params)
+        if error:
+            return error
+        start, end, class_id, fee_type_id = params
+        payments = export_payments(request.user.tenant, start, end, class_id, fee_type_id)
+        return streaming_response(
+            request, iter_ledger_csv(payments), "text/csv", export_filename("fee_ledger", start, end, "csv")
+        )
+
+
 # EXPENSES OF A SCHOOL
 
 # ==================== PAGINATION ====================
@@ -346,11 +456,24 @@ class ExpenseCategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # ==================== EXPENSE VIEWS ====================
 
-class ExpenseListCreateView(generics.ListCreateAPIView):
-    """List all expenses with filters or create new expense"""
+class ExpenseListCreateView(ExportMixin, generics.ListCreateAPIView):
+    """List all expenses with filters or create new expense; ?format=csv / xlsx exports every filtered row"""
     permission_classes = [IsAuthenticated, IsAdmin, HasActiveSubscription]
     pagination_class = ExpensePagination
 
+    export_filename = "expenses"
+    export_columns = [
+        ("Expense Date", "expense_date"),
+        ("Title", "title"),
+        ("Category", "category__name"),
+        ("Amount", "amount"),
+        ("Payment Method", "payment_method", choice_label(Expense.PAYMENT_METHOD_CHOICES)),
+        ("Payment Status", "payment_status", choice_label(Expense.PAYMENT_STATUS_CHOICES)),
+        ("Payment Date", "payment_date"),
+        ("Created By", ("created_by__first_name", "created_by__last_name"), joined),
+        ("Notes", "notes"),
+    ]
+
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return ExpenseCreateUpdateSerializer
@@ -0,0 +1,21 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from jobs.models import Artifact
+
+
+class Command(BaseCommand):
+    help = "Delete job artifacts (report cards, receipt exports) older than ARTIFACT_TTL_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=getattr(settings, "ARTIFACT_TTL_DAYS", 7))
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        count = 0
+        # One by one, so each file is removed from storage with its row
+        for artifact in Artifact.objects.filter(created_at__lt=cutoff).iterator():
+            artifact.delete()
+            count += 1
+        self.stdout.write(f"Deleted {count} artifact(s)")
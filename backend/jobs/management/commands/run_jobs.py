@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from jobs.queue import claim_jobs, run_job, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (emails, notification fan-out, bill generation)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds to wait when the queue is empty")
+
+    def handle(self, *args, **options):
+        while True:
+            requeue_stale_jobs()
+            jobs = claim_jobs(options["batch_size"])
+
+            for job in jobs:
+                job = run_job(job)
+                self.stdout.write(f"{job} attempts={job.attempts}")
+
+            if not jobs:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
@@ -0,0 +1,39 @@
+import base64
+import hashlib
+import json
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.db import migrations
+
+
+# Tasks registered with sensitive=True when their payloads started being encrypted
+SENSITIVE_TASKS = ["accounts.send_email", "accounts.send_mass_email"]
+
+
+def _seal(payload):
+    # Frozen copy of jobs.queue.seal_payload at the time of this migration:
+    # Fernet keyed by sha256("jobs.payload:" + SECRET_KEY), stored as {"encrypted": token}
+    key = base64.urlsafe_b64encode(hashlib.sha256(f"jobs.payload:{settings.SECRET_KEY}".encode()).digest())
+    return {"encrypted": Fernet(key).encrypt(json.dumps(payload).encode()).decode()}
+
+
+def seal_payloads(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    jobs = Job.objects.filter(name__in=SENSITIVE_TASKS).exclude(payload={})
+    # Finished jobs never need their credentials again
+    jobs.filter(status__in=["succeeded", "failed"]).update(payload={})
+    for job in jobs.filter(status__in=["pending", "running"]):
+        if set(job.payload) != {"encrypted"}:
+            job.payload = _seal(job.payload)
+            job.save(update_fields=["payload"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(seal_payloads, migrations.RunPython.noop),
+    ]
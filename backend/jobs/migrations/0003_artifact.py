@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:55
+
+import django.db.models.deletion
+import jobs.models
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_user_profile_image'),
+        ('jobs', '0002_seal_sensitive_payloads'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Artifact',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file', models.FileField(max_length=255, storage=jobs.models.artifact_storage, upload_to=jobs.models.artifact_path)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_for', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='artifacts', to=settings.AUTH_USER_MODEL)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='accounts.tenant')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,90 @@
+import os
+import uuid
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import storages
+from django.db import models
+from django.urls import reverse
+from django.utils import timezone
+
+# Create your models here.
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+def artifact_storage():
+    return storages["artifacts"]
+
+
+def artifact_path(instance, filename):
+    return f"{instance.tenant_id}/{filename}"
+
+
+class Artifact(models.Model):
+    """
+    A file a job produced for a user (report cards, receipt exports). Stored
+    in the private "artifacts" storage and only served by ArtifactDownloadView
+    to the user it was made for or an admin of its tenant.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey("accounts.Tenant", on_delete=models.CASCADE, related_name="artifacts")
+    created_for = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="artifacts"
+    )
+    file = models.FileField(storage=artifact_storage, upload_to=artifact_path, max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return self.filename
+
+    @classmethod
+    def store(cls, tenant_id, created_for_id, name, content):
+        """Save an open file as a new artifact"""
+        artifact = cls(tenant_id=tenant_id, created_for_id=created_for_id)
+        artifact.file.save(name, File(content), save=True)
+        return artifact
+
+    @property
+    def filename(self):
+        return os.path.basename(self.file.name)
+
+    def download_url(self):
+        return reverse("artifact-download", args=[self.pk])
+
+    def delete(self, *args, **kwargs):
+        self.file.delete(save=False)
+        return super().delete(*args, **kwargs)
@@ -0,0 +1,201 @@
+import base64
+import hashlib
+import json
+import logging
+import threading
+import traceback
+from datetime import timedelta
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- Task registry ----------
+
+_registry = {}
+
+
+def task(name, max_attempts=3, sensitive=False):
+    """
+    Register a function as a background task.
+    sensitive : encrypt the stored payload and clear it once the job finishes
+                (for payloads carrying credentials or OTPs)
+    """
+    def decorator(func):
+        func.task_name = name
+        func.max_attempts = max_attempts
+        func.sensitive = sensitive
+        _registry[name] = func
+        return func
+    return decorator
+
+
+# ---------- Payload encryption ----------
+
+_ENCRYPTED = "encrypted"
+
+
+def _fernet():
+    # A key per secret, so jobs queued before a SECRET_KEY rotation still
+    # decrypt while the old key is listed in SECRET_KEY_FALLBACKS
+    secrets = [settings.SECRET_KEY, *getattr(settings, "SECRET_KEY_FALLBACKS", [])]
+    return MultiFernet([
+        Fernet(base64.urlsafe_b64encode(hashlib.sha256(f"jobs.payload:{secret}".encode()).digest()))
+        for secret in secrets
+    ])
+
+
+def seal_payload(payload):
+    """The payload as stored for sensitive tasks: {"encrypted": token}"""
+    return {_ENCRYPTED: _fernet().encrypt(json.dumps(payload).encode()).decode()}
+
+
+def open_payload(stored):
+    """The task kwargs from a stored payload, sealed or not"""
+    if set(stored) != {_ENCRYPTED}:
+        return stored
+    try:
+        return json.loads(_fernet().decrypt(stored[_ENCRYPTED].encode()))
+    except InvalidToken:
+        raise ValueError("Job payload cannot be decrypted with the current SECRET_KEY or its fallbacks")
+
+
+# ---------- Backends ----------
+
+class EagerBackend:
+    """Runs tasks inline once the current transaction commits. Used in tests."""
+
+    # Idempotency keys seen by this process, as the Job table's unique key would
+    queued_keys = set()
+
+    def enqueue(self, func, payload, idempotency_key=None, run_after=None):
+        if idempotency_key:
+            if idempotency_key in self.queued_keys:
+                return None
+            self.queued_keys.add(idempotency_key)
+        transaction.on_commit(lambda: func(**payload))
+
+
+class DatabaseBackend:
+    """Stores jobs in the Job table for the run_jobs worker."""
+
+    def enqueue(self, func, payload, idempotency_key=None, run_after=None):
+        fields = {
+            "name": func.task_name,
+            "payload": seal_payload(payload) if func.sensitive else payload,
+            "max_attempts": func.max_attempts,
+            "run_after": run_after or timezone.now(),
+        }
+        if idempotency_key:
+            job, _ = Job.objects.get_or_create(idempotency_key=idempotency_key, defaults=fields)
+            return job
+        return Job.objects.create(**fields)
+
+
+def get_backend():
+    return import_string(getattr(settings, "JOBS_BACKEND", "jobs.queue.DatabaseBackend"))()
+
+
+def enqueue(func, idempotency_key=None, run_after=None, **payload):
+    """
+    Queue a registered task. Payload must be JSON serializable.
+    Jobs sharing an idempotency_key are only queued once.
+    """
+    return get_backend().enqueue(func, payload, idempotency_key=idempotency_key, run_after=run_after)
+
+
+# ---------- Worker ----------
+
+RETRY_BACKOFF_SECONDS = getattr(settings, "JOBS_RETRY_BACKOFF_SECONDS", 30)
+LOCK_TIMEOUT = timedelta(seconds=getattr(settings, "JOBS_LOCK_TIMEOUT_SECONDS", 600))
+# A running job's lock is renewed this often, so only dead workers' jobs go stale
+HEARTBEAT_SECONDS = getattr(settings, "JOBS_HEARTBEAT_SECONDS", LOCK_TIMEOUT.total_seconds() / 4)
+
+
+def requeue_stale_jobs():
+    """Hand back jobs whose worker died mid-run (no heartbeat for LOCK_TIMEOUT)"""
+    return Job.objects.filter(
+        status="running",
+        locked_at__lt=timezone.now() - LOCK_TIMEOUT,
+    ).update(status="pending", locked_at=None)
+
+
+def claim_jobs(limit):
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", run_after__lte=now)
+            .order_by("run_after", "id")[:limit]
+        )
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status="running",
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+    for job in jobs:
+        job.status = "running"
+        job.attempts += 1
+    return jobs
+
+
+def renew_lock(job_id):
+    Job.objects.filter(pk=job_id, status="running").update(locked_at=timezone.now())
+
+
+class _Heartbeat(threading.Thread):
+    """Renews a running job's lock until stopped"""
+
+    def __init__(self, job_id):
+        super().__init__(name=f"job-{job_id}-heartbeat", daemon=True)
+        self.job_id = job_id
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(HEARTBEAT_SECONDS):
+                renew_lock(self.job_id)
+        finally:
+            # The thread's own connection
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job):
+    func = _registry.get(job.name)
+    heartbeat = _Heartbeat(job.pk)
+    heartbeat.start()
+    try:
+        if func is None:
+            raise LookupError(f"No task registered as '{job.name}'")
+        result = func(**open_payload(job.payload))
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+            logger.error("Job %s failed after %s attempts", job, job.attempts)
+        else:
+            job.status = "pending"
+            job.run_after = timezone.now() + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+    else:
+        job.status = "succeeded"
+        job.result = result
+        job.last_error = ""
+    finally:
+        heartbeat.stop()
+
+    if job.status != "pending" and getattr(func, "sensitive", False):
+        job.payload = {}
+
+    job.locked_at = None
+    job.save(update_fields=["status", "result", "last_error", "run_after", "payload", "locked_at", "updated_at"])
+    return job
@@ -0,0 +1,148 @@
+import io
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import Tenant, User
+from subscription.models import Subscription, SubscriptionPlan
+from users.tests import make_school
+from .models import Artifact, Job
+from .queue import (
+    EagerBackend, LOCK_TIMEOUT, claim_jobs, enqueue, renew_lock, requeue_stale_jobs, run_job, task,
+)
+
+
+calls = []
+
+
+@task("jobs.tests.record")
+def record(value):
+    calls.append(value)
+    return value
+
+
+@task("jobs.tests.secret", sensitive=True)
+def secret(password):
+    calls.append(password)
+
+
+@task("jobs.tests.broken", max_attempts=2)
+def broken():
+    raise RuntimeError("boom")
+
+
+class JobTestCase(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        EagerBackend.queued_keys.clear()
+
+
+@override_settings(JOBS_BACKEND="jobs.queue.EagerBackend")
+class EagerBackendTests(JobTestCase):
+
+    def test_runs_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(record, value=1)
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_idempotency_key_runs_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(record, idempotency_key="once", value=1)
+            enqueue(record, idempotency_key="once", value=2)
+        self.assertEqual(calls, [1])
+
+
+class DatabaseBackendTests(JobTestCase):
+
+    def test_idempotency_key_queues_once(self):
+        first = enqueue(record, idempotency_key="once", value=1)
+        second = enqueue(record, idempotency_key="once", value=2)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_sensitive_payload_is_encrypted_and_cleared(self):
+        job = enqueue(secret, password="hunter2-plaintext")
+        stored = Job.objects.get(pk=job.pk).payload
+        self.assertNotIn("hunter2-plaintext", str(stored))
+
+        [job] = claim_jobs(10)
+        job = run_job(job)
+        self.assertEqual(calls, ["hunter2-plaintext"])
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(Job.objects.get(pk=job.pk).payload, {})
+
+    def test_failures_retry_then_fail(self):
+        job = enqueue(broken)
+
+        [job] = claim_jobs(10)
+        job = run_job(job)
+        self.assertEqual(job.status, "pending")
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        [job] = claim_jobs(10)
+        job = run_job(job)
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+
+    def test_only_jobs_without_heartbeat_are_requeued(self):
+        alive, dead = enqueue(record, value=1), enqueue(record, value=2)
+        claim_jobs(10)
+        Job.objects.update(locked_at=timezone.now() - LOCK_TIMEOUT - timedelta(seconds=1))
+        renew_lock(alive.pk)
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(Job.objects.get(pk=alive.pk).status, "running")
+        self.assertEqual(Job.objects.get(pk=dead.pk).status, "pending")
+
+
+def use_temporary_artifact_storage(test):
+    """Store the test's artifacts in a directory removed after it"""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    patcher = mock.patch.object(Artifact._meta.get_field("file"), "storage", FileSystemStorage(location=directory.name))
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    return directory.name
+
+
+class ArtifactDownloadTests(TestCase):
+
+    def setUp(self):
+        self.tenant, self.admin, self.teacher, _, [self.pupil] = make_school()
+        use_temporary_artifact_storage(self)
+        self.artifact = Artifact.store(self.tenant.pk, self.teacher.user_id, "cards.zip", io.BytesIO(b"PK zip"))
+
+    def download(self, user_id):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(pk=user_id))
+        return client.get(self.artifact.download_url())
+
+    def test_requester_and_tenant_admins_may_download(self):
+        for user_id in (self.teacher.user_id, self.admin.pk):
+            response = self.download(user_id)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b"".join(response.streaming_content), b"PK zip")
+            self.assertEqual(response["Content-Type"], "application/zip")
+
+    def test_other_users_may_not(self):
+        self.assertEqual(self.download(self.pupil.user_id).status_code, 403)
+        other = Tenant.objects.create(institute_name="Other", email="other@example.com", phone="2", status="active")
+        Subscription.objects.create(plan=SubscriptionPlan.objects.get(), tenant=other, is_active=True)
+        admin = User.objects.create(username="other@example.com", email="other@example.com", tenant=other, role="admin")
+        self.assertEqual(self.download(admin.pk).status_code, 404)
+
+    def test_purge_deletes_old_files(self):
+        path = self.artifact.file.path
+        Artifact.objects.filter(pk=self.artifact.pk).update(created_at=timezone.now() - timedelta(days=8))
+        call_command("purge_artifacts", days=7, stdout=io.StringIO())
+        self.assertFalse(Artifact.objects.exists())
+        self.assertFalse(os.path.exists(path))
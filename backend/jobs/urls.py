@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import ArtifactDownloadView
+
+urlpatterns = [
+    path("artifacts/<uuid:artifact_id>/download/", ArtifactDownloadView.as_view(), name="artifact-download"),
+]
@@ -0,0 +1,30 @@
+import mimetypes
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from accounts.permissions import HasActiveSubscription
+from backend.exports import streaming_response
+from .models import Artifact
+
+
+def iter_file(field, chunk_size=64 * 1024):
+    with field.open("rb") as f:
+        yield from f.chunks(chunk_size)
+
+
+class ArtifactDownloadView(APIView):
+    """GET: a file a job produced, for the user it was made for or an admin of the same tenant"""
+    permission_classes = [IsAuthenticated, HasActiveSubscription]
+
+    def get(self, request, artifact_id):
+        user = request.user
+        artifact = get_object_or_404(Artifact, pk = artifact_id, tenant_id = user.tenant_id)
+        if user.role != "admin" and artifact.created_for_id != user.id:
+            return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
+        if not artifact.file.storage.exists(artifact.file.name):
+            return Response({"detail": "File no longer available"}, status=status.HTTP_404_NOT_FOUND)
+
+        content_type = mimetypes.guess_type(artifact.filename)[0] or "application/octet-stream"
+        return streaming_response(request, iter_file(artifact.file), content_type, artifact.filename)
@@ -0,0 +1,111 @@
+import asyncio
+import statistics
+import time
+from itertools import zip_longest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from channels.testing import HttpCommunicator, WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+# Drives the ASGI application in-process with concurrent websocket handshakes
+# (JWTCookieMiddleware -> database_sync_to_async user lookup) and API calls,
+# counting database connections opened and timing each operation. Run it once
+# per DB_CONN_MODE to compare connection churn and latency.
+
+API_PATH = "/api/notifications/"
+WS_PATH = "/ws/notifications/"
+
+
+class Command(BaseCommand):
+    help = "Measure database connection churn and latency under concurrent websocket handshakes and API calls."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-id", help="Authenticate as this user (default: the first active user)")
+        parser.add_argument("--handshakes", type=int, default=200, help="Websocket connects")
+        parser.add_argument("--requests", type=int, default=200, help=f"GET {API_PATH} calls")
+        parser.add_argument("--concurrency", type=int, default=20, help="Operations in flight at once")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.filter(is_active=True)
+        user = users.filter(pk=options["user_id"]).first() if options["user_id"] else users.order_by("pk").first()
+        if user is None:
+            raise CommandError("No active user to authenticate as")
+        token = str(AccessToken.for_user(user))
+        # Start from no open connection, as a fresh server process would
+        connection.close()
+
+        from backend.asgi import application
+
+        opened = []
+        connection_created.connect(lambda sender, connection, **kwargs: opened.append(1), weak=False)
+
+        began = time.perf_counter()
+        timings = asyncio.run(self._run(application, token, options))
+        seconds = time.perf_counter() - began
+
+        database = settings.DATABASES["default"]
+        mode = "pool" if database.get("OPTIONS", {}).get("pool") else f"CONN_MAX_AGE={database.get('CONN_MAX_AGE', 0)}"
+        self.stdout.write(f"{database['ENGINE'].rsplit('.', 1)[-1]}, {mode}, concurrency {options['concurrency']}")
+        self.stdout.write(f"{'operation':<12} {'count':>6} {'failed':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for kind, results in timings.items():
+            latencies = sorted(ms for ms, ok in results if ok)
+            if not latencies:
+                if results:
+                    self.stdout.write(f"{kind:<12} {len(results):>6} {len(results):>7}")
+                continue
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"{kind:<12} {len(results):>6} {len(results) - len(latencies):>7} "
+                f"{statistics.median(latencies):>8.1f} {p95:>8.1f} {latencies[-1]:>8.1f}"
+            )
+
+        operations = sum(len(results) for results in timings.values())
+        self.stdout.write(f"{operations} operations in {seconds:.2f}s ({operations / seconds:.0f}/s)")
+        self.stdout.write(f"Connections opened by Django: {len(opened)} ({len(opened) / max(operations, 1):.2f} per operation)")
+        pool = getattr(connection, "pool", None)
+        if pool is not None:
+            stats = pool.get_stats()
+            self.stdout.write(
+                f"Pool: {stats.get('connections_num', 0)} physical connection(s) opened, "
+                f"{stats.get('requests_waiting', 0)} waiting, {stats.get('requests_wait_ms', 0)} ms total wait"
+            )
+
+    async def _run(self, application, token, options):
+        limit = asyncio.Semaphore(options["concurrency"])
+        timings = {"handshake": [], "api": []}
+
+        async def timed(kind, operation):
+            async with limit:
+                began = time.perf_counter()
+                try:
+                    ok = await operation()
+                except Exception:
+                    ok = False
+                timings[kind].append(((time.perf_counter() - began) * 1000, ok))
+
+        async def handshake():
+            communicator = WebsocketCommunicator(
+                application, WS_PATH, headers=[(b"cookie", f"access_token={token}".encode())]
+            )
+            connected, _ = await communicator.connect()
+            await communicator.disconnect()
+            return connected
+
+        async def api_call():
+            communicator = HttpCommunicator(
+                application, "GET", API_PATH,
+                headers=[(b"host", b"localhost"), (b"authorization", f"Bearer {token}".encode())],
+            )
+            response = await communicator.get_response(timeout=30)
+            return response["status"] == 200
+
+        handshakes = [timed("handshake", handshake) for _ in range(options["handshakes"])]
+        calls = [timed("api", api_call) for _ in range(options["requests"])]
+        # Interleave the two kinds so they contend with each other
+        await asyncio.gather(*(op for pair in zip_longest(handshakes, calls) for op in pair if op is not None))
+        return timings
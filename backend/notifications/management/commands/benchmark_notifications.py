@@ -0,0 +1,96 @@
+import time
+import uuid
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from accounts.models import User
+from notifications.models import Notification
+from notifications.utils import fan_out_notifications
+
+
+# Sends one notification to synthetic recipients through the old per-recipient
+# path (Notification.objects.create and async_to_sync(group_send) each) and
+# through fan_out_notifications, using the configured channel layer. The
+# recipients and notifications are rolled back afterwards.
+
+
+def _int_list(value):
+    try:
+        return [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise CommandError(f"Expected comma-separated integers, got {value!r}")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _per_recipient(recipient_ids, notif_type, title, message, link=""):
+    """The fan-out before batching, kept here for comparison"""
+    channel_layer = get_channel_layer()
+    for recipient_id in recipient_ids:
+        notif = Notification.objects.create(
+            recipient_id=recipient_id, notif_type=notif_type, title=title, message=message, link=link,
+        )
+        async_to_sync(channel_layer.group_send)(
+            f"notif_user_{recipient_id}",
+            {
+                "type": "notify",
+                "id": notif.id,
+                "notif_type": notif_type,
+                "title": title,
+                "message": message,
+                "link": link,
+                "created_at": notif.created_at.isoformat(),
+            },
+        )
+
+
+class _QueryCounter:
+    # CaptureQueriesContext keeps at most 9000 queries; 10k recipients need more
+    count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare queries and time of the per-recipient and batched notification "
+        "fan-out for each recipient count. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", default="10,1000,10000", help="Comma-separated recipient counts")
+        parser.add_argument("--skip-per-recipient", action="store_true", help="Only time the batched fan-out")
+
+    def handle(self, *args, **options):
+        paths = [("batched", fan_out_notifications)]
+        if not options["skip_per_recipient"]:
+            paths.insert(0, ("per-recipient", _per_recipient))
+
+        self.stdout.write(f"{'recipients':>10} {'path':>14} {'queries':>8} {'seconds':>8}")
+        try:
+            with transaction.atomic():
+                for count in _int_list(options["recipients"]):
+                    recipient_ids = self._recipients(count)
+                    for name, send in paths:
+                        queries = _QueryCounter()
+                        with connection.execute_wrapper(queries):
+                            began = time.perf_counter()
+                            send(recipient_ids, "announcement", "Benchmark", "Benchmark notification")
+                            seconds = time.perf_counter() - began
+                        self.stdout.write(f"{count:>10} {name:>14} {queries.count:>8} {seconds:>8.3f}")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _recipients(self, count):
+        run = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create([
+            User(username=f"bench-{run}-{i}", email=f"bench-{run}-{i}@example.com", role="student")
+            for i in range(count)
+        ], batch_size=1000)
+        return [user.pk for user in users]
@@ -1,7 +1,8 @@
 from django.db.models.signals import post_save, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .utils import send_notification
+from jobs.queue import enqueue
+from .tasks import fan_out
 
 User = get_user_model()
 
@@ -12,23 +13,23 @@ def on_assignment_classes_changed(sender, instance, action, **kwargs):
     if action != "post_add":
         return
 
-    students = User.objects.filter(
+    student_ids = list(User.objects.filter(
         student_profile__school_class__in=instance.classes.all(),
         role="student",
-        tenant=instance.tenant,
-    ).distinct()
+        tenant_id=instance.tenant_id,
+    ).distinct().values_list("id", flat=True))
 
-    print(f"🎯 Assignment classes: {list(instance.classes.all())}")
-    print(f"🎯 Students found: {list(students)}")
+    if not student_ids:
+        return
 
-    if students.exists():
-        send_notification(
-            recipients=list(students),
-            notif_type="assignment",
-            title="New Assignment",
-            message=f"{instance.title} — due {instance.due_date.strftime('%d %b %Y')}",
-            link="/student/assignment"
-        )
+    enqueue(
+        fan_out,
+        recipient_ids=student_ids,
+        notif_type="assignment",
+        title="New Assignment",
+        message=f"{instance.title} — due {instance.due_date.strftime('%d %b %Y')}",
+        link="/student/assignment",
+    )
 
 
 # ---------- EXAM ----------
@@ -37,20 +38,23 @@ def on_exam_classes_changed(sender, instance, action, **kwargs):
     if action != "post_add":
         return
 
-    students = User.objects.filter(
+    student_ids = list(User.objects.filter(
         student_profile__school_class__in=instance.classes.all(),
         role="student",
-        tenant=instance.tenant,
-    ).distinct()
+        tenant_id=instance.tenant_id,
+    ).distinct().values_list("id", flat=True))
 
-    if students.exists():
-        send_notification(
-            recipients=list(students),
-            notif_type="exam",
-            title="Exam Scheduled",
-            message=f"{instance.title} on {instance.exam_date.strftime('%d %b %Y')} at {instance.start_time.strftime('%I:%M %p')}",
-            link="/student/exam",
-        )
+    if not student_ids:
+        return
+
+    enqueue(
+        fan_out,
+        recipient_ids=student_ids,
+        notif_type="exam",
+        title="Exam Scheduled",
+        message=f"{instance.title} on {instance.exam_date.strftime('%d %b %Y')} at {instance.start_time.strftime('%I:%M %p')}",
+        link="/student/exam",
+    )
 
 
 # ------------- FEE BILL------------------
@@ -59,8 +63,9 @@ def on_exam_classes_changed(sender, instance, action, **kwargs):
 def on_bill_created(sender, instance, created, **kwargs):
     if not created:
         return
-    send_notification(
-        recipients=[instance.student.user],
+    enqueue(
+        fan_out,
+        recipient_ids=[instance.student.user_id],
         notif_type="fee",
         title="New Fee Bill",
         message=f"₹{instance.amount} due by {instance.due_date.strftime('%d %b %Y')} — {instance.fee_structure.fee_type.name}",
@@ -75,21 +80,25 @@ def on_announcement_created(sender, instance, created, **kwargs):
     if not created:
         return
 
-    recipients = []
-    if instance.target_audience in ["students", "all"]:
-        recipients = list(User.objects.filter(
-            tenant=instance.tenant,
-            role="student",
-        ))
+    if instance.target_audience not in ["students", "all"]:
+        return
+
+    student_ids = list(User.objects.filter(
+        tenant_id=instance.tenant_id,
+        role="student",
+    ).values_list("id", flat=True))
+
+    if not student_ids:
+        return
 
-    if recipients:
-        send_notification(
-            recipients=recipients,
-            notif_type="announcement",
-            title="New Announcement",
-            message=instance.title,
-            link="/student/announcements",
-        )
+    enqueue(
+        fan_out,
+        recipient_ids=student_ids,
+        notif_type="announcement",
+        title="New Announcement",
+        message=instance.title,
+        link="/student/announcements",
+    )
 
 
 # --------------- MEETING-------------------
@@ -99,22 +108,26 @@ def on_meeting_created(sender, instance, created, **kwargs):
     if not created:
         return
 
-    recipients = []
-    if instance.meeting_type == "class_meeting":
-        recipients = list(User.objects.filter(
-            student_profile__school_class=instance.school_class,
-            role="student",
-            tenant=instance.tenant,
-        ))
-
-    if recipients:
-        send_notification(
-            recipients=recipients,
-            notif_type="meeting",
-            title="Meeting Scheduled",
-            message=f"{instance.title} on {instance.scheduled_at.strftime('%d %b %Y %I:%M %p')}",
-            link="/student/meetings",
-        )
+    if instance.meeting_type != "class_meeting":
+        return
+
+    student_ids = list(User.objects.filter(
+        student_profile__school_class_id=instance.school_class_id,
+        role="student",
+        tenant_id=instance.tenant_id,
+    ).values_list("id", flat=True))
+
+    if not student_ids:
+        return
+
+    enqueue(
+        fan_out,
+        recipient_ids=student_ids,
+        notif_type="meeting",
+        title="Meeting Scheduled",
+        message=f"{instance.title} on {instance.scheduled_at.strftime('%d %b %Y %I:%M %p')}",
+        link="/student/meetings",
+    )
 
 
 # ── Connect m2m signals AFTER functions are defined ──────────────────────────
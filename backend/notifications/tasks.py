@@ -0,0 +1,7 @@
+from jobs.queue import task
+from .utils import fan_out_notifications
+
+
+@task("notifications.fan_out")
+def fan_out(recipient_ids, notif_type, title, message, link = ""):
+    return fan_out_notifications(recipient_ids, notif_type, title, message, link)
@@ -1,3 +1,31 @@
+from unittest import mock
 from django.test import TestCase
+from accounts.models import User
+from jobs.queue import claim_jobs, enqueue, run_job
+from .models import Notification
+from .tasks import fan_out
 
-# Create your tests here.
+
+class _BrokenLayer:
+    """A channel layer whose backend (e.g. Redis) is down"""
+
+    async def group_send(self, group, message):
+        raise ConnectionError("channel layer unavailable")
+
+
+class FanOutTests(TestCase):
+
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f"u{i}@example.com", email=f"u{i}@example.com", role="student")
+            for i in range(3)
+        ]
+
+    def test_push_failure_does_not_fail_or_duplicate(self):
+        job = enqueue(fan_out, recipient_ids=[u.pk for u in self.users], notif_type="announcement", title="Hi", message="-")
+        [job] = claim_jobs(10)
+        with mock.patch("notifications.utils.get_channel_layer", return_value=_BrokenLayer()), \
+                self.assertLogs("notifications.utils", "WARNING"):
+            job = run_job(job)
+        self.assertEqual((job.status, job.result), ("succeeded", 3))
+        self.assertEqual(Notification.objects.count(), 3)
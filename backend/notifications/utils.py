@@ -1,39 +1,103 @@
-import json
+import asyncio
+import logging
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
 from . models import Notification
 
 
-def send_notification(recipients, notif_type, title, message, link = ""):
+NOTIFICATION_BATCH_SIZE = getattr(settings, "NOTIFICATION_BATCH_SIZE", 500)
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def _push_all(channel_layer, events):
+    """One event loop for the whole fan-out; sends are awaited a chunk at a time. Returns the failed sends."""
+    failed = 0
+    for chunk in _chunks(events, NOTIFICATION_BATCH_SIZE):
+        results = await asyncio.gather(*(
+            channel_layer.group_send(group, event) for group, event in chunk
+        ), return_exceptions=True)
+        failed += sum(isinstance(result, Exception) for result in results)
+    return failed
+
+
+def fan_out_notifications(recipient_ids, notif_type, title, message, link = ""):
     """
-    Call this from anywhere to send a real-time notification.
-    link       : frontend route to open on click e.g. "/student/assignment"
+    Save one Notification per recipient with a bulk_create per chunk, then push
+    them all over the channel layer. Returns the number of notifications created.
+
+    The rows are saved in one transaction and the push is best effort: a channel
+    layer failure is logged, not raised, so a retried job never saves the
+    notifications twice. Offline or unreached users see them on their next load.
     """
     channel_layer = get_channel_layer()
+    events = []
+
+    with transaction.atomic():
+        for chunk in _chunks(recipient_ids, NOTIFICATION_BATCH_SIZE):
+            # Save to DB so users see it even if they were offline
+            notifs = Notification.objects.bulk_create([
+                Notification(
+                    recipient_id = recipient_id,
+                    notif_type = notif_type,
+                    title = title,
+                    message = message,
+                    link = link,
+                )
+                for recipient_id in chunk
+            ])
+
+            events.extend(
+                (
+                    f"notif_user_{notif.recipient_id}",
+                    {
+                        "type":       "notify",
+                        "id":         notif.id,
+                        "notif_type": notif_type,
+                        "title":      title,
+                        "message":    message,
+                        "link":       link,
+                        "created_at": notif.created_at.isoformat(),
+                    },
+                )
+                for notif in notifs
+            )
+
+    # Push instantly over WebSocket to users who are online
+    if events and channel_layer is not None:
+        try:
+            failed = async_to_sync(_push_all)(channel_layer, events)
+        except Exception:
+            logger.exception("Pushing %s notification(s) over the channel layer failed", len(events))
+        else:
+            if failed:
+                logger.warning("%s of %s notification push(es) failed", failed, len(events))
+
+    return len(events)
 
-    for user in recipients:
-        # Save to DB so user sees it even if they were offline
-        notif = Notification.objects.create(
-            recipient = user,
-            notif_type = notif_type,
-            title = title,
-            message = message,
-            link = link,
-        )
-
-        # Push instantly over WebSocket if user is online
-        async_to_sync(channel_layer.group_send)(
-            f"notif_user_{user.id}",
-            {
-                "type":       "notify",
-                "id":         notif.id,
-                "notif_type": notif_type,
-                "title":      title,
-                "message":    message,
-                "link":       link,
-                "created_at": notif.created_at.isoformat(),
-            }
-        )
 
+def send_notification(recipients, notif_type, title, message, link = "", on_commit = False):
+    """
+    Call this from anywhere to send a real-time notification.
+    recipients : users or user ids
+    link       : frontend route to open on click e.g. "/student/assignment"
+    on_commit  : defer the fan-out until the current transaction commits
+    """
+    recipient_ids = list(dict.fromkeys(getattr(r, "pk", r) for r in recipients))
+    if not recipient_ids:
+        return
 
+    def run():
+        fan_out_notifications(recipient_ids, notif_type, title, message, link)
 
+    if on_commit:
+        transaction.on_commit(run)
+    else:
+        run()
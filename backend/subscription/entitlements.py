@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .models import Subscription
+
+
+# Per-tenant subscription entitlement cache.
+# Stores the expiry of the tenant's current active subscription and the tenant's
+# status (or None when there is no subscription) so HasActiveSubscription never
+# touches the database on a warm cache. A suspended tenant has no entitlement.
+
+ENTITLEMENT_TTL = getattr(settings, "SUBSCRIPTION_ENTITLEMENT_TTL", 300)
+
+_NO_SUBSCRIPTION = "none"
+
+
+def entitlement_key(tenant_id):
+    return f"subscription:entitlement:{tenant_id}"
+
+
+def get_entitlement(tenant_id):
+    """
+    Returns (has_subscription, expiry_date, tenant_status) for the tenant,
+    using the cache when possible. expiry_date may be None for subscriptions
+    without an expiry.
+    """
+    key = entitlement_key(tenant_id)
+    cached = cache.get(key)
+
+    if cached is None:
+        subscription = (
+            Subscription.objects
+            .filter(tenant_id=tenant_id, is_active=True)
+            .order_by('-expiry_date')
+            .values("expiry_date", "tenant__status")
+            .first()
+        )
+        cached = {
+            "expiry_date": subscription["expiry_date"],
+            "tenant_status": subscription["tenant__status"],
+        } if subscription else _NO_SUBSCRIPTION
+        cache.set(key, cached, ENTITLEMENT_TTL)
+
+    if cached == _NO_SUBSCRIPTION:
+        return False, None, None
+    return True, cached["expiry_date"], cached.get("tenant_status")
+
+
+def has_active_entitlement(tenant_id):
+    has_subscription, expiry_date, tenant_status = get_entitlement(tenant_id)
+    if not has_subscription or tenant_status == "suspended":
+        return False
+    # Expired rows are deactivated by the expire_subscriptions sweep, not here.
+    return not (expiry_date and expiry_date < timezone.now())
+
+
+def invalidate_entitlement(tenant_id):
+    cache.delete(entitlement_key(tenant_id))
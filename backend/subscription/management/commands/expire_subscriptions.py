@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from subscription.models import Subscription
+from subscription.entitlements import invalidate_entitlement
+
+
+class Command(BaseCommand):
+    help = "Deactivate subscriptions past their expiry date and refresh tenant entitlements."
+
+    def handle(self, *args, **options):
+        expired = Subscription.objects.filter(is_active=True, expiry_date__lt=timezone.now())
+        tenant_ids = set(expired.values_list("tenant_id", flat=True))
+
+        # queryset.update() skips post_save, so entitlements are invalidated explicitly
+        count = expired.update(is_active=False, updated_at=timezone.now())
+        for tenant_id in tenant_ids:
+            invalidate_entitlement(tenant_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deactivated {count} expired subscription(s) across {len(tenant_ids)} tenant(s)."
+        ))
@@ -1,6 +1,6 @@
 from django.db import models
 from django.conf import settings
-from accounts.models import Tenant
+from accounts.models import Tenant, LoadedValuesMixin
 from decimal import Decimal
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
@@ -53,7 +53,7 @@ class Subscription(models.Model):
 
 
 
-class Payment(models.Model):
+class Payment(LoadedValuesMixin, models.Model):
     STATUS_CHOICES = [
         ('pending','Pending'),
         ('paid','Paid'),
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Subscription
+from .entitlements import invalidate_entitlement
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def on_subscription_changed(sender, instance, **kwargs):
+    tenant_id = instance.tenant_id
+    # Wait for commit so a concurrent request can't re-cache the old state
+    transaction.on_commit(lambda: invalidate_entitlement(tenant_id))
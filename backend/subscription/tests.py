@@ -1,3 +1,33 @@
+from datetime import timedelta
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from accounts.models import Tenant
+from .entitlements import has_active_entitlement, invalidate_entitlement
+from .models import Subscription, SubscriptionPlan
 
-# Create your tests here.
+
+class EntitlementTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(institute_name="School", email="school@example.com", phone="1", status="active")
+        plan = SubscriptionPlan.objects.create(plan_name="Basic", duration_months=12)
+        self.subscription = Subscription.objects.create(plan=plan, tenant=self.tenant, is_active=True)
+
+    def test_active_subscription_is_cached(self):
+        self.assertTrue(has_active_entitlement(self.tenant.id))
+        with self.assertNumQueries(0):
+            self.assertTrue(has_active_entitlement(self.tenant.id))
+
+    def test_expired_subscription_has_no_entitlement(self):
+        Subscription.objects.filter(pk=self.subscription.pk).update(expiry_date=timezone.now() - timedelta(days=1))
+        invalidate_entitlement(self.tenant.id)
+        self.assertFalse(has_active_entitlement(self.tenant.id))
+
+    def test_suspended_tenant_loses_access(self):
+        self.assertTrue(has_active_entitlement(self.tenant.id))
+        self.tenant.status = "suspended"
+        self.tenant.save()
+        invalidate_entitlement(self.tenant.id)
+        self.assertFalse(has_active_entitlement(self.tenant.id))
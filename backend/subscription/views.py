@@ -10,7 +10,7 @@ from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from . razorpay_client import get_razorpay_client
-from .invoice_utils import generate_invoice_pdf
+from .invoice_utils import get_invoice_pdf
 from django.http import HttpResponse
 
 
@@ -200,7 +200,7 @@ class DownloadInvoiceView(APIView):
             status = "paid",
         )
 
-        pdf_bytes = generate_invoice_pdf(payment)
+        pdf_bytes = get_invoice_pdf(payment)
 
         invoice_filename = f"EduQuest_Invoice_{payment.id:05d}.pdf"
 
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from superadmin.metrics import refresh_platform_metrics
+
+
+class Command(BaseCommand):
+    help = "Recompute the super admin dashboard platform metrics snapshot. Schedule it (e.g. every 15 minutes)."
+
+    def handle(self, *args, **options):
+        snapshot = refresh_platform_metrics()
+        self.stdout.write(self.style.SUCCESS(f"Platform metrics refreshed at {snapshot.computed_at:%Y-%m-%d %H:%M:%S}."))
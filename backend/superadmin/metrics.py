@@ -0,0 +1,210 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum, Count, Q, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from accounts.models import Tenant, User
+from subscription.models import Payment, Subscription
+from .models import PlatformMetricsSnapshot
+
+
+# Platform-wide metrics for the super admin dashboard.
+# refresh_platform_metrics() recomputes everything (run it from cron via the
+# refresh_platform_metrics command); between runs the signals in superadmin.signals
+# keep the KPI counters current with F() increments on the snapshot row.
+
+ZERO = Decimal("0")
+
+# Snapshot counter per tenant status / user role; values missing here are not counted
+TENANT_STATUS_COUNTERS = {
+    "active": "tenant_active",
+    "inactive": "tenant_inactive",
+    "suspended": "tenant_suspended",
+    "trial": "tenant_trial",
+}
+USER_ROLE_COUNTERS = {"admin": "total_admins", "teacher": "total_teachers", "student": "total_students"}
+
+STATUS_COLORS = [
+    ("active",    "Active",    "#10B981"),
+    ("inactive",  "Inactive",  "#6B7280"),
+    ("suspended", "Suspended", "#EF4444"),
+    ("trial",     "Trial",     "#F59E0B"),
+]
+
+
+def month_start(now=None):
+    now = now or timezone.now()
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def compute_platform_metrics(now=None):
+    """Run the full set of platform queries. Returns the snapshot field values."""
+    now = now or timezone.now()
+    this_month_start = month_start(now)
+    twelve_months_ago = now - timedelta(days=365)
+
+    tenant_stats = Tenant.objects.aggregate(
+        tenant_total=Count("id"),
+        tenant_new_month=Count("id", filter=Q(created_at__gte=this_month_start)),
+        **{field: Count("id", filter=Q(status=s)) for s, field in TENANT_STATUS_COUNTERS.items()},
+    )
+
+    user_stats = User.objects.aggregate(**{
+        field: Count("id", filter=Q(role=role)) for role, field in USER_ROLE_COUNTERS.items()
+    })
+
+    paid_payments = Payment.objects.filter(status="paid")
+    revenue = paid_payments.aggregate(
+        total_revenue=Sum("amount"),
+        month_revenue=Sum("amount", filter=Q(created_at__gte=this_month_start)),
+    )
+
+    subs = Subscription.objects.aggregate(
+        active_subs=Count("id", filter=Q(is_active=True)),
+        expired_subs=Count("id", filter=Q(is_active=False, expiry_date__lt=now)),
+    )
+
+    revenue_by_month = (
+        paid_payments
+        .filter(created_at__gte=twelve_months_ago)
+        .annotate(month=TruncMonth("created_at"))
+        .values("month")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by("month")
+    )
+    tenants_by_month = (
+        Tenant.objects
+        .filter(created_at__gte=twelve_months_ago)
+        .annotate(month=TruncMonth("created_at"))
+        .values("month")
+        .annotate(count=Count("id"))
+        .order_by("month")
+    )
+    plan_stats = (
+        Subscription.objects
+        .values("plan__plan_name")
+        .annotate(count=Count("id"))
+        .order_by("-count")
+    )
+    recent_tenants = (
+        Tenant.objects
+        .order_by("-created_at")[:8]
+        .values("id", "institute_name", "email", "status", "created_at", "phone")
+    )
+    recent_payments = paid_payments.select_related("tenant").order_by("-created_at")[:8]
+
+    data = {
+        "active_subs":  subs["active_subs"],
+        "expired_subs": subs["expired_subs"],
+        "revenue_chart": [
+            {
+                "month": r["month"].strftime("%b %Y"),
+                "revenue": float(r["total"]),
+                "payments": r["count"],
+            }
+            for r in revenue_by_month
+        ],
+        "tenant_chart": [
+            {"month": r["month"].strftime("%b %Y"), "count": r["count"]}
+            for r in tenants_by_month
+        ],
+        "plan_chart": [
+            {"plan": p["plan__plan_name"], "count": p["count"]}
+            for p in plan_stats
+        ],
+        "recent_tenants": [
+            {
+                "id": str(t["id"]),
+                "institute_name": t["institute_name"],
+                "email": t["email"],
+                "status": t["status"],
+                "phone": t["phone"],
+                "created_at": t["created_at"].strftime("%d %b %Y"),
+            }
+            for t in recent_tenants
+        ],
+        "recent_payments": [
+            {
+                "id": p.id,
+                "institute": p.tenant.institute_name,
+                "amount": float(p.amount),
+                "currency": p.currency,
+                "created_at": p.created_at.strftime("%d %b %Y"),
+            }
+            for p in recent_payments
+        ],
+    }
+
+    return {
+        **tenant_stats,
+        **user_stats,
+        "total_revenue": revenue["total_revenue"] or ZERO,
+        "month_revenue": revenue["month_revenue"] or ZERO,
+        "month_start": this_month_start,
+        "data": data,
+        "computed_at": now,
+    }
+
+
+def refresh_platform_metrics():
+    """Recompute and store the snapshot. Returns the saved row."""
+    snapshot, _ = PlatformMetricsSnapshot.objects.update_or_create(
+        pk=PlatformMetricsSnapshot.SINGLETON_ID,
+        defaults=compute_platform_metrics(),
+    )
+    return snapshot
+
+
+def get_platform_metrics():
+    """
+    The current snapshot: one primary-key lookup. Rebuilt inline only when it is
+    missing or its month counters belong to a previous month.
+    """
+    snapshot = PlatformMetricsSnapshot.objects.filter(pk=PlatformMetricsSnapshot.SINGLETON_ID).first()
+    if snapshot is None or snapshot.month_start < month_start():
+        snapshot = refresh_platform_metrics()
+    return snapshot
+
+
+def adjust_counters(**deltas):
+    """Apply counter deltas after the surrounding transaction commits"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    transaction.on_commit(lambda: PlatformMetricsSnapshot.objects.filter(
+        pk=PlatformMetricsSnapshot.SINGLETON_ID,
+    ).update(**{field: F(field) + value for field, value in deltas.items()}))
+
+
+def serialize_platform_metrics(snapshot):
+    """Dashboard payload, same shape as the old live-query response plus computed_at"""
+    data = snapshot.data
+    return {
+        # KPI cards
+        "kpis": {
+            "tenant_total":     snapshot.tenant_total,
+            "tenant_active":    snapshot.tenant_active,
+            "tenant_new_month": snapshot.tenant_new_month,
+            "total_revenue":    float(snapshot.total_revenue),
+            "month_revenue":    float(snapshot.month_revenue),
+            "active_subs":      data.get("active_subs", 0),
+            "expired_subs":     data.get("expired_subs", 0),
+            "total_users":      snapshot.total_admins + snapshot.total_teachers + snapshot.total_students,
+            "total_admins":     snapshot.total_admins,
+            "total_teachers":   snapshot.total_teachers,
+            "total_students":   snapshot.total_students,
+        },
+        # Charts
+        "revenue_chart":  data.get("revenue_chart", []),
+        "tenant_chart":   data.get("tenant_chart", []),
+        "plan_chart":     data.get("plan_chart", []),
+        "status_chart": [
+            {"status": label, "count": getattr(snapshot, TENANT_STATUS_COUNTERS[key]), "color": color}
+            for key, label, color in STATUS_COLORS
+        ],
+        # Tables
+        "recent_tenants":  data.get("recent_tenants", []),
+        "recent_payments": data.get("recent_payments", []),
+        "computed_at": snapshot.computed_at,
+    }
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformMetricsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant_total', models.IntegerField(default=0)),
+                ('tenant_active', models.IntegerField(default=0)),
+                ('tenant_inactive', models.IntegerField(default=0)),
+                ('tenant_suspended', models.IntegerField(default=0)),
+                ('tenant_trial', models.IntegerField(default=0)),
+                ('tenant_new_month', models.IntegerField(default=0)),
+                ('total_admins', models.IntegerField(default=0)),
+                ('total_teachers', models.IntegerField(default=0)),
+                ('total_students', models.IntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('month_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('month_start', models.DateTimeField()),
+                ('data', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
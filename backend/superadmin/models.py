@@ -1,3 +1,34 @@
 from django.db import models
 
 # Create your models here.
+
+
+class PlatformMetricsSnapshot(models.Model):
+    """
+    Single-row snapshot behind the super admin dashboard, maintained by superadmin.metrics.
+    The counter columns are adjusted on tenant, user and payment writes; charts and
+    tables in `data` are rebuilt by the refresh_platform_metrics command.
+    """
+    SINGLETON_ID = 1
+
+    tenant_total = models.IntegerField(default=0)
+    tenant_active = models.IntegerField(default=0)
+    tenant_inactive = models.IntegerField(default=0)
+    tenant_suspended = models.IntegerField(default=0)
+    tenant_trial = models.IntegerField(default=0)
+    tenant_new_month = models.IntegerField(default=0)
+
+    total_admins = models.IntegerField(default=0)
+    total_teachers = models.IntegerField(default=0)
+    total_students = models.IntegerField(default=0)
+
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    month_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # First day of the month that tenant_new_month and month_revenue count
+    month_start = models.DateTimeField()
+    data = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Platform metrics @ {self.computed_at}"
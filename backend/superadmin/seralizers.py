@@ -1,11 +1,11 @@
 from rest_framework import serializers
-from accounts.models import Tenant,User
-from subscription.models import Subscription,Payment
+from accounts.models import Tenant
 
 
 class TenantListSerializer(serializers.ModelSerializer):
-    current_plan = serializers.SerializerMethodField()
-    subscription_expiry = serializers.SerializerMethodField()
+    # Annotated by SuperAdminTenantListView.get_queryset()
+    current_plan = serializers.CharField(read_only=True)
+    subscription_expiry = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = Tenant
@@ -19,38 +19,22 @@ class TenantListSerializer(serializers.ModelSerializer):
             "current_plan",
             "subscription_expiry",
         ]
-
-    def get_current_plan(self, obj):
-        sub = (
-            obj.subscriptions.filter(is_active = True)
-            .order_by("start_date").first()
-        )
-        return sub.plan.plan_name if sub else "-"
-    
-    def get_subscription_expiry(self, obj):
-        sub = (
-            obj.subscriptions.filter(is_active = True)
-            .order_by("start_date").first()
-        )
-        return sub.expiry_date if sub else None
     
 
 class TenantBillingSerializer(serializers.ModelSerializer):
+    # admin_email is annotated and subscriptions/payments prefetched by SuperAdminBillingView.get_queryset()
     subscription = serializers.SerializerMethodField()
     payments = serializers.SerializerMethodField()
-    admin_email = serializers.SerializerMethodField()
+    admin_email = serializers.EmailField(read_only=True)
 
     class Meta:
         model = Tenant
         fields = ["id", "institute_name", "email", "phone", "status",
                   "created_at", "subscription", "payments", "admin_email"]
         
-    def get_admin_email(self, obj):
-        admin = User.objects.filter(tenant = obj,role="admin").first()
-        return admin.email if admin else None
-    
     def get_subscription(self, obj):
-        sub = Subscription.objects.filter(tenant=obj).order_by("-start_date").first()
+        # subscriptions are prefetched newest first
+        sub = next(iter(obj.subscriptions.all()), None)
         if not sub:
             return None
         return {
@@ -0,0 +1,133 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import Tenant, User
+from subscription.models import Payment
+from .metrics import adjust_counters, month_start, TENANT_STATUS_COUNTERS, USER_ROLE_COUNTERS
+
+
+# Keep the PlatformMetricsSnapshot KPI counters in step with tenant, user and
+# payment writes. Updates move a row between counters instead of double
+# counting it, using the status/role/amount the instance was loaded with
+# (LoadedValuesMixin._loaded_values); only a save of a row whose fields were
+# deferred when loaded has to read them back.
+
+TRACKED_FIELDS = {
+    Tenant: ["status", "created_at"],
+    User: ["role"],
+    Payment: ["status", "amount", "created_at"],
+}
+
+
+def _stash_old(model, instance, fields, update_fields):
+    instance._old_metric_values = None
+    if instance._state.adding or (update_fields is not None and not set(fields) & set(update_fields)):
+        return
+    loaded = getattr(instance, "_loaded_values", {})
+    if all(f in loaded for f in fields):
+        instance._old_metric_values = {f: loaded[f] for f in fields}
+    else:
+        instance._old_metric_values = model.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def _saved(instance, fields, update_fields):
+    # The saved values are the baseline for the instance's next save
+    loaded = instance.__dict__.setdefault("_loaded_values", {})
+    for f in fields:
+        if f in instance.__dict__ and (update_fields is None or f in update_fields):
+            loaded[f] = instance.__dict__[f]
+
+
+def _is_this_month(created_at):
+    return created_at is not None and created_at >= month_start()
+
+
+def _tenant_counters(status, created_at, sign):
+    deltas = {"tenant_total": sign, "tenant_new_month": sign if _is_this_month(created_at) else 0}
+    return _merge(deltas, _tenant_status_counters(status, sign))
+
+
+def _tenant_status_counters(status, sign):
+    field = TENANT_STATUS_COUNTERS.get(status)
+    return {field: sign} if field else {}
+
+
+def _user_counters(role, sign):
+    field = USER_ROLE_COUNTERS.get(role)
+    return {field: sign} if field else {}
+
+
+def _payment_revenue(status, amount, created_at):
+    amount = amount if status == "paid" else 0
+    return {"total_revenue": amount, "month_revenue": amount if _is_this_month(created_at) else 0}
+
+
+def _merge(*deltas):
+    merged = {}
+    for d in deltas:
+        for field, value in d.items():
+            merged[field] = merged.get(field, 0) + value
+    return merged
+
+
+@receiver(pre_save, sender=Tenant)
+def on_tenant_pre_save(sender, instance, update_fields=None, **kwargs):
+    _stash_old(Tenant, instance, TRACKED_FIELDS[Tenant], update_fields)
+
+
+@receiver(post_save, sender=Tenant)
+def on_tenant_saved(sender, instance, created, update_fields=None, **kwargs):
+    old = getattr(instance, "_old_metric_values", None)
+    if created:
+        adjust_counters(**_tenant_counters(instance.status, instance.created_at, 1))
+    elif old and old["status"] != instance.status:
+        adjust_counters(**_merge(_tenant_status_counters(old["status"], -1), _tenant_status_counters(instance.status, 1)))
+    _saved(instance, TRACKED_FIELDS[Tenant], update_fields)
+
+
+@receiver(post_delete, sender=Tenant)
+def on_tenant_deleted(sender, instance, **kwargs):
+    adjust_counters(**_tenant_counters(instance.status, instance.created_at, -1))
+
+
+@receiver(pre_save, sender=User)
+def on_user_pre_save(sender, instance, update_fields=None, **kwargs):
+    _stash_old(User, instance, TRACKED_FIELDS[User], update_fields)
+
+
+@receiver(post_save, sender=User)
+def on_user_saved(sender, instance, created, update_fields=None, **kwargs):
+    old = getattr(instance, "_old_metric_values", None)
+    if created:
+        adjust_counters(**_user_counters(instance.role, 1))
+    elif old and old["role"] != instance.role:
+        adjust_counters(**_merge(_user_counters(old["role"], -1), _user_counters(instance.role, 1)))
+    _saved(instance, TRACKED_FIELDS[User], update_fields)
+
+
+@receiver(post_delete, sender=User)
+def on_user_deleted(sender, instance, **kwargs):
+    adjust_counters(**_user_counters(instance.role, -1))
+
+
+@receiver(pre_save, sender=Payment)
+def on_payment_pre_save(sender, instance, update_fields=None, **kwargs):
+    _stash_old(Payment, instance, TRACKED_FIELDS[Payment], update_fields)
+
+
+@receiver(post_save, sender=Payment)
+def on_payment_saved(sender, instance, created, update_fields=None, **kwargs):
+    old = getattr(instance, "_old_metric_values", None)
+    _saved(instance, TRACKED_FIELDS[Payment], update_fields)
+    if not created and old is None:
+        return
+    new = _payment_revenue(instance.status, instance.amount, instance.created_at)
+    if old:
+        previous = _payment_revenue(old["status"], old["amount"], old["created_at"])
+        new = {field: value - previous[field] for field, value in new.items()}
+    adjust_counters(**new)
+
+
+@receiver(post_delete, sender=Payment)
+def on_payment_deleted(sender, instance, **kwargs):
+    revenue = _payment_revenue(instance.status, instance.amount, instance.created_at)
+    adjust_counters(**{field: -value for field, value in revenue.items()})
@@ -1,3 +1,77 @@
+from decimal import Decimal
 from django.test import TestCase
+from accounts.models import Tenant, User
+from subscription.models import Payment
+from .metrics import TENANT_STATUS_COUNTERS, compute_platform_metrics, refresh_platform_metrics
+from .models import PlatformMetricsSnapshot
 
-# Create your tests here.
+
+class MetricCounterTests(TestCase):
+    """The incrementally adjusted counters agree with a full recompute"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(institute_name="School", email="school@example.com", phone="1", status="active")
+        refresh_platform_metrics()
+
+    def assertCountersMatchRecompute(self):
+        snapshot = PlatformMetricsSnapshot.objects.get(pk=PlatformMetricsSnapshot.SINGLETON_ID)
+        expected = compute_platform_metrics()
+        fields = [*TENANT_STATUS_COUNTERS.values(), "tenant_total", "total_admins", "total_teachers", "total_students",
+                  "total_revenue", "month_revenue"]
+        self.assertEqual({f: getattr(snapshot, f) for f in fields}, {f: expected[f] for f in fields})
+
+    def test_status_and_role_changes_move_counters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create(username="t@example.com", email="t@example.com", tenant=self.tenant, role="teacher")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tenant.status = "suspended"
+            self.tenant.save()
+            user.role = "admin"
+            user.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            tenant = Tenant.objects.get(pk=self.tenant.pk)
+            tenant.status = "trial"
+            tenant.save()
+        self.assertCountersMatchRecompute()
+
+    def test_payment_revenue_follows_status(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            payment = Payment.objects.create(tenant=self.tenant, amount=Decimal("500"), status="pending")
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.status = "paid"
+            payment.save()
+        self.assertCountersMatchRecompute()
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.delete()
+        self.assertCountersMatchRecompute()
+
+    def test_deferred_fields_are_read_back(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tenant = Tenant.objects.only("institute_name").get(pk=self.tenant.pk)
+            tenant.status = "inactive"
+            tenant.save()
+        self.assertCountersMatchRecompute()
+
+    def test_refresh_moves_the_baseline(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            stale = Tenant.objects.get(pk=self.tenant.pk)
+            self.tenant.status = "suspended"
+            self.tenant.save()
+            stale.refresh_from_db()
+            stale.status = "trial"
+            stale.save()
+        self.assertCountersMatchRecompute()
+
+    def test_save_does_not_reread_loaded_row(self):
+        tenant = Tenant.objects.get(pk=self.tenant.pk)
+        tenant.status = "suspended"
+        # Just the UPDATE
+        with self.assertNumQueries(1):
+            tenant.save(update_fields=["status"])
+
+    def test_unknown_status_is_not_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tenant.status = "archived"
+            self.tenant.save()
+        snapshot = PlatformMetricsSnapshot.objects.get(pk=PlatformMetricsSnapshot.SINGLETON_ID)
+        self.assertEqual((snapshot.tenant_total, snapshot.tenant_active), (1, 0))
@@ -1,28 +1,82 @@
 from django.shortcuts import render,get_object_or_404
 from rest_framework.views import APIView
+from rest_framework import generics
+from rest_framework.pagination import PageNumberPagination
 from accounts.permissions import IsSuperAdmin
 from rest_framework.permissions import IsAuthenticated
-from accounts.models import Tenant
+from accounts.models import Tenant, User
+from subscription.models import Subscription
+from django.db.models import Q, OuterRef, Subquery, Prefetch, Value
+from django.db.models.functions import Coalesce
 from . seralizers import TenantListSerializer,TenantBillingSerializer
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncMonth
-from django.utils import timezone
-from datetime import timedelta
-from accounts.models import Tenant, User
-from subscription.models import Payment, Subscription, SubscriptionPlan
+from subscription.entitlements import invalidate_entitlement
+from .metrics import get_platform_metrics, serialize_platform_metrics
  
 
 # Create your views here.
 
-class SuperAdminTenantListView(APIView):
+# ── Tenant listing: search, status filter, ordering and pagination ──
+
+class TenantPagination(PageNumberPagination):
+    """
+    Opt-in: responses are paginated only when `page` or `page_size` is sent,
+    so clients that load the whole list keep getting a plain array.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if 'page' not in request.query_params and self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class TenantQueryMixin:
+    """Shared `search`, `status` and `ordering` query params for the tenant list views"""
+    pagination_class = TenantPagination
+    search_fields = ("institute_name", "email", "phone")
+    ordering_fields = ("created_at", "institute_name", "email", "status")
+
+    def filter_tenants(self, queryset):
+        params = self.request.query_params
+
+        status_value = params.get("status")
+        if status_value and status_value != "all":
+            queryset = queryset.filter(status=status_value)
+
+        search = params.get("search", "").strip()
+        if search:
+            query = Q()
+            for field in self.search_fields:
+                query |= Q(**{f"{field}__icontains": search})
+            queryset = queryset.filter(query)
+
+        ordering = params.get("ordering", "-created_at")
+        if ordering.lstrip("-") not in self.ordering_fields:
+            ordering = "-created_at"
+        return queryset.order_by(ordering, "id")
+
+
+class SuperAdminTenantListView(TenantQueryMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated,IsSuperAdmin]
+    serializer_class = TenantListSerializer
+    ordering_fields = TenantQueryMixin.ordering_fields + ("current_plan", "subscription_expiry")
 
-    def get(self,request):
-        tenants = Tenant.objects.all().order_by("-created_at")
-        serializer = TenantListSerializer(tenants, many=True)
-        return Response(serializer.data)
+    def get_queryset(self):
+        # Oldest active subscription, as the per-row lookups used to pick it
+        active_sub = (
+            Subscription.objects
+            .filter(tenant=OuterRef("pk"), is_active=True)
+            .order_by("start_date")
+        )
+        tenants = Tenant.objects.annotate(
+            current_plan=Coalesce(Subquery(active_sub.values("plan__plan_name")[:1]), Value("-")),
+            subscription_expiry=Subquery(active_sub.values("expiry_date")[:1]),
+        )
+        return self.filter_tenants(tenants)
     
 
 # Block OR Suspend
@@ -38,6 +92,8 @@ class SuperAdminTenantStatusView(APIView):
         tenant = get_object_or_404(Tenant, id = tenant_id)
         tenant.status = status_value
         tenant.save()
+        # The cached entitlement carries the tenant's status (suspended tenants lose access)
+        invalidate_entitlement(tenant.id)
 
         return Response({"success":True, "status":tenant.status})
 
@@ -53,168 +109,42 @@ class SuperAdminTenantDeleteView(APIView):
     
 
 
-class SuperAdminBillingView(APIView):
+class SuperAdminBillingView(TenantQueryMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated,IsSuperAdmin]
-
-    def get(self, request):
-        tenants = Tenant.objects.all().order_by('-created_at')
-        serializer = TenantBillingSerializer(tenants, many = True)
-        return Response(serializer.data)
+    serializer_class = TenantBillingSerializer
+    search_fields = TenantQueryMixin.search_fields + ("admin_email",)
+
+    def get_queryset(self):
+        admin_email = (
+            User.objects
+            .filter(tenant=OuterRef("pk"), role="admin")
+            .order_by("pk")
+            .values("email")[:1]
+        )
+        tenants = (
+            Tenant.objects
+            .annotate(admin_email=Subquery(admin_email))
+            .prefetch_related(
+                Prefetch(
+                    "subscriptions",
+                    queryset=Subscription.objects.select_related("plan").order_by("-start_date"),
+                ),
+                "payments",
+            )
+        )
+        return self.filter_tenants(tenants)
 
 
 #---------- SUPER ADMIN DASHBOARD ------------
 
 class SuperAdminDashboardView(APIView):
+    """
+    Served from the PlatformMetricsSnapshot row (see superadmin.metrics).
+    KPI counters track writes; charts and tables are as fresh as `computed_at`.
+    """
 
     permission_classes = [IsAuthenticated,IsSuperAdmin]
  
     def get(self, request):
- 
-        now = timezone.now()
-        thirty_days_ago = now - timedelta(days=30)
-        this_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
- 
-        # ── Tenant stats ──────────────────────────────────────────────────────
-        tenants = Tenant.objects.all()
-        tenant_total    = tenants.count()
-        tenant_active   = tenants.filter(status="active").count()
-        tenant_inactive = tenants.filter(status="inactive").count()
-        tenant_suspended= tenants.filter(status="suspended").count()
-        tenant_trial    = tenants.filter(status="trial").count()
-        tenant_new_month= tenants.filter(created_at__gte=this_month_start).count()
- 
-        # ── User stats ────────────────────────────────────────────────────────
-        users = User.objects.all()
-        total_admins   = users.filter(role="admin").count()
-        total_teachers = users.filter(role="teacher").count()
-        total_students = users.filter(role="student").count()
-        total_users    = total_admins + total_teachers + total_students
- 
-        # ── Revenue stats ─────────────────────────────────────────────────────
-        paid_payments  = Payment.objects.filter(status="paid")
-        total_revenue  = paid_payments.aggregate(t=Sum("amount"))["t"] or 0
-        month_revenue  = paid_payments.filter(
-            created_at__gte=this_month_start
-        ).aggregate(t=Sum("amount"))["t"] or 0
-        recent_revenue = paid_payments.filter(
-            created_at__gte=thirty_days_ago
-        ).aggregate(t=Sum("amount"))["t"] or 0
- 
-        # ── Subscription stats ────────────────────────────────────────────────
-        active_subs  = Subscription.objects.filter(is_active=True).count()
-        expired_subs = Subscription.objects.filter(
-            is_active=False, expiry_date__lt=now
-        ).count()
- 
-        # ── Revenue by month (last 12 months) ─────────────────────────────────
-        twelve_months_ago = now - timedelta(days=365)
-        revenue_by_month = (
-            paid_payments
-            .filter(created_at__gte=twelve_months_ago)
-            .annotate(month=TruncMonth("created_at"))
-            .values("month")
-            .annotate(total=Sum("amount"), count=Count("id"))
-            .order_by("month")
-        )
-        revenue_chart = [
-            {
-                "month": r["month"].strftime("%b %Y"),
-                "revenue": float(r["total"]),
-                "payments": r["count"],
-            }
-            for r in revenue_by_month
-        ]
- 
-        # ── New tenants by month (last 12 months) ─────────────────────────────
-        tenants_by_month = (
-            tenants
-            .filter(created_at__gte=twelve_months_ago)
-            .annotate(month=TruncMonth("created_at"))
-            .values("month")
-            .annotate(count=Count("id"))
-            .order_by("month")
-        )
-        tenant_chart = [
-            {"month": r["month"].strftime("%b %Y"), "count": r["count"]}
-            for r in tenants_by_month
-        ]
- 
-        # ── Plan popularity ───────────────────────────────────────────────────
-        plan_stats = (
-            Subscription.objects
-            .values("plan__plan_name")
-            .annotate(count=Count("id"))
-            .order_by("-count")
-        )
-        plan_chart = [
-            {"plan": p["plan__plan_name"], "count": p["count"]}
-            for p in plan_stats
-        ]
- 
-        # ── Tenant status breakdown ───────────────────────────────────────────
-        status_chart = [
-            {"status": "Active",    "count": tenant_active,    "color": "#10B981"},
-            {"status": "Inactive",  "count": tenant_inactive,  "color": "#6B7280"},
-            {"status": "Suspended", "count": tenant_suspended, "color": "#EF4444"},
-            {"status": "Trial",     "count": tenant_trial,     "color": "#F59E0B"},
-        ]
- 
-        # ── Recent tenants ────────────────────────────────────────────────────
-        recent_tenants = (
-            tenants
-            .order_by("-created_at")[:8]
-            .values("id", "institute_name", "email", "status", "created_at", "phone")
-        )
-        recent_tenants_list = [
-            {
-                "id": str(t["id"]),
-                "institute_name": t["institute_name"],
-                "email": t["email"],
-                "status": t["status"],
-                "phone": t["phone"],
-                "created_at": t["created_at"].strftime("%d %b %Y"),
-            }
-            for t in recent_tenants
-        ]
- 
-        # ── Recent payments ───────────────────────────────────────────────────
-        recent_payments = (
-            paid_payments
-            .select_related("tenant")
-            .order_by("-created_at")[:8]
-        )
-        recent_payments_list = [
-            {
-                "id": p.id,
-                "institute": p.tenant.institute_name,
-                "amount": float(p.amount),
-                "currency": p.currency,
-                "created_at": p.created_at.strftime("%d %b %Y"),
-            }
-            for p in recent_payments
-        ]
- 
-        return Response({
-            # KPI cards
-            "kpis": {
-                "tenant_total":     tenant_total,
-                "tenant_active":    tenant_active,
-                "tenant_new_month": tenant_new_month,
-                "total_revenue":    float(total_revenue),
-                "month_revenue":    float(month_revenue),
-                "active_subs":      active_subs,
-                "expired_subs":     expired_subs,
-                "total_users":      total_users,
-                "total_admins":     total_admins,
-                "total_teachers":   total_teachers,
-                "total_students":   total_students,
-            },
-            # Charts
-            "revenue_chart":  revenue_chart,
-            "tenant_chart":   tenant_chart,
-            "plan_chart":     plan_chart,
-            "status_chart":   status_chart,
-            # Tables
-            "recent_tenants":  recent_tenants_list,
-            "recent_payments": recent_payments_list,
-        })
\ No newline at end of file
+        snapshot = get_platform_metrics()
+        return Response(serialize_platform_metrics(snapshot))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import cache
+from backend.cache import versions, bump_versions
+
+
+# Dashboard snapshot cache.
+# A snapshot's key embeds the current version token of every scope it depends
+# on ("tenant:<id>", "class:<id>", "student:<id>", "teacher:<id>"). Bumping a
+# scope's version makes every snapshot built on it unreachable, so class- or
+# tenant-wide writes don't have to find and delete per-student entries.
+# The version tokens are backend.cache's, under "dashboard:<scope>".
+
+DASHBOARD_CACHE_TTL = getattr(settings, "DASHBOARD_CACHE_TTL", 300)
+
+
+def bump_dashboard_scopes(*scopes):
+    """Invalidate every dashboard snapshot that depends on any of these scopes"""
+    bump_versions(*(f"dashboard:{scope}" for scope in scopes))
+
+
+def cached_dashboard(name, owner_id, scopes, build, extra=""):
+    """
+    Return the cached snapshot for (name, owner_id), building and storing it
+    with build() on a miss. extra is mixed into the key (e.g. today's date).
+    """
+    key = ":".join(["dashboard", name, str(owner_id), str(extra), *versions(f"dashboard:{scope}" for scope in scopes)])
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, DASHBOARD_CACHE_TTL)
+    return data
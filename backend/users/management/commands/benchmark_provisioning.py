@@ -0,0 +1,75 @@
+import os
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from users.provisioning import generate_random_password, hash_passwords, provision_users
+
+
+def _int_list(value):
+    try:
+        return [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise CommandError(f"Expected comma-separated integers, got {value!r}")
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure user provisioning throughput (users/s) for each batch size and "
+        "worker count. Hashes only by default; --create also bulk-creates the "
+        "users inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-sizes", default="1,10,100,500", help="Comma-separated batch sizes")
+        parser.add_argument("--workers", default="", help="Comma-separated process counts (default: 1,2,4,... up to the CPU count)")
+        parser.add_argument("--repeat", type=int, default=1, help="Runs per combination; the best is reported")
+        parser.add_argument("--create", action="store_true", help="Also insert the users (rolled back afterwards)")
+
+    def handle(self, *args, **options):
+        batch_sizes = _int_list(options["batch_sizes"])
+        cpus = os.cpu_count() or 1
+        if options["workers"]:
+            worker_counts = _int_list(options["workers"])
+        else:
+            worker_counts = [1]
+            while worker_counts[-1] * 2 <= cpus:
+                worker_counts.append(worker_counts[-1] * 2)
+            if worker_counts[-1] != cpus:
+                worker_counts.append(cpus)
+
+        self.stdout.write(f"{cpus} CPU(s); {'hash + insert' if options['create'] else 'hash only'}")
+        self.stdout.write(f"{'batch':>7} {'workers':>8} {'seconds':>9} {'users/s':>9}")
+        for batch_size in batch_sizes:
+            for workers in worker_counts:
+                seconds = min(
+                    self._run(batch_size, workers, options["create"])
+                    for _ in range(max(options["repeat"], 1))
+                )
+                self.stdout.write(f"{batch_size:>7} {workers:>8} {seconds:>9.3f} {batch_size / seconds:>9.1f}")
+
+    def _run(self, batch_size, workers, create):
+        if not create:
+            passwords = [generate_random_password() for _ in range(batch_size)]
+            began = time.perf_counter()
+            hash_passwords(passwords, workers)
+            return time.perf_counter() - began
+
+        run = uuid.uuid4().hex[:8]
+        rows = [
+            dict(username=f"bench-{run}-{i}@example.com", email=f"bench-{run}-{i}@example.com", role="student")
+            for i in range(batch_size)
+        ]
+        began = time.perf_counter()
+        try:
+            with transaction.atomic():
+                provision_users(rows, workers)
+                seconds = time.perf_counter() - began
+                raise _Rollback
+        except _Rollback:
+            pass
+        return seconds
@@ -0,0 +1,48 @@
+import time
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import Tenant
+from users.student_import import read_csv_rows, import_students
+
+
+class Command(BaseCommand):
+    help = "Create a tenant's students from a CSV file (same columns as the students/import/ endpoint)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tenant_id")
+        parser.add_argument("csv_path")
+        parser.add_argument("--dry-run", action="store_true", help="Validate the file without creating anything")
+        parser.add_argument("--workers", type=int, default=0, help="Hashing processes (default: PASSWORD_HASH_WORKERS / CPU count)")
+
+    def handle(self, *args, **options):
+        try:
+            tenant = Tenant.objects.filter(pk=options["tenant_id"]).first()
+        except ValidationError:
+            tenant = None
+        if tenant is None:
+            raise CommandError(f"Tenant {options['tenant_id']} not found")
+
+        try:
+            with open(options["csv_path"], "rb") as upload:
+                rows = read_csv_rows(upload)
+        except OSError as e:
+            raise CommandError(str(e))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise CommandError(f"Cannot read CSV: {e}")
+
+        began = time.perf_counter()
+        count, errors = import_students(tenant, rows, dry_run=options["dry_run"], workers=options["workers"] or None)
+        seconds = time.perf_counter() - began
+
+        if errors:
+            for error in errors:
+                fields = "; ".join(f"{field}: {message}" for field, message in error["errors"].items())
+                self.stderr.write(f"Row {error['row'] or '-'}: {fields}")
+            raise CommandError(f"{len(errors)} row(s) have errors; nothing was saved")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{count} row(s) valid"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {count} student(s) in {seconds:.2f}s ({count / seconds if seconds else 0:.1f} students/s)"
+        ))
@@ -0,0 +1,81 @@
+import os
+import secrets
+import string
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from accounts.models import User
+from superadmin.metrics import adjust_counters, USER_ROLE_COUNTERS
+
+
+# User provisioning for admin-created accounts (teachers, students, imports).
+# Each account costs exactly one password hash and one INSERT: the generated
+# password is hashed with make_password() and set before the row is first
+# saved, instead of create_user() followed by set_password() and a second save.
+# Batches hash across a process pool, since PBKDF2 is the dominant CPU cost.
+
+PASSWORD_HASH_WORKERS = getattr(settings, "PASSWORD_HASH_WORKERS", 0)
+
+# Below this many passwords the pool's start-up costs more than it saves
+HASH_POOL_THRESHOLD = 16
+
+BULK_BATCH_SIZE = 500
+
+
+def generate_random_password(length=10):
+    alphabet = string.ascii_letters + string.digits + "!@#$%&"
+    return ''.join(secrets.choice(alphabet) for _  in range(length))
+
+
+def hash_passwords(passwords, workers=None):
+    """make_password() for each password, across a process pool for large batches"""
+    workers = workers or PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) < HASH_POOL_THRESHOLD:
+        return [make_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def normalize_fields(fields):
+    """User field values with email and username normalized as create_user() does"""
+    fields = dict(fields)
+    if "email" in fields:
+        fields["email"] = User.objects.normalize_email(fields["email"])
+    if "username" in fields:
+        fields["username"] = User.normalize_username(fields["username"])
+    return fields
+
+
+def provision_user(password=None, **fields):
+    """
+    Create one user from User field values with a single hash and insert.
+    A random password is generated when none is given.
+    Returns (user, password).
+    """
+    password = password or generate_random_password()
+    user = User(**normalize_fields(fields))
+    user.password = make_password(password)
+    user.save()
+    return user, password
+
+
+def provision_users(rows, workers=None):
+    """
+    Create users from a list of User field dicts with bulk_create, each with a
+    generated password. Returns (users, passwords) in row order.
+    """
+    passwords = [generate_random_password() for _ in rows]
+    hashes = hash_passwords(passwords, workers)
+    users = User.objects.bulk_create(
+        [User(password=password_hash, **normalize_fields(row)) for row, password_hash in zip(rows, hashes)],
+        batch_size=BULK_BATCH_SIZE,
+    )
+
+    # bulk_create skips the platform metrics signals
+    roles = Counter(user.role for user in users)
+    adjust_counters(**{
+        USER_ROLE_COUNTERS[role]: count for role, count in roles.items() if role in USER_ROLE_COUNTERS
+    })
+    return users, passwords
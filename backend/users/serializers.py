@@ -3,19 +3,27 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
-from django.core.mail import send_mail
-import secrets
-import string
+from jobs.queue import enqueue
+from accounts.tasks import send_email
 from . models import Teacher,Student
+from .provisioning import provision_user
 from accounts.models import Tenant
 import re
 from classroom.models import SchoolClass
 
 User = get_user_model()
 
-def generate_random_password(length=10):
-    alphabet = string.ascii_letters + string.digits + "!@#$%&"
-    return ''.join(secrets.choice(alphabet) for _  in range(length))
+def student_credentials_email(full_name, email, password):
+    """(subject, message) of the welcome email sent to a new student"""
+    return (
+        "EduQuest Student Account Created",
+        f"Hello {full_name},\n\n"
+        "Your student account has been created.\n\n"
+        f"Username: {email}\n"
+        f"Password: {password}\n\n"
+        "You must change your password on first login.\n\n"
+        "Regards,\nEduQuest Team",
+    )
 
 
 class TeacherCreateSerializer(serializers.Serializer):
@@ -68,10 +76,8 @@ class TeacherCreateSerializer(serializers.Serializer):
                 "Admin user must belong to a tenant."
             )
 
-        password = generate_random_password()
-
         with transaction.atomic():
-            user = User.objects.create_user(
+            user, password = provision_user(
                 username=validated_data["email"],
                 email=validated_data["email"],
                 full_name=validated_data.get("full_name", ""),
@@ -79,12 +85,9 @@ class TeacherCreateSerializer(serializers.Serializer):
                 tenant=admin_user.tenant,
                 role="teacher",
                 is_active=True,
+                must_change_password=True,
             )
 
-            user.set_password(password)
-            user.must_change_password = True
-            user.save()
-
             teacher = Teacher.objects.create(
                 user=user,
                 qualification=validated_data.get("qualification", ""),
@@ -92,23 +95,20 @@ class TeacherCreateSerializer(serializers.Serializer):
                 salary=validated_data.get("salary", 0),
             )
 
-        try:
-            send_mail(
-                subject="Your EduQuest Teacher Account",
-                message=(
-                    f"Hello {user.full_name or user.email},\n\n"
-                    f"You have been added as a teacher at "
-                    f"{admin_user.tenant.institute_name}.\n\n"
-                    f"Username: {user.email}\n"
-                    f"Password: {password}\n\n"
-                    "Please login and change your password."
-                ),
-                from_email=None,
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
-        except Exception:
-            pass
+        enqueue(
+            send_email,
+            idempotency_key=f"welcome:{user.id}",
+            subject="Your EduQuest Teacher Account",
+            message=(
+                f"Hello {user.full_name or user.email},\n\n"
+                f"You have been added as a teacher at "
+                f"{admin_user.tenant.institute_name}.\n\n"
+                f"Username: {user.email}\n"
+                f"Password: {password}\n\n"
+                "Please login and change your password."
+            ),
+            recipient_list=[user.email],
+        )
 
         return teacher
 
@@ -221,10 +221,8 @@ class StudentCreateSerializer(serializers.Serializer):
                 "Admin must belong to a tenant."
             )
 
-        password = generate_random_password()
-
         with transaction.atomic():
-            user = User.objects.create_user(
+            user, password = provision_user(
                 username=validated_data["email"],
                 email=validated_data["email"],
                 full_name=validated_data["full_name"],
@@ -233,8 +231,6 @@ class StudentCreateSerializer(serializers.Serializer):
                 is_active=True,
                 must_change_password=True,
             )
-            user.set_password(password)
-            user.save()
 
             student = Student.objects.create(
                 user=user,
@@ -243,23 +239,14 @@ class StudentCreateSerializer(serializers.Serializer):
                 roll_number=validated_data["roll_number"],
             )
 
-        try:
-            send_mail(
-                subject="EduQuest Student Account Created",
-                message=(
-                    f"Hello {user.full_name},\n\n"
-                    "Your student account has been created.\n\n"
-                    f"Username: {user.email}\n"
-                    f"Password: {password}\n\n"
-                    "You must change your password on first login.\n\n"
-                    "Regards,\nEduQuest Team"
-                ),
-                from_email=None,
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
-        except Exception:           
-            pass
+        subject, message = student_credentials_email(user.full_name, user.email, password)
+        enqueue(
+            send_email,
+            idempotency_key=f"welcome:{user.id}",
+            subject=subject,
+            message=message,
+            recipient_list=[user.email],
+        )
 
         return student
 
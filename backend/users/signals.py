@@ -0,0 +1,92 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from .dashboard_cache import bump_dashboard_scopes
+
+
+# Dashboard snapshot invalidation. Bulk writes that skip signals
+# (attendance marking, bill generation) bump their scopes explicitly.
+
+def _bump_classes(class_ids):
+    bump_dashboard_scopes(*(f"class:{class_id}" for class_id in class_ids))
+
+
+# ---------- Class-wide: exams and assignments ----------
+
+@receiver(post_save, sender="exam.Exam")
+@receiver(pre_delete, sender="exam.Exam")
+@receiver(post_save, sender="assignment.Assignment")
+@receiver(pre_delete, sender="assignment.Assignment")
+def on_class_item_changed(sender, instance, **kwargs):
+    bump_dashboard_scopes(f"teacher:{instance.teacher_id}")
+    if instance.pk:
+        _bump_classes(instance.classes.values_list("id", flat=True))
+
+
+def on_item_classes_changed(sender, instance, action, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        _bump_classes(pk_set)
+    elif action == "pre_clear":
+        _bump_classes(instance.classes.values_list("id", flat=True))
+
+
+@receiver(post_save, sender="classroom.SchoolClass")
+def on_school_class_changed(sender, instance, **kwargs):
+    if instance.class_teacher_id:
+        bump_dashboard_scopes(f"teacher:{instance.class_teacher_id}")
+
+
+@receiver(post_save, sender="classroom.TimeTableEntry")
+@receiver(post_delete, sender="classroom.TimeTableEntry")
+def on_timetable_entry_changed(sender, instance, **kwargs):
+    class_id = instance.timetable_class_id()
+    if class_id:
+        _bump_classes([class_id])
+
+
+# ---------- Per-student ----------
+
+@receiver(post_save, sender="exam.ExamResult")
+@receiver(post_delete, sender="exam.ExamResult")
+@receiver(post_save, sender="assignment.AssignmentSubmission")
+@receiver(post_delete, sender="assignment.AssignmentSubmission")
+@receiver(post_save, sender="finance.StudentBill")
+@receiver(post_delete, sender="finance.StudentBill")
+def on_student_item_changed(sender, instance, **kwargs):
+    bump_dashboard_scopes(f"student:{instance.student_id}")
+
+
+# ---------- Per-teacher: grading queues ----------
+
+@receiver(post_save, sender="exam.ExamResult")
+@receiver(post_delete, sender="exam.ExamResult")
+def on_exam_result_changed(sender, instance, **kwargs):
+    from exam.models import Exam
+    teacher_id = Exam.objects.filter(pk=instance.exam_id).values_list("teacher_id", flat=True).first()
+    if teacher_id:
+        bump_dashboard_scopes(f"teacher:{teacher_id}")
+
+
+@receiver(post_save, sender="assignment.AssignmentSubmission")
+@receiver(post_delete, sender="assignment.AssignmentSubmission")
+def on_submission_changed(sender, instance, **kwargs):
+    from assignment.models import Assignment
+    teacher_id = Assignment.objects.filter(pk=instance.assignment_id).values_list("teacher_id", flat=True).first()
+    if teacher_id:
+        bump_dashboard_scopes(f"teacher:{teacher_id}")
+
+
+# ---------- Tenant-wide ----------
+
+@receiver(post_save, sender="academics.Announcement")
+@receiver(post_delete, sender="academics.Announcement")
+def on_announcement_changed(sender, instance, **kwargs):
+    bump_dashboard_scopes(f"tenant:{instance.tenant_id}")
+
+
+def connect_m2m_signals():
+    # m2m_changed needs the concrete through models
+    from assignment.models import Assignment
+    from exam.models import Exam
+
+    m2m_changed.connect(on_item_classes_changed, sender=Assignment.classes.through)
+    m2m_changed.connect(on_item_classes_changed, sender=Exam.classes.through)
@@ -0,0 +1,285 @@
+import csv
+import io
+import re
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Count, Q
+from accounts.models import User
+from accounts.tasks import send_mass_email
+from classroom.models import SchoolClass
+from jobs.queue import enqueue
+from subscription.models import Subscription
+from backend.cache import bump_namespace
+from .dashboard_cache import bump_dashboard_scopes
+from .models import Student
+from .provisioning import provision_users, BULK_BATCH_SIZE
+from .serializers import student_credentials_email
+
+
+# Bulk student onboarding from a CSV file (or JSON rows).
+# The whole file is validated in memory: uniqueness against the database with
+# one set lookup per field, class capacity with one grouped count. Users come from
+# provision_users (pooled hashing, bulk_create), students are bulk-created and the
+# credential emails queued a batch per job. Any row error rejects the file, so an
+# import is all-or-nothing and can be fixed and re-sent as is.
+
+REQUIRED_COLUMNS = ("email", "full_name", "admission_number", "roll_number")
+
+MAX_IMPORT_ROWS = getattr(settings, "STUDENT_IMPORT_MAX_ROWS", 5000)
+
+EMAIL_BATCH_SIZE = 50
+
+ADMISSION_NUMBER_RE = re.compile(r"^[A-Za-z0-9\-]+$")
+
+
+def read_csv_rows(upload):
+    """Rows of an uploaded student CSV, header names lower-cased"""
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        raise ValueError("CSV file is empty")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = [c for c in REQUIRED_COLUMNS if c not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    if "school_class" not in reader.fieldnames and "class_name" not in reader.fieldnames:
+        raise ValueError("CSV needs a 'school_class' (id) or 'class_name' column")
+    return list(reader)
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ""
+
+
+class _ClassLookup:
+    """The tenant's classes, found by id or by name + division"""
+
+    def __init__(self, tenant):
+        self.classes = list(SchoolClass.objects.filter(tenant=tenant))
+        self.by_id = {c.id: c for c in self.classes}
+        self.by_name = {}
+        for c in self.classes:
+            self.by_name.setdefault((c.name.strip().lower(), c.division.strip().lower()), c)
+
+    def find(self, row):
+        """(school_class, error)"""
+        class_id = _text(row.get("school_class"))
+        if class_id:
+            try:
+                school_class = self.by_id.get(int(class_id))
+            except ValueError:
+                return None, "Enter a valid class id"
+            return (school_class, None) if school_class else (None, "Invalid class selection.")
+
+        name = _text(row.get("class_name")).lower()
+        if not name:
+            return None, "Give a class id or class name"
+        school_class = self.by_name.get((name, _text(row.get("division")).lower()))
+        return (school_class, None) if school_class else (None, "No class with this name and division")
+
+
+def _check_row(row, classes):
+    """(cleaned, errors) for one row, without touching the database"""
+    errors = {}
+    cleaned = {}
+
+    email = _text(row.get("email")).lower()
+    try:
+        validate_email(email)
+        cleaned["email"] = email
+    except ValidationError:
+        errors["email"] = "Enter a valid email address."
+
+    full_name = _text(row.get("full_name"))
+    if not full_name:
+        errors["full_name"] = "Full name cannot be empty or spaces only."
+    elif len(full_name) > 225:
+        errors["full_name"] = "Ensure this field has no more than 225 characters."
+    cleaned["full_name"] = full_name
+
+    admission_number = _text(row.get("admission_number"))
+    if not admission_number:
+        errors["admission_number"] = "Admission number cannot be empty."
+    elif len(admission_number) > 50 or not ADMISSION_NUMBER_RE.match(admission_number):
+        errors["admission_number"] = "Admission number must be alphanumeric."
+    cleaned["admission_number"] = admission_number
+
+    try:
+        roll_number = int(_text(row.get("roll_number")))
+        if roll_number <= 0:
+            raise ValueError
+        cleaned["roll_number"] = roll_number
+    except ValueError:
+        errors["roll_number"] = "Roll number must be a positive integer."
+
+    school_class, class_error = classes.find(row)
+    if class_error:
+        errors["school_class"] = class_error
+    cleaned["school_class"] = school_class
+
+    return cleaned, errors
+
+
+def validate_student_rows(tenant, rows):
+    """
+    Check a whole import file against the tenant.
+    Returns (students, errors): students is a list of cleaned dicts when the
+    file is valid, errors a list of {"row", "errors"} with 1-based row numbers.
+    """
+    classes = _ClassLookup(tenant)
+    checked = []
+    seen_emails, seen_admissions = set(), set()
+
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            checked.append((index, {}, {"row": "Expected an object"}))
+            continue
+        cleaned, errors = _check_row(row, classes)
+
+        # Duplicates inside the file
+        if "email" not in errors:
+            if cleaned["email"] in seen_emails:
+                errors["email"] = "Email appears more than once in the file."
+            seen_emails.add(cleaned["email"])
+        if "admission_number" not in errors:
+            if cleaned["admission_number"] in seen_admissions:
+                errors["admission_number"] = "Admission number appears more than once in the file."
+            seen_admissions.add(cleaned["admission_number"])
+
+        checked.append((index, cleaned, errors))
+
+    # Duplicates against the database: one query per field
+    taken_emails = {
+        value.lower()
+        for pair in User.objects.filter(Q(email__in=seen_emails) | Q(username__in=seen_emails)).values_list("email", "username")
+        for value in pair if value
+    }
+    taken_admissions = set(
+        Student.objects.filter(admission_number__in=seen_admissions).values_list("admission_number", flat=True)
+    )
+
+    # Class capacity: one grouped count over the tenant's classes
+    class_sizes = dict(
+        Student.objects
+        .filter(school_class__in=classes.classes)
+        .values_list("school_class")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+
+    students, errors = [], []
+    for index, cleaned, row_errors in checked:
+        if cleaned.get("email") in taken_emails and "email" not in row_errors:
+            row_errors["email"] = "A user with this email already exists."
+        if cleaned.get("admission_number") in taken_admissions and "admission_number" not in row_errors:
+            row_errors["admission_number"] = "Admission number already exists."
+
+        school_class = cleaned.get("school_class")
+        if school_class and not row_errors:
+            size = class_sizes.get(school_class.id, 0)
+            if size >= school_class.max_student:
+                row_errors["school_class"] = f"Class capacity reached ({school_class.max_student})."
+            else:
+                class_sizes[school_class.id] = size + 1
+
+        if row_errors:
+            errors.append({"row": index, "errors": row_errors})
+        else:
+            students.append(cleaned)
+
+    return students, errors
+
+
+def plan_limit_error(tenant, incoming):
+    """Message when adding `incoming` students would pass the plan's limit, else None"""
+    subscription = (
+        Subscription.objects
+        .filter(tenant=tenant)
+        .select_related("plan")
+        .order_by("-start_date")
+        .first()
+    )
+    if subscription is None:
+        return "No subscription found for this institute."
+    max_students = subscription.plan.max_students
+    current = Student.objects.filter(user__tenant=tenant).count()
+    if current + incoming > max_students:
+        return (
+            f"Student limit reached ({max_students}). {max(max_students - current, 0)} more "
+            f"student(s) can be added; the file has {incoming}. Upgrade plan."
+        )
+    return None
+
+
+def create_students(tenant, students, workers=None):
+    """Create users and students for validated rows; returns the Student objects"""
+    with transaction.atomic():
+        users, passwords = provision_users([
+            dict(
+                username=row["email"],
+                email=row["email"],
+                full_name=row["full_name"],
+                tenant=tenant,
+                role="student",
+                is_active=True,
+                must_change_password=True,
+            )
+            for row in students
+        ], workers)
+
+        created = Student.objects.bulk_create([
+            Student(
+                user=user,
+                admission_number=row["admission_number"],
+                school_class=row["school_class"],
+                roll_number=row["roll_number"],
+            )
+            for row, user in zip(students, users)
+        ], batch_size=BULK_BATCH_SIZE)
+
+        # bulk_create skips the dashboard and cache signals
+        bump_dashboard_scopes(
+            f"tenant:{tenant.id}",
+            *{f"class:{row['school_class'].id}" for row in students},
+        )
+        bump_namespace(tenant.id, "classroom")
+
+        # Credential emails, a batch per job; queued with the import so a
+        # rolled-back import sends nothing
+        for start in range(0, len(users), EMAIL_BATCH_SIZE):
+            batch = list(zip(users[start:start + EMAIL_BATCH_SIZE], passwords[start:start + EMAIL_BATCH_SIZE]))
+            enqueue(
+                send_mass_email,
+                idempotency_key=f"welcome-batch:{batch[0][0].id}-{batch[-1][0].id}",
+                messages=[
+                    [*student_credentials_email(user.full_name, user.email, password), user.email]
+                    for user, password in batch
+                ],
+            )
+
+    return created
+
+
+def import_students(tenant, rows, dry_run=False, workers=None):
+    """
+    Validate and import a student file.
+    Returns (count, errors): the number of students created (or, with dry_run,
+    that would be) and the row errors. Nothing is written when errors is
+    non-empty or dry_run is set.
+    """
+    if len(rows) > MAX_IMPORT_ROWS:
+        return 0, [{"row": None, "errors": {"file": f"At most {MAX_IMPORT_ROWS} students per import."}}]
+
+    students, errors = validate_student_rows(tenant, rows)
+    if not errors:
+        limit_error = plan_limit_error(tenant, len(students))
+        if limit_error:
+            errors = [{"row": None, "errors": {"file": limit_error}}]
+    if errors:
+        return 0, errors
+    if dry_run:
+        return len(students), []
+
+    return len(create_students(tenant, students, workers)), []
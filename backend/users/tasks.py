@@ -0,0 +1,27 @@
+from accounts.models import Tenant
+from jobs.queue import task
+from notifications.utils import send_notification
+from .student_import import import_students
+
+
+@task("users.import_students", max_attempts=2, sensitive=True)
+def import_students_job(tenant_id, rows, requested_by=None):
+    """
+    Create the students of an import the endpoint has already validated and
+    notify the requester. The file is checked again first, since other writes
+    may have landed in between; nothing is created if it no longer passes.
+    """
+    tenant = Tenant.objects.filter(pk = tenant_id).first()
+    if tenant is None:
+        return None
+
+    count, errors = import_students(tenant, rows)
+    if requested_by:
+        if errors:
+            title = "Student import failed"
+            message = f"Nothing was saved: {len(errors)} row(s) no longer pass validation. Fix the file and import it again."
+        else:
+            title = "Student import finished"
+            message = f"{count} student(s) were created."
+        send_notification([requested_by], "announcement", title = title, message = message)
+    return {"created": count, "errors": errors}
@@ -1,3 +1,248 @@
-from django.test import TestCase
+import datetime
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import Tenant, User
+from backend.exports import iter_csv, streaming_response
+from academics.models import Announcement, ClassDailyAttendance, MonthlyAttendanceSummary
+from assignment.models import Assignment, AssignmentSubmission
+from classroom.models import SchoolClass, Subject
+from exam.models import Exam, ExamResult
+from finance.models import FeeStructure, FeeType, StudentBill
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job
+from notifications.models import Notification
+from subscription.models import Subscription, SubscriptionPlan
+from .models import Student, Teacher
+from .provisioning import provision_user, provision_users
 
-# Create your tests here.
+
+def make_school(students=1):
+    tenant = Tenant.objects.create(institute_name="School", email="school@example.com", phone="1", status="active")
+    plan = SubscriptionPlan.objects.create(plan_name="Basic", duration_months=12, max_students=1000)
+    Subscription.objects.create(plan=plan, tenant=tenant, is_active=True)
+
+    admin = User.objects.create(username="admin@example.com", email="admin@example.com", tenant=tenant, role="admin")
+    teacher = Teacher.objects.create(user=User.objects.create(
+        username="teacher@example.com", email="teacher@example.com", tenant=tenant, role="teacher", full_name="Teacher",
+    ))
+    school_class = SchoolClass.objects.create(tenant=tenant, name="5", division="A", class_teacher=teacher, max_student=100)
+    pupils = [
+        Student.objects.create(
+            user=User.objects.create(username=f"s{i}@example.com", email=f"s{i}@example.com", tenant=tenant, role="student"),
+            admission_number=f"A{i}", school_class=school_class, roll_number=i + 1,
+        )
+        for i in range(students)
+    ]
+    return tenant, admin, teacher, school_class, pupils
+
+
+def add_activity(tenant, teacher, school_class, student, count):
+    """count exams, results, assignments, submissions, bills and announcements touching the student"""
+    now = timezone.now()
+    today = timezone.localdate()
+    subject = Subject.objects.create(tenant=tenant, name=f"Subject {Subject.objects.count()}")
+    fee_type = FeeType.objects.create(tenant=tenant, name=f"Fee {FeeType.objects.count()}")
+
+    for i in range(count):
+        for exam_date, status in ((today - timedelta(days=i + 1), "completed"), (today + timedelta(days=i + 1), "scheduled")):
+            exam = Exam.objects.create(
+                tenant=tenant, teacher=teacher, title=f"Exam {i}", subject=subject, exam_date=exam_date,
+                start_time=datetime.time(9), end_time=datetime.time(10), max_marks=50, status=status,
+            )
+            exam.classes.add(school_class)
+        ExamResult.objects.create(exam=exam, student=student, marks_obtained=40)
+
+        for due in (now - timedelta(days=1), now + timedelta(days=i + 1)):
+            assignment = Assignment.objects.create(
+                tenant=tenant, teacher=teacher, subject=subject, title=f"Assignment {i}", due_date=due, total_marks=10,
+            )
+            assignment.classes.add(school_class)
+        AssignmentSubmission.objects.create(assignment=assignment, student=student, status="graded", marks_obtained=8, graded_at=now)
+
+        structure = FeeStructure.objects.create(tenant=tenant, fee_type=fee_type, amount=100, due_date=today)
+        StudentBill.objects.create(tenant=tenant, student=student, fee_structure=structure, amount=100, due_date=today, status="pending")
+        Announcement.objects.create(tenant=tenant, title=f"News {i}", description="-", expiry_date=now + timedelta(days=1))
+        ClassDailyAttendance.objects.get_or_create(
+            tenant=tenant, school_class=school_class, date=today - timedelta(days=i),
+            defaults={"is_completed": True, "total_students": 1, "present_count": 1},
+        )
+        month = (today.replace(day=1) - timedelta(days=31 * i))
+        MonthlyAttendanceSummary.objects.get_or_create(
+            tenant=tenant, student=student, school_class=school_class, month=month.month, year=month.year,
+            defaults={"total_days": 20, "present_days": 18, "absent_days": 2, "attendance_percentage": 90},
+        )
+
+
+class DashboardQueryBudgetTests(TestCase):
+    """The dashboards cost a fixed number of queries, however much data the student or teacher has"""
+
+    # Cold: one query per dashboard section; warm: only the profile lookup
+    STUDENT_COLD, STUDENT_WARM = 13, 1
+    TEACHER_COLD, TEACHER_WARM = 11, 1
+
+    def setUp(self):
+        cache.clear()
+        self.tenant, _, self.teacher, self.school_class, [self.student] = make_school()
+        self.client = APIClient()
+
+    def get(self, user, path, queries):
+        # A fresh user each request, as authentication would load, so no profile stays cached on it
+        self.client.force_authenticate(User.objects.get(pk=user.pk))
+        with self.assertNumQueries(queries):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_student_dashboard(self):
+        path = "/api/users/student/dashboard/"
+        user = self.student.user
+        add_activity(self.tenant, self.teacher, self.school_class, self.student, 2)
+        self.get(user, path, self.STUDENT_COLD)
+        self.get(user, path, self.STUDENT_WARM)
+
+        add_activity(self.tenant, self.teacher, self.school_class, self.student, 10)
+        cache.clear()
+        data = self.get(user, path, self.STUDENT_COLD)
+        self.assertEqual(len(data["recent_results"]), 6)
+        self.get(user, path, self.STUDENT_WARM)
+
+    def test_teacher_dashboard(self):
+        path = "/api/users/teacher/dashboard/"
+        user = self.teacher.user
+        add_activity(self.tenant, self.teacher, self.school_class, self.student, 2)
+        self.get(user, path, self.TEACHER_COLD)
+        self.get(user, path, self.TEACHER_WARM)
+
+        add_activity(self.tenant, self.teacher, self.school_class, self.student, 10)
+        cache.clear()
+        data = self.get(user, path, self.TEACHER_COLD)
+        self.assertEqual(len(data["upcoming_exams"]), 5)
+        self.get(user, path, self.TEACHER_WARM)
+
+
+class ExportStreamingTests(TestCase):
+
+    def test_student_list_csv(self):
+        _, admin, _, _, [pupil] = make_school()
+        client = APIClient()
+        client.force_authenticate(User.objects.get(pk=admin.pk))
+        response = client.get("/api/users/students/list/", {"format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:2], ["Admission No", "Roll No"])
+        self.assertEqual(lines[1].split(",")[:2], [pupil.admission_number, "1"])
+
+    def test_asgi_requests_get_chunks_one_at_a_time(self):
+        pulled = []
+
+        def chunks():
+            for i in range(3):
+                pulled.append(i)
+                yield f"{i}\n"
+
+        response = streaming_response(AsyncRequestFactory().get("/"), chunks(), "text/csv", "x.csv")
+        self.assertTrue(response.is_async)
+
+        async def first_chunk():
+            async for chunk in response:
+                return chunk
+
+        self.assertEqual(async_to_sync(first_chunk)(), b"0\n")
+        self.assertEqual(pulled, [0])
+
+    def test_wsgi_requests_keep_the_sync_iterator(self):
+        response = streaming_response(RequestFactory().get("/"), iter(["a"]), "text/csv", "x.csv")
+        self.assertFalse(response.is_async)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="x.csv"')
+
+    def test_csv_cells_cannot_start_formulas(self):
+        rows = [["=HYPERLINK(\"http://x\")", "+1", "-2", "@SUM(A1)", "plain", -3]]
+        lines = "".join(iter_csv(["a", "b", "c", "d", "e", "f"], rows)).splitlines()
+        self.assertEqual(lines[1], "\"'=HYPERLINK(\"\"http://x\"\")\",'+1,'-2,'@SUM(A1),plain,-3")
+
+
+class ProvisioningTests(TestCase):
+
+    def test_email_and_username_are_normalized_like_create_user(self):
+        user, password = provision_user(username="\uff34eacher@EXAMPLE.COM", email="Teacher@EXAMPLE.COM", role="teacher")
+        user.refresh_from_db()
+        self.assertEqual((user.username, user.email), ("Teacher@EXAMPLE.COM", "Teacher@example.com"))
+        self.assertTrue(user.check_password(password))
+
+        [pupil], [password] = provision_users([{"username": "\uff33@Example.com", "email": "S@Example.com", "role": "student"}])
+        self.assertEqual((pupil.username, pupil.email), ("S@Example.com", "S@example.com"))
+        self.assertTrue(User.objects.get(email="S@example.com").check_password(password))
+
+
+class BulkStudentImportTests(TestCase):
+    path = "/api/users/students/import/"
+
+    def setUp(self):
+        self.tenant, admin, _, self.school_class, _ = make_school()
+        self.admin = admin
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=admin.pk))
+
+    def rows(self, count, start=10):
+        return [
+            {"email": f"new{i}@example.com", "full_name": f"New {i}", "admission_number": f"N{i}",
+             "roll_number": i, "school_class": self.school_class.pk}
+            for i in range(start, start + count)
+        ]
+
+    def test_validates_in_request_and_creates_in_job(self):
+        response = self.client.post(self.path, {"students": self.rows(3)}, format="json")
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(Student.objects.filter(admission_number__startswith="N").count(), 0)
+
+        job = Job.objects.get(pk=response.data["job_id"])
+        self.assertEqual(job.name, "users.import_students")
+        self.assertEqual(list(job.payload), ["encrypted"])
+        [job] = claim_jobs(10)
+        with self.captureOnCommitCallbacks(execute=True):
+            job = run_job(job)
+        self.assertEqual((job.status, job.result["created"], job.payload), ("succeeded", 3, {}))
+        self.assertEqual(Student.objects.filter(admission_number__startswith="N").count(), 3)
+        self.assertTrue(Notification.objects.filter(recipient=self.admin, title="Student import finished").exists())
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile("students.csv", (
+            "Email,Full_Name,Admission_Number,Roll_Number,Class_Name,Division\n"
+            "csv@example.com,From Csv,C1,7,5,A\n"
+        ).encode())
+        with self.captureOnCommitCallbacks(execute=True), self.settings(JOBS_BACKEND="jobs.queue.EagerBackend"):
+            response = self.client.post(self.path, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(Student.objects.get(admission_number="C1").school_class, self.school_class)
+
+    def test_row_errors_reject_the_file(self):
+        rows = self.rows(2)
+        rows[1]["email"] = rows[0]["email"]
+        rows.append({**self.rows(1, start=50)[0], "roll_number": "x"})
+        response = self.client.post(self.path, {"students": rows}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([(e["row"], list(e["errors"])) for e in response.data["errors"]], [(2, ["email"]), (3, ["roll_number"])])
+        self.assertFalse(Job.objects.exists())
+
+    def test_dry_run_queues_nothing(self):
+        response = self.client.post(f"{self.path}?dry_run=1", {"students": self.rows(2)}, format="json")
+        self.assertEqual((response.status_code, response.data["valid"]), (200, 2))
+        self.assertFalse(Job.objects.exists())
+
+    def test_job_rechecks_the_file(self):
+        response = self.client.post(self.path, {"students": self.rows(1)}, format="json")
+        self.assertEqual(response.status_code, 202)
+        User.objects.create(username="new10@example.com", email="new10@example.com", tenant=self.tenant, role="teacher")
+
+        [job] = claim_jobs(10)
+        with self.captureOnCommitCallbacks(execute=True):
+            job = run_job(job)
+        self.assertEqual(job.result["created"], 0)
+        self.assertFalse(Student.objects.filter(admission_number="N10").exists())
+        self.assertTrue(Notification.objects.filter(recipient=self.admin, title="Student import failed").exists())
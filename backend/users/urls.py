@@ -1,7 +1,7 @@
 from django.urls import path
 from .views import (
      CreateTeacherView,TeacherListView,TeacherProfileView,
-     CreateStudentView,StudentProfileView,StudentListView,
+     CreateStudentView,StudentProfileView,StudentListView,BulkStudentImportView,
      DeleteTeacherView,DeleteStudentView,
      UpdateTeacherView,UpdateStudentView,AdminStudentDetailView,TeacherDashboardView,StudentDashboardView
 )
@@ -13,6 +13,7 @@ urlpatterns = [
     path('teachers/update/<int:teacher_id>/',UpdateTeacherView.as_view(),name="update-teacher"),
     path('teachers/delete/<int:teacher_id>/',DeleteTeacherView.as_view(),name='delete-teacher'),
     path('students/create/',CreateStudentView.as_view(),name='create-student'),
+    path('students/import/',BulkStudentImportView.as_view(),name='import-students'),
     path("students/list/", StudentListView.as_view(), name="list-students"),
     path("students/profile/", StudentProfileView.as_view(), name="student-profile"),
     path('students/delete/<int:student_id>/',DeleteStudentView.as_view(),name='delete-student'),
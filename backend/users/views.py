@@ -1,14 +1,16 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from .serializers import ( TeacherCreateSerializer,TeacherProfileSerializer,
                           StudentCreateSerializer,StudentListSerializer,StudentProfileSerializer,StudentDetailSerializer
 )
 from accounts.permissions import IsAdmin,HasActiveSubscription
 from . models import Teacher,Student
 from subscription.models import Subscription
-from classroom.models import SchoolClass, TimeTable, TimeTableEntry
+from classroom.models import SchoolClass
+from classroom.timetable_cache import class_grid
 
 
 from django.utils import timezone
@@ -17,6 +19,12 @@ from academics.models import Announcement,ClassDailyAttendance, StudentDailyAtte
 from exam.models import Exam, ExamResult
 from assignment.models import Assignment,AssignmentSubmission
 from finance.models import StudentBill
+from django.db.models import Count, Sum, F, Q, Exists, OuterRef, FloatField
+from .dashboard_cache import cached_dashboard
+from backend.exports import ExportMixin, joined
+from .student_import import read_csv_rows, import_students
+from .tasks import import_students_job
+from jobs.queue import enqueue
  
 
 # Create your views here.
@@ -145,14 +153,80 @@ class CreateStudentView(APIView):
     
 
 
-class StudentListView(APIView):
+class BulkStudentImportView(APIView):
+    """
+    Create many students from one file.
+    Body: a multipart CSV upload in `file` with columns email, full_name,
+    admission_number, roll_number and school_class (id) or class_name + division,
+    or {"students": [{...same keys...}, ...]}. The file is validated here;
+    the accounts are created by a job (password hashing is too slow for the
+    request) and the requester is notified when it finishes. `dry_run=1` only
+    validates. All rows are created or, on any row error, none.
+    """
     permission_classes = [IsAuthenticated,IsAdmin,HasActiveSubscription]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
 
-    def get(self,request):
-        tenant = request.user.tenant
-        students = Student.objects.filter(user__tenant = tenant).order_by("-created_at")
-        serializer = StudentListSerializer(students,many=True)
-        return Response(serializer.data)
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload:
+            try:
+                rows = read_csv_rows(upload)
+            except (ValueError, UnicodeDecodeError) as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            rows = request.data.get("students") if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                return Response(
+                    {"error": "Send a 'students' list or a CSV file"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        if not rows:
+            return Response({"error": "Student file is empty"}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.data.get("dry_run", request.query_params.get("dry_run", ""))).lower() in ("1", "true")
+        count, errors = import_students(request.user.tenant, rows, dry_run=True)
+        if errors:
+            return Response(
+                {"error": "Student file has errors; nothing was saved", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if dry_run:
+            return Response({"message": "Student file is valid", "rows": len(rows), "valid": count})
+
+        job = enqueue(import_students_job, tenant_id=str(request.user.tenant_id), rows=rows, requested_by=request.user.id)
+        return Response(
+            {"message": "Students are being created", "rows": len(rows), "valid": count, "job_id": getattr(job, "id", None)},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+
+class StudentListView(ExportMixin, generics.ListAPIView):
+    """GET: every student of the tenant; ?format=csv / ?format=xlsx downloads the list"""
+    serializer_class = StudentListSerializer
+    permission_classes = [IsAuthenticated,IsAdmin,HasActiveSubscription]
+
+    export_filename = "students"
+    export_columns = [
+        ("Admission No", "admission_number"),
+        ("Roll No", "roll_number"),
+        ("Name", "user__full_name"),
+        ("Email", "user__email"),
+        ("Phone", "user__phone"),
+        ("Class", ("school_class__name", "school_class__division"), joined),
+        ("Guardian", "guardian_name"),
+        ("Guardian Contact", "guardian_contact"),
+        ("Admission Date", "admission_date"),
+    ]
+
+    def get_queryset(self):
+        return (
+            Student.objects
+            .filter(user__tenant = self.request.user.tenant)
+            .select_related("user", "school_class")
+            .order_by("-created_at")
+        )
     
 
 
@@ -262,6 +336,10 @@ class DeleteStudentView(APIView):
 
 
 class TeacherDashboardView(APIView):
+    """
+    Served from a per-teacher snapshot invalidated by the teacher's exam,
+    assignment, result, submission and attendance writes.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -269,34 +347,52 @@ class TeacherDashboardView(APIView):
             return Response({"detail": "Forbidden"}, status=403)
 
         teacher = request.user.teacher_profile
-        tenant  = request.user.tenant
+        tenant_id = request.user.tenant_id
+
+        data = cached_dashboard(
+            "teacher", teacher.id,
+            [f"tenant:{tenant_id}", f"teacher:{teacher.id}"],
+            lambda: self.build(teacher, tenant_id),
+            extra=timezone.localdate().isoformat(),
+        )
+        return Response(data)
+
+    def build(self, teacher, tenant_id):
         now     = timezone.now()
         today   = now.date()
 
         # ── My class (as class teacher) ──
         my_class = (
             SchoolClass.objects
-            .filter(class_teacher=teacher, is_active=True, tenant=tenant)
+            .filter(class_teacher=teacher, is_active=True, tenant_id=tenant_id)
+            .annotate(student_count=Count("students"))
+            .order_by("id")
             .first()
         )
 
         my_class_info = None
         today_attendance = None
+        attendance_trend = []
 
         if my_class:
-            student_count = my_class.students.count()
             my_class_info = {
                 "id":           my_class.id,
                 "name":         str(my_class),
-                "student_count": student_count,
+                "student_count": my_class.student_count,
             }
 
-            # Today's attendance for my class
-            att = ClassDailyAttendance.objects.filter(
-                school_class=my_class,
-                date=today,
-                tenant=tenant,
-            ).first()
+            # Last two weeks of attendance, covering both today and the trend
+            recent_attendance = list(
+                ClassDailyAttendance.objects
+                .filter(
+                    school_class=my_class,
+                    tenant_id=tenant_id,
+                    date__gte=today - timedelta(days=14),
+                    date__lte=today,
+                )
+                .order_by("date")
+            )
+            att = next((a for a in recent_attendance if a.date == today), None)
 
             if att:
                 today_attendance = {
@@ -313,16 +409,43 @@ class TeacherDashboardView(APIView):
                     "is_completed":   False,
                     "present_count":  0,
                     "absent_count":   0,
-                    "total_students": student_count,
+                    "total_students": my_class.student_count,
                     "attendance_pct": 0,
                 }
 
+            # ── Attendance trend (last 7 school days for my class) ───
+            attendance_trend = [
+                {
+                    "date":    a.date.strftime("%d %b"),
+                    "present": a.present_count,
+                    "absent":  a.absent_count,
+                    "pct":     round(
+                        (a.present_count / a.total_students * 100)
+                        if a.total_students else 0, 1
+                    ),
+                }
+                for a in [a for a in recent_attendance if a.is_completed][:7]
+            ]
+
         # ── Exams ───
-        my_exams = Exam.objects.filter(teacher=teacher, tenant=tenant)
+        my_exams = Exam.objects.filter(teacher=teacher, tenant_id=tenant_id)
+
+        exam_counts = my_exams.annotate(
+            has_pending=Exists(
+                ExamResult.objects.filter(exam=OuterRef("pk"), status="pending")
+            )
+        ).aggregate(
+            total=Count("id"),
+            this_month=Count("id", filter=Q(exam_date__year=now.year, exam_date__month=now.month)),
+            # Exams needing grading (completed but has pending results)
+            pending_grading=Count("id", filter=Q(status="completed", has_pending=True)),
+        )
 
         upcoming_exams = (
             my_exams
             .filter(exam_date__gte=today, status__in=["scheduled", "ongoing"])
+            .select_related("subject")
+            .prefetch_related("classes")
             .order_by("exam_date", "start_time")[:5]
         )
         upcoming_exams_list = [
@@ -339,37 +462,19 @@ class TeacherDashboardView(APIView):
             for e in upcoming_exams
         ]
 
-        # Exams needing grading (completed but has pending results)
-        pending_grading = (
-            my_exams
-            .filter(status="completed")
-            .filter(results__status="pending")
-            .distinct()
-            .count()
-        )
-
-        exams_this_month = my_exams.filter(
-            exam_date__year=now.year,
-            exam_date__month=now.month,
-        ).count()
-
-        total_exams = my_exams.count()
-
         # ── Assignments ───
-        my_assignments = Assignment.objects.filter(teacher=teacher, tenant=tenant)
-
-        # Pending review (submitted but not graded)
-        pending_review_count = AssignmentSubmission.objects.filter(
-            assignment__teacher=teacher,
-            assignment__tenant=tenant,
-            status__in=["submitted", "late"],
-        ).count()
+        my_assignments = Assignment.objects.filter(teacher=teacher, tenant_id=tenant_id)
 
-        active_assignments = my_assignments.filter(due_date__gte=now).count()
-        overdue_assignments = my_assignments.filter(due_date__lt=now).count()
+        assignment_counts = my_assignments.aggregate(
+            active=Count("id", distinct=True, filter=Q(due_date__gte=now)),
+            overdue=Count("id", distinct=True, filter=Q(due_date__lt=now)),
+            # Pending review (submitted but not graded)
+            pending_review=Count("submissions", filter=Q(submissions__status__in=["submitted", "late"])),
+        )
 
         recent_assignments = (
             my_assignments
+            .annotate(submissions_total=Count("submissions"))
             .prefetch_related("classes")
             .select_related("subject")
             .order_by("-created_at")[:5]
@@ -381,7 +486,7 @@ class TeacherDashboardView(APIView):
                 "subject":     a.subject.name,
                 "due_date":    a.due_date.strftime("%d %b %Y, %I:%M %p"),
                 "total_marks": a.total_marks,
-                "submissions": a.submissions.count(),
+                "submissions": a.submissions_total,
                 "is_overdue":  a.is_overdue,
                 "classes":     [str(c) for c in a.classes.all()],
             }
@@ -389,18 +494,18 @@ class TeacherDashboardView(APIView):
         ]
 
         # ── Subjects I teach ───
-        subjects_taught = (
+        subjects_list = list(
             my_exams
+            .order_by("subject__name")
             .values_list("subject__name", flat=True)
             .distinct()
         )
-        subjects_list = list(subjects_taught)
 
         # ── Announcements (for teachers) ──
         announcements = (
             Announcement.objects
             .filter(
-                tenant=tenant,
+                tenant_id=tenant_id,
                 expiry_date__gte=now,
                 target_audience__in=["all", "teachers"],
             )
@@ -418,42 +523,16 @@ class TeacherDashboardView(APIView):
             for a in announcements
         ]
 
-        # ── Attendance trend (last 7 school days for my class) ───
-        attendance_trend = []
-        if my_class:
-            last_7 = (
-                ClassDailyAttendance.objects
-                .filter(
-                    school_class=my_class,
-                    tenant=tenant,
-                    is_completed=True,
-                    date__gte=today - timedelta(days=14),
-                )
-                .order_by("date")[:7]
-            )
-            attendance_trend = [
-                {
-                    "date":    a.date.strftime("%d %b"),
-                    "present": a.present_count,
-                    "absent":  a.absent_count,
-                    "pct":     round(
-                        (a.present_count / a.total_students * 100)
-                        if a.total_students else 0, 1
-                    ),
-                }
-                for a in last_7
-            ]
-
-        return Response({
+        return {
             "my_class":            my_class_info,
             "today_attendance":    today_attendance,
             "kpis": {
-                "total_exams":        total_exams,
-                "exams_this_month":   exams_this_month,
-                "pending_grading":    pending_grading,
-                "active_assignments": active_assignments,
-                "pending_review":     pending_review_count,
-                "overdue_assignments":overdue_assignments,
+                "total_exams":        exam_counts["total"],
+                "exams_this_month":   exam_counts["this_month"],
+                "pending_grading":    exam_counts["pending_grading"],
+                "active_assignments": assignment_counts["active"],
+                "pending_review":     assignment_counts["pending_review"],
+                "overdue_assignments":assignment_counts["overdue"],
                 "subjects_count":     len(subjects_list),
                 "announcements_count":len(announcements_list),
             },
@@ -462,7 +541,7 @@ class TeacherDashboardView(APIView):
             "announcements":       announcements_list,
             "attendance_trend":    attendance_trend,
             "subjects":            subjects_list,
-        })
+        }
 
 
 
@@ -472,6 +551,8 @@ class StudentDashboardView(APIView):
     """
     GET /api/academics/student/dashboard/
     Everything a student needs on their dashboard in one call.
+    Served from a per-student snapshot invalidated by exam, assignment, bill,
+    attendance, timetable and announcement writes.
     """
     permission_classes = [IsAuthenticated]
  
@@ -479,18 +560,35 @@ class StudentDashboardView(APIView):
         if request.user.role != "student":
             return Response({"detail": "Forbidden"}, status=403)
  
-        student = request.user.student_profile
-        tenant  = request.user.tenant
+        student = Student.objects.select_related("school_class").get(user=request.user)
+        tenant_id = request.user.tenant_id
+
+        scopes = [f"tenant:{tenant_id}", f"student:{student.id}"]
+        if student.school_class_id:
+            scopes.append(f"class:{student.school_class_id}")
+
+        data = cached_dashboard(
+            "student", student.id, scopes,
+            lambda: self.build(request.user, student, tenant_id),
+            extra=timezone.localdate().isoformat(),
+        )
+        return Response(data)
+
+    def build(self, user, student, tenant_id):
         now     = timezone.now()
         today   = now.date()
  
         # ── Attendance ────────────────────────────────────────────────────────
-        # This month's summary
-        monthly_att = MonthlyAttendanceSummary.objects.filter(
-            student=student,
-            month=now.month,
-            year=now.year,
-        ).first()
+        # Last 6 months trend (latest first); includes this month if marked
+        att_trend = list(
+            MonthlyAttendanceSummary.objects
+            .filter(student=student)
+            .order_by("-year", "-month")[:6]
+        )
+        monthly_att = next(
+            (a for a in att_trend if a.month == now.month and a.year == now.year),
+            None,
+        )
  
         attendance_this_month = {
             "total_days":   monthly_att.total_days if monthly_att else 0,
@@ -499,12 +597,6 @@ class StudentDashboardView(APIView):
             "percentage":   float(monthly_att.attendance_percentage) if monthly_att else 0.0,
         }
  
-        # Last 6 months trend
-        att_trend = (
-            MonthlyAttendanceSummary.objects
-            .filter(student=student)
-            .order_by("-year", "-month")[:6]
-        )
         att_trend_list = [
             {
                 "label":      f"{a.month}/{str(a.year)[2:]}",
@@ -512,28 +604,27 @@ class StudentDashboardView(APIView):
                 "present":    a.present_days,
                 "total":      a.total_days,
             }
-            for a in reversed(list(att_trend))
+            for a in reversed(att_trend)
         ]
  
         # Today's attendance status
-        today_status = None
-        today_att = StudentDailyAttendance.objects.filter(
-            student=student,
-            class_attendance__date=today,
-        ).first()
-        if today_att:
-            today_status = today_att.status
+        today_status = (
+            StudentDailyAttendance.objects
+            .filter(student=student, class_attendance__date=today)
+            .values_list("status", flat=True)
+            .first()
+        )
  
         # ── Exams ─────────────────────────────────────────────────────────────
-        if student.school_class:
-            my_exams = Exam.objects.filter(
-                classes=student.school_class,
-                tenant=tenant,
-            )
- 
+        if student.school_class_id:
             upcoming_exams = (
-                my_exams
-                .filter(exam_date__gte=today, status__in=["scheduled", "ongoing"])
+                Exam.objects
+                .filter(
+                    classes=student.school_class_id,
+                    tenant_id=tenant_id,
+                    exam_date__gte=today,
+                    status__in=["scheduled", "ongoing"],
+                )
                 .select_related("subject")
                 .order_by("exam_date", "start_time")[:5]
             )
@@ -572,16 +663,19 @@ class StudentDashboardView(APIView):
                 for r in recent_results
             ]
  
-            # Average performance
-            all_results = ExamResult.objects.filter(
+            # Average performance, computed in the database
+            results_summary = ExamResult.objects.filter(
                 student=student, status="graded"
+            ).aggregate(
+                total=Count("id"),
+                pct_sum=Sum(
+                    F("marks_obtained") * 100.0 / F("exam__max_marks"),
+                    output_field=FloatField(),
+                ),
             )
-            total_results = all_results.count()
+            total_results = results_summary["total"]
             if total_results > 0:
-                total_pct = sum(
-                    r.percentage for r in all_results if r.percentage is not None
-                )
-                avg_percentage = round(total_pct / total_results, 1)
+                avg_percentage = round((results_summary["pct_sum"] or 0) / total_results, 1)
             else:
                 avg_percentage = 0.0
  
@@ -592,32 +686,30 @@ class StudentDashboardView(APIView):
             total_results = 0
  
         # ── Assignments ───────────────────────────────────────────────────────
-        if student.school_class:
-            my_assignments = Assignment.objects.filter(
-                classes=student.school_class,
-                tenant=tenant,
-            ).select_related("subject").prefetch_related("classes")
- 
-            pending_assignments = my_assignments.filter(due_date__gte=now)
-            overdue_assignments = my_assignments.filter(due_date__lt=now)
- 
-            # Which ones the student has already submitted
-            submitted_ids = set(
-                AssignmentSubmission.objects
-                .filter(student=student)
-                .values_list("assignment_id", flat=True)
+        if student.school_class_id:
+            pending_assignments = Assignment.objects.filter(
+                classes=student.school_class_id,
+                tenant_id=tenant_id,
+                due_date__gte=now,
+            ).annotate(
+                submitted=Exists(
+                    AssignmentSubmission.objects.filter(
+                        assignment=OuterRef("pk"), student=student,
+                    )
+                )
             )
  
-            pending_list = []
-            for a in pending_assignments.order_by("due_date")[:5]:
-                pending_list.append({
+            pending_list = [
+                {
                     "id":          a.id,
                     "title":       a.title,
                     "subject":     a.subject.name,
                     "due_date":    a.due_date.strftime("%d %b %Y, %I:%M %p"),
                     "total_marks": a.total_marks,
-                    "submitted":   a.id in submitted_ids,
-                })
+                    "submitted":   a.submitted,
+                }
+                for a in pending_assignments.select_related("subject").order_by("due_date")[:5]
+            ]
  
             # My submission results
             my_submissions = (
@@ -638,25 +730,26 @@ class StudentDashboardView(APIView):
                 for s in my_submissions
             ]
  
-            pending_submit_count = sum(
-                1 for a in pending_assignments if a.id not in submitted_ids
-            )
+            pending_submit_count = pending_assignments.filter(submitted=False).count()
         else:
             pending_list = []
             graded_submissions = []
             pending_submit_count = 0
  
         # ── Fees ──────────────────────────────────────────────────────────────
-        my_bills = StudentBill.objects.filter(student=student, tenant=tenant)
-        pending_bills = my_bills.filter(status="pending")
-        overdue_bills = my_bills.filter(status="overdue")
+        my_bills = StudentBill.objects.filter(student=student, tenant_id=tenant_id)
+        fee_totals = my_bills.aggregate(
+            pending=Sum("amount", filter=Q(status="pending")),
+            overdue=Sum("amount", filter=Q(status="overdue")),
+        )
  
-        pending_fee_amount = sum(float(b.amount) for b in pending_bills)
-        overdue_fee_amount = sum(float(b.amount) for b in overdue_bills)
+        pending_fee_amount = float(fee_totals["pending"] or 0)
+        overdue_fee_amount = float(fee_totals["overdue"] or 0)
  
         upcoming_dues = (
             my_bills
             .filter(status__in=["pending", "overdue"])
+            .select_related("fee_structure__fee_type")
             .order_by("due_date")[:3]
         )
         fee_dues_list = [
@@ -674,33 +767,23 @@ class StudentDashboardView(APIView):
         today_day = day_map.get(today.weekday(), "")
         today_schedule = []
  
-        if student.school_class:
-            timetable = TimeTable.objects.filter(
-                school_class=student.school_class,
-                tenant=tenant,
-            ).first()
-            if timetable and today_day:
-                entries = (
-                    TimeTableEntry.objects
-                    .filter(timetable=timetable, day=today_day)
-                    .select_related("slot", "subject", "teacher__user")
-                    .order_by("slot__start_time")
-                )
-                today_schedule = [
-                    {
-                        "time":    f"{e.slot.start_time.strftime('%I:%M')}–{e.slot.end_time.strftime('%I:%M %p')}",
-                        "subject": e.subject.name if e.subject else "Break",
-                        "teacher": e.teacher.user.full_name if e.teacher else "—",
-                        "is_break": e.slot.is_break,
-                    }
-                    for e in entries
-                ]
+        if student.school_class_id and today_day:
+            grid = class_grid(tenant_id, student.school_class_id)
+            today_schedule = [
+                {
+                    "time":    f"{cell['start_time'].strftime('%I:%M')}–{cell['end_time'].strftime('%I:%M %p')}",
+                    "subject": cell["subject"] or "Break",
+                    "teacher": cell["teacher"] or "—",
+                    "is_break": cell["is_break"],
+                }
+                for cell in (grid["days"].get(today_day, []) if grid else [])
+            ]
  
         # ── Announcements ─────────────────────────────────────────────────────
         announcements = (
             Announcement.objects
             .filter(
-                tenant=tenant,
+                tenant_id=tenant_id,
                 expiry_date__gte=now,
                 target_audience__in=["all", "students"],
             )
@@ -720,13 +803,13 @@ class StudentDashboardView(APIView):
  
         # ── Student info ──────────────────────────────────────────────────────
         student_info = {
-            "name":             request.user.full_name,
+            "name":             user.full_name,
             "admission_number": student.admission_number,
             "roll_number":      student.roll_number,
             "class_name":       str(student.school_class) if student.school_class else "—",
         }
  
-        return Response({
+        return {
             "student":             student_info,
             "attendance":          attendance_this_month,
             "today_status":        today_status,
@@ -743,4 +826,4 @@ class StudentDashboardView(APIView):
             "overdue_fee_amount":  overdue_fee_amount,
             "today_schedule":      today_schedule,
             "announcements":       announcements_list,
-        })
\ No newline at end of file
+        }